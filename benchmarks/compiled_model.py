@@ -0,0 +1,102 @@
+"""
+Per-row latency of the compiled scoring path against the pickled
+preprocessor + model path.
+
+    python -m benchmarks.compiled_model
+    python -m benchmarks.compiled_model --fit random_forest
+"""
+
+import argparse
+import os
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.components.compiled_model import compile_model
+from src.utils import load_object
+
+ARTIFACTS_DIR = "artifacts"
+
+
+def _fit_model(kind, preprocessor):
+    from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+    from sklearn.linear_model import Ridge
+
+    models = {
+        "ridge": Ridge(),
+        "random_forest": RandomForestRegressor(n_estimators=128, random_state=42),
+        "gradient_boosting": GradientBoostingRegressor(
+            n_estimators=128, random_state=42
+        ),
+    }
+    train_df = pd.read_csv(os.path.join(ARTIFACTS_DIR, "train.csv"))
+    X = preprocessor.transform(train_df.drop(columns=["math_score"]))
+    return models[kind].fit(X, train_df["math_score"])
+
+
+def _per_row_us(fn, rows, repeat):
+    timings = []
+    for _ in range(repeat):
+        for row in rows:
+            start = time.perf_counter()
+            fn(row)
+            timings.append(time.perf_counter() - start)
+    return np.percentile(np.array(timings) * 1e6, [50, 95, 99])
+
+
+def _batch_us(fn, batch, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(batch)
+    return (time.perf_counter() - start) / repeat / len(batch) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--fit",
+        choices=["ridge", "random_forest", "gradient_boosting"],
+        help="benchmark a freshly fitted model instead of artifacts/model.pkl",
+    )
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    preprocessor = load_object(os.path.join(ARTIFACTS_DIR, "preprocessor.pkl"))
+    if args.fit:
+        model = _fit_model(args.fit, preprocessor)
+    else:
+        model = load_object(os.path.join(ARTIFACTS_DIR, "model.pkl"))
+    compiled = compile_model(preprocessor, model)
+
+    test_df = pd.read_csv(os.path.join(ARTIFACTS_DIR, "test.csv"))
+    features = test_df.drop(columns=["math_score"])
+    frames = [features.iloc[[i]] for i in range(min(args.rows, len(features)))]
+    records = [frame.iloc[0].to_dict() for frame in frames]
+
+    def pickled(frame):
+        return model.predict(preprocessor.transform(frame))
+
+    deviation = np.max(np.abs(compiled.predict(features) - pickled(features)))
+    print(f"model: {type(model).__name__} ({compiled.kind}), max |diff| {deviation:.2e}")
+    print(f"{'path':<28}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}")
+    for label, fn, rows in (
+        ("pickles, DataFrame row", pickled, frames),
+        ("compiled, dict row", compiled.predict, records),
+    ):
+        p50, p95, p99 = _per_row_us(fn, rows, args.repeat)
+        print(f"{label:<28}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+
+    print(f"{'path':<28}{'us/row (batch)':>20}")
+    print(f"{'pickles, DataFrame batch':<28}{_batch_us(pickled, features, 20):>20.2f}")
+    print(
+        f"{'compiled, DataFrame batch':<28}"
+        f"{_batch_us(compiled.predict, features, 20):>20.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
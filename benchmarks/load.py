@@ -0,0 +1,360 @@
+"""
+Load generator and traffic replay for the prediction API.
+
+Traffic is either synthetic (StudentInput records drawn from the category
+and score distributions in artifacts/raw.csv) or a JSONL file recorded by
+the API with REQUEST_RECORD_PATH set. It is sent to a server this tool
+launches locally (gunicorn + main:app, once per --workers value) or to a
+running one given with --url.
+
+open    requests start on a fixed schedule (--rate per second, uniform or
+        poisson arrivals, or the recorded timing with --as-recorded)
+        however long earlier ones take; latency is measured from the
+        scheduled start, so a server that falls behind shows it
+closed  --concurrency clients each send their next request as soon as
+        the previous one is answered
+
+The report has latency percentiles, achieved throughput, status counts
+and the server's cache/batching/pool stats after the run.
+
+    python -m benchmarks.load generate --count 10000 --distinct 500 --output traffic.jsonl
+    python -m benchmarks.load run --mode open --rate 200 --duration 30 --workers 1,2,4
+    python -m benchmarks.load run --traffic artifacts/traffic/requests.jsonl --as-recorded
+    python -m benchmarks.load run --mode closed --concurrency 32 --env MICRO_BATCHING_ENABLED=true
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from benchmarks.suite import summarize
+from benchmarks.traffic import (
+    RAW_DATA_PATH,
+    TrafficModel,
+    read_traffic,
+    write_traffic,
+)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VARIANT_HEADER = "X-Model-Variant"
+# Server endpoints whose JSON is attached to the report after each run
+STATS_ENDPOINTS = ("/cache-stats", "/batching-stats", "/pool-stats")
+
+
+def fixed_rate_schedule(count, rate, arrival="uniform", seed=None):
+    """Start offsets in seconds for `count` requests at `rate` per second."""
+    if arrival == "poisson":
+        gaps = np.random.default_rng(seed).exponential(1 / rate, size=count)
+        return np.concatenate([[0.0], np.cumsum(gaps[:-1])])
+    if arrival != "uniform":
+        raise ValueError(f"Unknown arrival process {arrival!r}")
+    return np.arange(count) / rate
+
+
+def recorded_schedule(entries, speed=1.0):
+    """Start offsets that reproduce the recorded timing, `speed` times faster."""
+    timestamps = np.array([entry.get("ts", 0.0) for entry in entries], dtype=float)
+    return (timestamps - timestamps.min()) / speed
+
+
+async def _send(client, entry):
+    headers = {VARIANT_HEADER: entry["variant"]} if entry.get("variant") else None
+    try:
+        response = await client.request(
+            entry.get("method", "POST"),
+            entry["path"],
+            json=entry.get("body"),
+            headers=headers,
+        )
+        return response.status_code
+    except Exception as e:
+        return type(e).__name__
+
+
+async def run_open_loop(client, entries, schedule):
+    """Send entries[i] at schedule[i] seconds from now, regardless of replies."""
+    timings = [None] * len(entries)
+    statuses = [None] * len(entries)
+    late = 0
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    async def fire(i, due):
+        statuses[i] = await _send(client, entries[i])
+        timings[i] = loop.time() - due
+
+    tasks = []
+    for i, offset in enumerate(schedule):
+        due = start + offset
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        elif delay < -0.01:
+            # The client itself could not keep to the schedule
+            late += 1
+        tasks.append(asyncio.create_task(fire(i, due)))
+    await asyncio.gather(*tasks)
+    return timings, statuses, loop.time() - start, late
+
+
+async def run_closed_loop(client, entries, concurrency, duration=None):
+    """`concurrency` clients send entries back to back until done or timed out."""
+    timings = []
+    statuses = []
+    counter = itertools.count()
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+
+    async def worker():
+        while (i := next(counter)) < len(entries):
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            sent = time.perf_counter()
+            statuses.append(await _send(client, entries[i]))
+            timings.append(time.perf_counter() - sent)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return timings, statuses, time.perf_counter() - start, 0
+
+
+def build_report(timings, statuses, wall, late=0):
+    counts = Counter(str(status) for status in statuses if status is not None)
+    report = summarize(timings, wall=wall, unit="requests/s") if timings else {}
+    report.update(
+        {
+            "requests": len(timings),
+            "succeeded": counts.get("200", 0),
+            "statuses": dict(counts),
+            "duration_seconds": wall,
+            "late_starts": late,
+        }
+    )
+    if timings:
+        report["max_ms"] = float(np.max(timings) * 1000)
+    return report
+
+
+async def drive(base_url, entries, args, transport=None):
+    """Run one load test against `base_url`; returns the report."""
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=args.max_connections,
+        max_keepalive_connections=args.max_connections,
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url, transport=transport, timeout=args.timeout, limits=limits
+    ) as client:
+        if args.mode == "open":
+            if args.as_recorded:
+                schedule = recorded_schedule(entries, args.speed)
+            else:
+                schedule = fixed_rate_schedule(
+                    len(entries), args.rate, args.arrival, args.seed
+                )
+            if args.duration:
+                keep = schedule < args.duration
+                entries = [entry for entry, kept in zip(entries, keep) if kept]
+                schedule = schedule[keep]
+            result = await run_open_loop(client, entries, schedule)
+        else:
+            result = await run_closed_loop(
+                client, entries, args.concurrency, args.duration
+            )
+
+        report = build_report(*result)
+        report["server"] = {}
+        for path in STATS_ENDPOINTS:
+            with contextlib.suppress(Exception):
+                response = await client.get(path)
+                if response.status_code == 200:
+                    report["server"][path.strip("/")] = response.json()
+    return report
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def launch_server(workers, env=None, ready_timeout=120):
+    """
+    Start gunicorn with the repo's gunicorn.conf.py and `workers` workers on
+    a free local port; yields the base URL once /readyz answers 200.
+    """
+    import httpx
+
+    port = _free_port()
+    environment = dict(os.environ)
+    # Keep the server from writing log files
+    environment.setdefault("LOG_FILE", "")
+    environment.update(env or {})
+    environment.update({"PORT": str(port), "WEB_CONCURRENCY": str(workers)})
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-c",
+            "gunicorn.conf.py",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "main:app",
+        ],
+        cwd=PROJECT_ROOT,
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + ready_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with status {process.returncode}")
+            with contextlib.suppress(httpx.HTTPError):
+                if httpx.get(f"{base_url}/readyz", timeout=1).status_code == 200:
+                    break
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Server not ready after {ready_timeout}s")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def _traffic(args):
+    if args.traffic:
+        entries = read_traffic(args.traffic)
+        if not entries:
+            raise SystemExit(f"No requests in {args.traffic}")
+    else:
+        entries = TrafficModel.from_csv(args.raw_data).requests(
+            args.count, args.seed, args.distinct
+        )
+    if args.requests:
+        # Cycle a short recording to the requested length
+        entries = list(itertools.islice(itertools.cycle(entries), args.requests))
+    return entries
+
+
+def _print_report(label, report, stream):
+    if not report.get("requests"):
+        print(f"{label}: no requests completed", file=stream)
+        return
+    cache = report["server"].get("cache-stats", {})
+    print(
+        f"{label:<14}{report['requests']:>8}{report['throughput']:>12.1f}"
+        f"{report['p50_ms']:>10.2f}{report['p95_ms']:>10.2f}"
+        f"{report['p99_ms']:>10.2f}{report['max_ms']:>10.2f}"
+        f"{report['requests'] - report['succeeded']:>8}"
+        f"{report['late_starts']:>7}"
+        f"{cache.get('hit_rate') or 0:>10.1%}",
+        file=stream,
+    )
+
+
+def _parse_env(items):
+    env = {}
+    for item in items or ():
+        name, _, value = item.partition("=")
+        env[name] = value
+    return env
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="write synthetic traffic")
+    run = commands.add_parser("run", help="send traffic to the API")
+    for command in (generate, run):
+        command.add_argument("--raw-data", default=RAW_DATA_PATH)
+        command.add_argument("--count", type=int, default=5000)
+        command.add_argument(
+            "--distinct", type=int, default=0, help="draw bodies from this many records"
+        )
+        command.add_argument("--seed", type=int, default=42)
+    generate.add_argument("--output", required=True)
+    generate.set_defaults(traffic=None, requests=None)
+
+    run.add_argument("--traffic", help="JSONL traffic file; synthetic when omitted")
+    run.add_argument("--requests", type=int, help="cycle the traffic to this many")
+    run.add_argument("--mode", choices=["open", "closed"], default="open")
+    run.add_argument("--rate", type=float, default=100, help="open loop, per second")
+    run.add_argument("--arrival", choices=["uniform", "poisson"], default="uniform")
+    run.add_argument("--as-recorded", action="store_true")
+    run.add_argument("--speed", type=float, default=1.0, help="with --as-recorded")
+    run.add_argument("--concurrency", type=int, default=16, help="closed loop")
+    run.add_argument("--duration", type=float, help="stop after this many seconds")
+    run.add_argument("--timeout", type=float, default=30)
+    run.add_argument("--max-connections", type=int, default=1000)
+    run.add_argument("--url", help="test this server instead of launching one")
+    run.add_argument(
+        "--workers", default="2", help="gunicorn worker counts to try, e.g. 1,2,4"
+    )
+    run.add_argument(
+        "--env", action="append", metavar="NAME=VALUE", help="server environment"
+    )
+    run.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    entries = _traffic(args)
+    if args.command == "generate":
+        write_traffic(args.output, entries)
+        print(f"Wrote {len(entries)} requests to {args.output}")
+        return
+
+    if args.as_recorded and args.mode != "open":
+        parser.error("--as-recorded needs --mode open")
+
+    print(
+        f"{'server':<14}{'requests':>8}{'req/s':>12}{'p50 ms':>10}{'p95 ms':>10}"
+        f"{'p99 ms':>10}{'max ms':>10}{'errors':>8}{'late':>7}{'cache hit':>10}",
+        file=sys.stderr,
+    )
+    reports = {}
+    if args.url:
+        reports[args.url] = asyncio.run(drive(args.url, entries, args))
+        _print_report(args.url, reports[args.url], sys.stderr)
+    else:
+        for workers in [int(value) for value in args.workers.split(",")]:
+            with launch_server(workers, _parse_env(args.env)) as base_url:
+                label = f"workers={workers}"
+                reports[label] = asyncio.run(drive(base_url, entries, args))
+                _print_report(label, reports[label], sys.stderr)
+
+    output = {
+        "mode": args.mode,
+        "rate": args.rate if args.mode == "open" and not args.as_recorded else None,
+        "concurrency": args.concurrency if args.mode == "closed" else None,
+        "server_env": _parse_env(args.env),
+        "reports": reports,
+    }
+    if args.output:
+        with open(args.output, "w") as file_obj:
+            json.dump(output, file_obj, indent=2)
+    else:
+        print(json.dumps(output, indent=2))
+
+
+if __name__ == "__main__":
+    main()
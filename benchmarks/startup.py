@@ -0,0 +1,132 @@
+"""
+Cold-start cost of the API: importing main.py, then loading the model and
+passing the readiness canary, each measured in a fresh interpreter. Also
+lists the training-only libraries that got imported on the way, which
+should be none when a compiled model artifact is present.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 10 --max-import-seconds 1.5
+    python -m benchmarks.startup --importtime 15
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries only training needs; the serving path should not import them
+HEAVY_MODULES = ("sklearn", "scipy", "catboost", "xgboost", "matplotlib", "seaborn")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from src.pipeline.health import ModelHealth
+from src.pipeline.model_registry import model_registry
+model_registry.load()
+canary = ModelHealth(model_registry).run_canary()
+ready = time.perf_counter()
+heavy = sorted(
+    {name.split(".")[0] for name in sys.modules} & set(json.loads(sys.argv[1]))
+)
+print(json.dumps({
+    "import_seconds": imported - start,
+    "ready_seconds": ready - start,
+    "canary_ok": canary["ok"],
+    "compiled": model_registry.info()["compiled"],
+    "heavy_modules": heavy,
+}))
+"""
+
+
+def _environment(env=None):
+    environment = dict(os.environ)
+    # Keep the probe from writing log files
+    environment.setdefault("LOG_FILE", "")
+    environment.update(env or {})
+    return environment
+
+
+def measure_startup(env=None):
+    """
+    Start a fresh interpreter that imports main.py and brings the model to
+    ready. Returns the timings and the heavy modules that were imported.
+    """
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", _PROBE, json.dumps(HEAVY_MODULES)],
+        cwd=PROJECT_ROOT,
+        env=_environment(env),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def import_profile(top=15, env=None):
+    """The `top` modules with the largest cumulative import time for main."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=PROJECT_ROOT,
+        env=_environment(env),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((int(cumulative.strip()), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--max-import-seconds",
+        type=float,
+        help="exit with status 1 when the median import time is above this",
+    )
+    parser.add_argument(
+        "--importtime", type=int, metavar="N", help="show the N slowest imports"
+    )
+    args = parser.parse_args()
+
+    runs = [measure_startup() for _ in range(args.repeat)]
+    import_seconds = np.median([run["import_seconds"] for run in runs])
+    ready_seconds = np.median([run["ready_seconds"] for run in runs])
+    heavy = sorted({module for run in runs for module in run["heavy_modules"]})
+
+    print(f"runs: {args.repeat}, compiled model: {runs[0]['compiled']}")
+    print(f"{'import main':<24}{import_seconds * 1000:>10.0f} ms (median)")
+    print(f"{'import + model ready':<24}{ready_seconds * 1000:>10.0f} ms (median)")
+    print(f"heavy modules imported: {', '.join(heavy) or 'none'}")
+
+    if args.importtime:
+        print(f"{'cumulative ms':>14}  module")
+        for cumulative, name in import_profile(args.importtime):
+            print(f"{cumulative / 1000:>14.1f}  {name}")
+
+    if args.max_import_seconds is not None and import_seconds > (
+        args.max_import_seconds
+    ):
+        print(
+            f"import time {import_seconds:.2f}s exceeds "
+            f"{args.max_import_seconds:.2f}s"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
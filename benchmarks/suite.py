@@ -0,0 +1,398 @@
+"""
+Offline benchmark suite for the serving and training hot paths, run
+against artifacts/test.csv (and artifacts/train.csv for training).
+
+serving   PredictPipeline.predict on one-row frames, predict_batch at
+          1/100/10k records and CustomData.get_data_as_data_frame
+api       POST /api/predict end to end through an in-process ASGI client
+          at several concurrency levels (prediction cache off by default)
+training  evaluate_models for each model with the trainer's grids
+
+Every benchmark reports p50/p95/p99/mean latency in ms and a throughput.
+`compare` exits with status 1 when a latency grows, or a throughput
+drops, by more than --threshold relative to a stored baseline.
+
+    python -m benchmarks.suite run --output baseline.json
+    python -m benchmarks.suite run --suites serving,api --baseline baseline.json
+    python -m benchmarks.suite run --suites training --models "Ridge Regression"
+    python -m benchmarks.suite compare baseline.json results.json --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTIFACTS_DIR = os.path.join(PROJECT_ROOT, "artifacts")
+TARGET_COLUMN = "math_score"
+
+SUITES = ("serving", "api", "training")
+BATCH_SIZES = (1, 100, 10000)
+CONCURRENCY = (1, 8, 32)
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+THROUGHPUT_METRIC = "throughput"
+# Settings that change the numbers, recorded with every run
+ENVIRONMENT_KEYS = (
+    "INFERENCE_POOL_MODE",
+    "INFERENCE_POOL_SIZE",
+    "MICRO_BATCHING_ENABLED",
+    "PREDICTION_CACHE_ENABLED",
+    "PREDICTION_TABLE_ENABLED",
+    "MODEL_SEARCH_STRATEGY",
+    "MODEL_SEARCH_N_JOBS",
+    "OMP_NUM_THREADS",
+)
+
+
+def summarize(seconds, items=1, wall=None, unit="items/s"):
+    """
+    Latency percentiles in ms for per-call timings `seconds`, and the
+    throughput of `items` per call over `wall` seconds (their sum when the
+    calls ran one after another).
+    """
+    samples = np.asarray(seconds, dtype=float)
+    p50, p95, p99 = np.percentile(samples * 1000, [50, 95, 99])
+    wall = samples.sum() if wall is None else wall
+    return {
+        "samples": len(samples),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "mean_ms": float(samples.mean() * 1000),
+        "throughput": len(samples) * items / wall,
+        "throughput_unit": unit,
+    }
+
+
+def _time_calls(fn, args, repeat, warmup=5):
+    """Per-call seconds of fn(arg) for each of `args`, `repeat` times over."""
+    for arg in args[:warmup]:
+        fn(arg)
+    timings = []
+    for _ in range(repeat):
+        for arg in args:
+            start = time.perf_counter()
+            fn(arg)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def load_features(path=None):
+    """The test split without the target, as a DataFrame of JSON-safe types."""
+    df = pd.read_csv(path or os.path.join(ARTIFACTS_DIR, "test.csv"))
+    return df.drop(columns=[TARGET_COLUMN])
+
+
+def _records(features, n_rows):
+    """`n_rows` record dicts, cycling through `features` as needed."""
+    records = json.loads(features.to_json(orient="records"))
+    return list(itertools.islice(itertools.cycle(records), n_rows))
+
+
+def bench_serving(
+    pipeline, features, repeat=5, batch_sizes=BATCH_SIZES, max_batch_calls=200
+):
+    from src.pipeline.predict_pipeline import CustomData
+
+    results = {}
+    frames = [features.iloc[[i]] for i in range(len(features))]
+    results["serving/predict_single_row"] = summarize(
+        _time_calls(pipeline.predict, frames, repeat), unit="rows/s"
+    )
+
+    for batch_size in batch_sizes:
+        batch = _records(features, batch_size)
+        # Enough calls for stable percentiles without letting 10k rows dominate
+        calls = max(repeat, min(max_batch_calls, 20000 // batch_size))
+        timings = _time_calls(
+            lambda records: pipeline.predict_batch(records), [batch] * calls, 1, 1
+        )
+        results[f"serving/predict_batch_{batch_size}"] = summarize(
+            timings, items=batch_size, unit="rows/s"
+        )
+
+    records = _records(features, len(features))
+    results["serving/custom_data_frame"] = summarize(
+        _time_calls(
+            lambda record: CustomData(**record).get_data_as_data_frame(),
+            records,
+            repeat,
+        ),
+        unit="rows/s",
+    )
+    return results
+
+
+async def _drive(client, payloads, concurrency, total):
+    """Send `total` requests from `concurrency` workers; per-request seconds."""
+    timings = []
+    counter = itertools.count()
+
+    async def worker():
+        while (i := next(counter)) < total:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/predict", json=payloads[i % len(payloads)]
+            )
+            timings.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return timings, time.perf_counter() - start
+
+
+async def _bench_api(app, payloads, levels, requests):
+    import logging
+
+    import httpx
+
+    # One INFO line per request would be part of what gets measured
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    results = {}
+    # Run the app's lifespan so the pool, batcher and canary start as in production
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark"
+        ) as client:
+            await _drive(client, payloads, 1, min(20, requests))
+            for concurrency in levels:
+                timings, wall = await _drive(client, payloads, concurrency, requests)
+                results[f"api/predict_c{concurrency}"] = summarize(
+                    timings, wall=wall, unit="requests/s"
+                )
+    return results
+
+
+def bench_api(features, levels=CONCURRENCY, requests=500, cache=False):
+    # main.py builds its cache and logging at import time
+    os.environ.setdefault("LOG_FILE", "")
+    if not cache:
+        os.environ["PREDICTION_CACHE_ENABLED"] = "false"
+    from main import app
+
+    payloads = _records(features, len(features))
+    return asyncio.run(_bench_api(app, payloads, levels, requests))
+
+
+def bench_training(model_names=None, repeat=1, search_config=None):
+    from src.components.model_trainer import candidate_models, candidate_params
+    from src.utils import evaluate_models, load_object
+
+    preprocessor = load_object(os.path.join(ARTIFACTS_DIR, "preprocessor.pkl"))
+    splits = {}
+    for split in ("train", "test"):
+        df = pd.read_csv(os.path.join(ARTIFACTS_DIR, f"{split}.csv"))
+        splits[split] = (
+            preprocessor.transform(df.drop(columns=[TARGET_COLUMN])),
+            df[TARGET_COLUMN].to_numpy(),
+        )
+
+    params = candidate_params()
+    results = {}
+    for name in model_names or list(candidate_models()):
+        timings = []
+        n_fits = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            report = evaluate_models(
+                *splits["train"],
+                *splits["test"],
+                {name: candidate_models()[name]},
+                {name: params.get(name, {})},
+                search_config,
+            )
+            timings.append(time.perf_counter() - start)
+            # The final refit counts as one more fit
+            n_fits += report[name].get("n_fits", 0) + 1
+        result = summarize(timings, unit="fits/s")
+        result["throughput"] = n_fits / sum(timings)
+        result["test_r2"] = report[name]["test_score"]
+        results[f"training/{name}"] = result
+    return results
+
+
+def environment():
+    from src.components.artifact_bundle import library_versions
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "libraries": library_versions(),
+        "settings": {
+            key: os.environ[key] for key in ENVIRONMENT_KEYS if key in os.environ
+        },
+    }
+
+
+def compare(baseline, current, threshold=0.2, min_delta_ms=0.05, metrics=None):
+    """
+    One row per benchmark metric present in both runs, with its relative
+    change. Latencies regress when they grow by more than `threshold` (and
+    by at least `min_delta_ms`, so sub-microsecond jitter is ignored);
+    throughput regresses when it drops by more than `threshold`.
+    """
+    metrics = metrics or LATENCY_METRICS + (THROUGHPUT_METRIC,)
+    rows = []
+    for name, base in baseline["benchmarks"].items():
+        result = current["benchmarks"].get(name)
+        if result is None:
+            continue
+        for metric in metrics:
+            before, after = base.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = after / before - 1
+            if metric == THROUGHPUT_METRIC:
+                regressed = change < -threshold
+            else:
+                regressed = change > threshold and after - before >= min_delta_ms
+            rows.append(
+                {
+                    "benchmark": name,
+                    "metric": metric,
+                    "baseline": before,
+                    "current": after,
+                    "change": change,
+                    "regressed": regressed,
+                }
+            )
+    return rows
+
+
+def _print_results(results, stream):
+    print(
+        f"{'benchmark':<40}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        f"{'throughput':>14}  unit",
+        file=stream,
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<40}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}"
+            f"{result['p99_ms']:>10.3f}{result['throughput']:>14.1f}"
+            f"  {result['throughput_unit']}",
+            file=stream,
+        )
+
+
+def _report_comparison(rows, threshold, stream=sys.stdout):
+    """Print the comparison; True when nothing regressed."""
+    regressions = [row for row in rows if row["regressed"]]
+    for row in rows:
+        flag = "REGRESSED" if row["regressed"] else ""
+        print(
+            f"{row['benchmark']:<40}{row['metric']:<12}{row['baseline']:>12.3f}"
+            f"{row['current']:>12.3f}{row['change']:>+9.1%}  {flag}",
+            file=stream,
+        )
+    print(
+        f"{len(regressions)} of {len(rows)} metrics regressed "
+        f"by more than {threshold:.0%}",
+        file=stream,
+    )
+    return not regressions
+
+
+def _load(path):
+    with open(path) as file_obj:
+        return json.load(file_obj)
+
+
+def _add_threshold_arguments(parser):
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--min-delta-ms", type=float, default=0.05)
+    parser.add_argument(
+        "--metrics", help="comma-separated subset of p50_ms,p95_ms,p99_ms,throughput"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument("--suites", default=",".join(SUITES))
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument(
+        "--concurrency", default=",".join(str(level) for level in CONCURRENCY)
+    )
+    run.add_argument("--requests", type=int, default=500, help="per concurrency level")
+    run.add_argument(
+        "--cache", action="store_true", help="keep the API's prediction cache on"
+    )
+    run.add_argument("--models", help="comma-separated models to train")
+    run.add_argument("--training-repeat", type=int, default=1)
+    run.add_argument("--output", help="write the JSON here instead of stdout")
+    run.add_argument("--baseline", help="compare against this earlier run")
+
+    _add_threshold_arguments(run)
+
+    compare_runs = commands.add_parser("compare", help="compare two runs")
+    compare_runs.add_argument("baseline")
+    compare_runs.add_argument("current")
+    _add_threshold_arguments(compare_runs)
+    args = parser.parse_args()
+    metrics = tuple(args.metrics.split(",")) if args.metrics else None
+
+    if args.command == "compare":
+        rows = compare(
+            _load(args.baseline),
+            _load(args.current),
+            args.threshold,
+            args.min_delta_ms,
+            metrics,
+        )
+        sys.exit(0 if _report_comparison(rows, args.threshold) else 1)
+
+    warnings.filterwarnings("ignore")
+    suites = args.suites.split(",")
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites {sorted(unknown)}, expected {SUITES}")
+
+    os.chdir(PROJECT_ROOT)
+    features = load_features()
+    results = {}
+    if "serving" in suites:
+        from src.pipeline.predict_pipeline import PredictPipeline
+
+        results.update(bench_serving(PredictPipeline(), features, args.repeat))
+    if "api" in suites:
+        levels = [int(level) for level in args.concurrency.split(",")]
+        results.update(bench_api(features, levels, args.requests, args.cache))
+    if "training" in suites:
+        models = args.models.split(",") if args.models else None
+        results.update(bench_training(models, args.training_repeat))
+
+    run_result = {"environment": environment(), "benchmarks": results}
+    _print_results(results, sys.stderr)
+    if args.output:
+        with open(args.output, "w") as file_obj:
+            json.dump(run_result, file_obj, indent=2)
+    else:
+        print(json.dumps(run_result, indent=2))
+
+    if args.baseline:
+        rows = compare(
+            _load(args.baseline), run_result, args.threshold, args.min_delta_ms, metrics
+        )
+        if not _report_comparison(rows, args.threshold, sys.stderr):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Traffic for load tests: synthetic StudentInput requests drawn from the
+distributions in artifacts/raw.csv, and the JSONL traffic files written by
+the API's request recorder (see src/pipeline/request_recorder.py).
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_DATA_PATH = os.path.join(PROJECT_ROOT, "artifacts", "raw.csv")
+PREDICT_PATH = "/api/predict"
+
+CATEGORICAL_COLUMNS = (
+    "gender",
+    "race_ethnicity",
+    "parental_level_of_education",
+    "lunch",
+    "test_preparation_course",
+)
+SCORE_COLUMNS = ("reading_score", "writing_score")
+
+
+class TrafficModel:
+    """
+    The category frequencies and (reading, writing) score pairs observed in
+    the training data. Categories are drawn independently by frequency; the
+    two scores are drawn together because they are strongly correlated.
+    """
+
+    def __init__(self, df):
+        self.categories = {}
+        for column in CATEGORICAL_COLUMNS:
+            counts = df[column].value_counts(normalize=True).sort_index()
+            self.categories[column] = (counts.index.tolist(), counts.to_numpy())
+        self.scores = df[list(SCORE_COLUMNS)].to_numpy()
+
+    @classmethod
+    def from_csv(cls, path=RAW_DATA_PATH):
+        return cls(pd.read_csv(path))
+
+    def records(self, count, seed=None):
+        """`count` StudentInput dicts."""
+        rng = np.random.default_rng(seed)
+        columns = {
+            column: rng.choice(len(values), size=count, p=probabilities)
+            for column, (values, probabilities) in self.categories.items()
+        }
+        scores = self.scores[rng.integers(len(self.scores), size=count)]
+        records = []
+        for i in range(count):
+            record = {
+                column: self.categories[column][0][columns[column][i]]
+                for column in CATEGORICAL_COLUMNS
+            }
+            for j, column in enumerate(SCORE_COLUMNS):
+                record[column] = int(scores[i, j])
+            records.append(record)
+        return records
+
+    def requests(self, count, seed=None, distinct=0):
+        """
+        `count` POST /api/predict requests. With `distinct`, the bodies are
+        drawn from a pool of that many records, so about 1 - distinct/count
+        of them repeat an earlier input (useful to exercise the cache).
+        """
+        rng = np.random.default_rng(seed)
+        if distinct:
+            pool = self.records(distinct, rng)
+            bodies = [pool[i] for i in rng.integers(len(pool), size=count)]
+        else:
+            bodies = self.records(count, rng)
+        return [
+            {"method": "POST", "path": PREDICT_PATH, "variant": None, "body": body}
+            for body in bodies
+        ]
+
+
+def read_traffic(path):
+    """The requests in a JSONL traffic file, in file order."""
+    entries = []
+    with open(path) as file_obj:
+        for line in file_obj:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    return entries
+
+
+def write_traffic(path, entries):
+    dir_path = os.path.dirname(path)
+    if dir_path:
+        os.makedirs(dir_path, exist_ok=True)
+    with open(path, "w") as file_obj:
+        for entry in entries:
+            file_obj.write(json.dumps(entry) + "\n")
@@ -0,0 +1,37 @@
+# Gunicorn settings for the API; see "Serving Concurrency" in the README.
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+worker_class = "uvicorn.workers.UvicornWorker"
+# One worker per core is the starting point: each runs its own event loop
+# and INFERENCE_POOL_SIZE inference threads
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Import main.py in the master so workers are forked with the model already
+# in memory and share its pages copy-on-write
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from src.pipeline.model_registry import model_registry
+
+    try:
+        model_registry.load()
+    except Exception as e:
+        server.log.warning(f"Model preload failed, workers will load it: {e}")
+        return
+    # Move everything allocated so far out of the collector's reach, so GC
+    # passes in the workers don't touch (and copy) the shared pages
+    gc.freeze()
+    server.log.info(f"Preloaded model {model_registry.info().get('version')}")
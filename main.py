@@ -1,18 +1,52 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager, suppress
 from pydantic import BaseModel, Field
 import numpy as np
 import pandas as pd
 import logging
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+import asyncio
+from functools import partial
+import io
+import json
 import uvicorn
 
-from src.pipeline.predict_pipeline import CustomData, PredictPipeline
+try:
+    import orjson
+except ImportError:  # responses fall back to the standard library encoder
+    orjson = None
+
+from src.pipeline.predict_pipeline import (
+    PRIMARY_VARIANT,
+    PredictPipeline,
+    confidence_level,
+    validate_record,
+)
+from src.pipeline.model_registry import model_registry
+from src.pipeline.micro_batcher import MicroBatcher, QueueFullError
+from src.pipeline.inference_pool import InferencePool, InferenceTimeoutError
+from src.pipeline.health import ModelHealth
+from src.pipeline.model_router import ModelRouter, UnknownVariantError, VARIANT_HEADER
+from src.metrics import (
+    BATCH_SIZE,
+    CONTENT_TYPE,
+    INFERENCE_POOL_IN_FLIGHT,
+    MICRO_BATCH_QUEUE_DEPTH,
+    MODEL_LOADED,
+    STAGE_LATENCY,
+    MetricsMiddleware,
+    metrics,
+)
+from src.pipeline.prediction_cache import prediction_cache
+from src.pipeline.request_recorder import RequestRecordingMiddleware, request_recorder
 from src.exception import CustomException
+from src.logger import setup_logging
 
-logging.basicConfig(level=logging.INFO)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 class StudentInput(BaseModel):
@@ -24,24 +58,125 @@ class StudentInput(BaseModel):
     reading_score: float = Field(..., ge=0, le=100, description="Reading score (0-100)")
     writing_score: float = Field(..., ge=0, le=100, description="Writing score (0-100)")
 
+class PredictionInterval(BaseModel):
+    lower: float
+    upper: float
+    # Share of true scores an interval like this contains
+    coverage: float
+
 class PredictionResponse(BaseModel):
     predicted_math_score: float
     confidence_level: str
-    input_data: Dict[str, Any]
+    # None when the model has no calibrated intervals
+    prediction_interval: Optional[PredictionInterval] = None
+    # Omitted when PREDICT_ECHO_INPUT=false or ?echo_input=false
+    input_data: Optional[Dict[str, Any]] = None
+    status: str
+    model_variant: Optional[str] = None
+
+class BatchPredictionResult(BaseModel):
+    index: int
+    status: str
+    predicted_math_score: Optional[float] = None
+    confidence_level: Optional[str] = None
+    prediction_interval: Optional[PredictionInterval] = None
+    error: Optional[str] = None
+
+class BatchPredictionResponse(BaseModel):
+    results: List[BatchPredictionResult]
+    total: int
+    succeeded: int
+    failed: int
+    model_version: Optional[str]
     status: str
+    model_variant: Optional[str] = None
+
+BATCH_MAX_RECORDS = int(os.environ.get("BATCH_MAX_RECORDS", 100000))
+BATCH_CHUNK_SIZE = int(os.environ.get("BATCH_CHUNK_SIZE", 5000))
+BATCH_RESULT_FIELDS = tuple(BatchPredictionResult.model_fields)
+# Whether /api/predict responses repeat the request body by default
+PREDICT_ECHO_INPUT = os.environ.get("PREDICT_ECHO_INPUT", "true").strip().lower() in (
+    "1", "true", "yes", "on"
+)
+
+class FastJSONResponse(JSONResponse):
+    """
+    Prediction responses are plain dicts of str/float/int, so they are
+    encoded directly (with orjson when installed) instead of being
+    validated against the response model and walked by jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
 
 prediction_pipeline = PredictPipeline()
+# All model work runs here, never on the event loop
+inference_pool = InferencePool(prediction_pipeline)
+micro_batcher = MicroBatcher(partial(inference_pool.run, "predict_batch", use_cache=True))
+model_health = ModelHealth(model_registry, inference_pool)
+# A/B routing between the primary model and the runner-up variants
+model_router = ModelRouter(prediction_pipeline)
+
+# Read at scrape time, so the hot path doesn't update them
+MICRO_BATCH_QUEUE_DEPTH.set_function(lambda: micro_batcher.queue_depth)
+INFERENCE_POOL_IN_FLIGHT.set_function(lambda: inference_pool.in_flight)
+MODEL_LOADED.set_function(lambda: model_registry.is_loaded)
+
+def parse_batch_records(body: bytes, content_type: str, filename: str = ""):
+    """Turn a JSON array, NDJSON or CSV payload into a DataFrame."""
+    content_type = content_type.split(";")[0].strip().lower()
+    filename = filename.lower()
+
+    if content_type == "text/csv" or filename.endswith(".csv"):
+        return pd.read_csv(io.BytesIO(body), dtype={"reading_score": object, "writing_score": object})
+
+    if content_type in ("application/x-ndjson", "application/jsonl") or filename.endswith((".ndjson", ".jsonl")):
+        records = [json.loads(line) for line in body.splitlines() if line.strip()]
+    else:
+        records = json.loads(body)
+        if isinstance(records, dict):
+            records = records.get("records", [])
+
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise ValueError("Expected a list of records")
+    return pd.DataFrame.from_records(records)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting up Student Performance Predictor API")
     try:
+        # With gunicorn's preload_app the master already loaded the model and
+        # the forked workers share its pages; only load when that did not happen
+        if not model_registry.is_loaded:
+            await asyncio.to_thread(model_registry.load)
+        await asyncio.to_thread(inference_pool.start)
+        # One canary prediction per model version gates /readyz
+        await asyncio.to_thread(model_health.run_canary)
+        # Variants named in MODEL_ROUTING_WEIGHTS / MODEL_SHADOW
+        await asyncio.to_thread(model_router.load)
         logger.info("API startup completed successfully")
     except Exception as e:
         logger.error(f"Startup failed: {e}")
+
+    # Poll the artifacts and hot-swap a retrained model without a restart
+    watcher = asyncio.create_task(model_registry.watch())
+    variant_watcher = asyncio.create_task(model_router.watch())
+
+    if micro_batcher.config.enabled:
+        await micro_batcher.start()
     
     yield
     
+    await micro_batcher.stop()
+    inference_pool.stop()
+    model_router.stop()
+    request_recorder.close()
+    for task in (watcher, variant_watcher):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
     logger.info("Shutting down Student Performance Predictor API")
 
 app = FastAPI(
@@ -51,6 +186,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+app.add_middleware(MetricsMiddleware)
+# Copies sampled requests to REQUEST_RECORD_PATH for load-test replay
+app.add_middleware(RequestRecordingMiddleware, recorder=request_recorder)
+
 # Add CORS middleware for frontend communication
 app.add_middleware(
     CORSMiddleware,
@@ -69,39 +208,85 @@ async def root():
         "health": "/health"
             }
 
+def check_categories(pipeline, record):
+    """
+    Reject categorical values the fitted encoder has never seen with a 422,
+    before they reach the model and fail there.
+    """
+    if not pipeline.registry.is_loaded:
+        return
+    errors = validate_record(record, pipeline.registry.get().categories)
+    if errors:
+        raise RequestValidationError([
+            {"type": "value_error", "loc": ("body", column), "msg": message, "input": record[column]}
+            for column, message in errors.items()
+        ])
+
+def prediction_response(score, record, variant, echo_input, level=None, interval=None):
+    content = {
+        "predicted_math_score": round(score, 2),
+        "confidence_level": level or confidence_level(score),
+        "prediction_interval": interval,
+    }
+    if PREDICT_ECHO_INPUT if echo_input is None else echo_input:
+        content["input_data"] = record
+    content["status"] = "success"
+    content["model_variant"] = variant
+    return FastJSONResponse(content)
+
+def choose_variant(request: Request):
+    try:
+        return model_router.choose(request.headers.get(VARIANT_HEADER))
+    except UnknownVariantError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/api/predict", response_model=PredictionResponse)
-async def predict_api(student_data: StudentInput):
+async def predict_api(student_data: StudentInput, request: Request, echo_input: Optional[bool] = None):
+    record = student_data.model_dump()
+    variant = choose_variant(request)
+    pipeline = model_router.pipeline(variant)
+    check_categories(pipeline, record)
+    predicted_score = None
     try:
-        data = CustomData(
-            gender=student_data.gender,
-            race_ethnicity=student_data.race_ethnicity,
-            parental_level_of_education=student_data.parental_level_of_education,
-            lunch=student_data.lunch,
-            test_preparation_course=student_data.test_preparation_course,
-            reading_score=student_data.reading_score,
-            writing_score=student_data.writing_score
-        )
-        
-        pred_df = data.get_data_as_data_frame()
-        results = prediction_pipeline.predict(pred_df)
-        predicted_score = float(results[0])
+        # Repeated inputs are answered from the cache without touching the model;
+        # a variant that isn't loaded yet is loaded on the pool instead
+        if pipeline.registry.is_loaded:
+            predicted_score = pipeline.cached_prediction(record, shared=False)
+            # The shared cache is SQLite, so it is read off the event loop
+            if predicted_score is None and pipeline.cache.shared is not None:
+                predicted_score = await asyncio.to_thread(pipeline.shared_cached_prediction, record)
+    except Exception as e:
+        logger.warning(f"Prediction cache lookup failed: {str(e)}")
+
+    if predicted_score is None and micro_batcher.running and variant == PRIMARY_VARIANT:
+        return await predict_micro_batched(record, echo_input)
+
+    try:
+        if predicted_score is None:
+            predicted_score = await inference_pool.run_on(pipeline, "predict_record", record)
+        model_router.served(variant)
+        # Challengers score the same input in the background
+        model_router.shadow([record], [round(predicted_score, 2)], served=variant)
         
-        if predicted_score >= 80:
-            confidence = "High"
-        elif predicted_score >= 60:
-            confidence = "Medium"
-        else:
-            confidence = "Low"
+        # Lazy %-formatting: nothing is formatted unless debug logging is on
+        logger.debug("prediction served score=%.2f", predicted_score)
         
-        logger.info(f"API prediction successful: {predicted_score}")
+        with STAGE_LATENCY.time(stage="serialization"):
+            return prediction_response(
+                predicted_score, record, variant, echo_input,
+                interval=pipeline.prediction_interval(predicted_score)
+            )
         
-        return PredictionResponse(
-            predicted_math_score=round(predicted_score, 2),
-            confidence_level=confidence,
-            input_data=student_data.dict(),
-            status="success"
+    except QueueFullError as e:
+        logger.warning(f"API prediction rejected: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "1"}
         )
-        
+    except InferenceTimeoutError as e:
+        logger.error(f"API prediction timed out: {str(e)}")
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         logger.error(f"API prediction failed: {str(e)}")
         raise HTTPException(
@@ -109,19 +294,159 @@ async def predict_api(student_data: StudentInput):
             detail=f"Prediction failed: {str(e)}"
         )
 
+async def predict_micro_batched(record: Dict[str, Any], echo_input: Optional[bool] = None):
+    try:
+        result = await micro_batcher.submit(record)
+    except QueueFullError as e:
+        logger.warning(f"API prediction rejected: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    except InferenceTimeoutError as e:
+        logger.error(f"API prediction timed out: {str(e)}")
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        logger.error(f"API prediction failed: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Prediction failed: {str(e)}"
+        )
+
+    model_router.served(PRIMARY_VARIANT)
+    model_router.shadow([record], [result["predicted_math_score"]])
+
+    with STAGE_LATENCY.time(stage="serialization"):
+        return prediction_response(
+            result["predicted_math_score"], record, PRIMARY_VARIANT, echo_input,
+            level=result["confidence_level"],
+            interval=result["prediction_interval"]
+        )
+
+@app.post("/api/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch_api(request: Request):
+    content_type = request.headers.get("content-type", "application/json")
+    try:
+        if content_type.startswith("multipart/form-data"):
+            form = await request.form()
+            upload = form.get("file")
+            if upload is None:
+                raise ValueError("Multipart upload must include a 'file' field")
+            body = await upload.read()
+            records = parse_batch_records(body, upload.content_type or "", upload.filename or "")
+        else:
+            records = parse_batch_records(await request.body(), content_type)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch payload: {str(e)}")
+
+    if len(records) > BATCH_MAX_RECORDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(records)} records exceeds limit of {BATCH_MAX_RECORDS}"
+        )
+
+    variant = choose_variant(request)
+    pipeline = model_router.pipeline(variant)
+    BATCH_SIZE.observe(len(records), source="batch")
+    try:
+        results = await inference_pool.run_on(
+            pipeline, "predict_batch", records, BATCH_CHUNK_SIZE,
+            timeout=inference_pool.config.batch_timeout
+        )
+        succeeded = sum(1 for result in results if result["status"] == "success")
+        model_router.served(variant)
+        model_router.shadow(
+            records,
+            [result.get("predicted_math_score", np.nan) for result in results],
+            served=variant
+        )
+
+        logger.info("batch prediction served succeeded=%d total=%d", succeeded, len(results))
+
+        return FastJSONResponse({
+            # Every result carries every field, as BatchPredictionResult did
+            "results": [
+                {field: result.get(field) for field in BATCH_RESULT_FIELDS}
+                for result in results
+            ],
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "model_version": pipeline.registry.info().get("version"),
+            "status": "success",
+            "model_variant": variant,
+        })
+
+    except QueueFullError as e:
+        logger.warning(f"API batch prediction rejected: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    except InferenceTimeoutError as e:
+        logger.error(f"API batch prediction timed out: {str(e)}")
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        logger.error(f"API batch prediction failed: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch prediction failed: {str(e)}"
+        )
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
+
+@app.get("/models")
+async def models_endpoint():
+    # Variants with their R2, live and offline cost, shadow deltas and the
+    # cheapest one within MODEL_R2_TOLERANCE of the best
+    return model_router.report()
+
+@app.get("/batching-stats")
+async def batching_stats():
+    return micro_batcher.stats()
+
+@app.get("/cache-stats")
+async def cache_stats():
+    return prediction_cache.stats()
+
+@app.get("/pool-stats")
+async def pool_stats():
+    return inference_pool.stats()
+
+@app.get("/livez")
+async def livez():
+    # Liveness only: the process is up and the event loop is responsive
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readyz(response: Response):
+    if model_health.needs_canary():
+        # First probe after a hot reload checks the new version once
+        await asyncio.to_thread(model_health.run_canary)
+    report = model_health.readiness()
+    if not report["ready"]:
+        response.status_code = 503
+    return report
+
 @app.get("/health")
 async def health_check():
     try:
-        test_pipeline = PredictPipeline()
-        
         return {
             "status": "healthy", 
             "message": "Student Performance Predictor API is running",
             "version": "2.0.0",
             "endpoints": {
                 "api_endpoint": "/api/predict",
+                "batch_endpoint": "/api/predict/batch",
                 "documentation": "/docs",
-                "health": "/health"
+                "health": "/health",
+                "models": "/models",
+                "liveness": "/livez",
+                "readiness": "/readyz"
             }
         }
     except Exception as e:
@@ -138,6 +463,7 @@ async def model_info():
                 "trained_model": "artifacts/model.pkl",
                 "preprocessor": "artifacts/preprocessor.pkl"
             },
+            "loaded_model": model_registry.info(),
             "supported_features": [
                 "gender", "race_ethnicity", "parental_level_of_education",
                 "lunch", "test_preparation_course", "reading_score", "writing_score"
@@ -0,0 +1,470 @@
+import bz2
+import gzip
+import hashlib
+import importlib.metadata
+import lzma
+import os
+import platform
+import shutil
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.components.compiled_model import (
+    COMPILED_MODEL_KINDS,
+    PREPROCESSOR_PREFIX,
+    load_compiled_model,
+)
+from src.components.compiled_preprocessor import CompiledPreprocessor
+from src.components.prediction_intervals import PredictionIntervals
+from src.exception import CustomException
+from src.logger import logging, setup_logging
+from src.utils import (
+    artifact_version,
+    load_json,
+    load_object,
+    pickle_globals,
+    pickle_packages,
+    save_json,
+)
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+INTERVALS_FILE = "prediction_intervals.json"
+TARGET_COLUMN = "math_score"
+
+# Compression applies to the pickles only; arrays stay raw so they can be
+# memory-mapped. Values are (file suffix, opener).
+PICKLE_COMPRESSIONS = {
+    "none": ("", open),
+    "gzip": (".gz", gzip.open),
+    "bz2": (".bz2", bz2.open),
+    "lzma": (".xz", lzma.open),
+}
+
+# Always recorded, next to the distributions the pickles reference
+CORE_DISTRIBUTIONS = ("numpy", "pandas", "scikit-learn")
+
+
+@dataclass
+class ArtifactBundleConfig:
+    trained_model_file_path: str = os.path.join("artifacts", "model.pkl")
+    preprocessor_obj_file_path: str = os.path.join("artifacts", "preprocessor.pkl")
+    compiled_model_file_path: str = os.path.join("artifacts", "model_compiled.npz")
+    model_report_file_path: str = os.path.join("artifacts", "model_report.json")
+    prediction_intervals_file_path: str = field(
+        default_factory=lambda: os.environ.get(
+            "PREDICTION_INTERVALS_PATH",
+            os.path.join("artifacts", "prediction_intervals.json"),
+        )
+    )
+    bundle_dir: str = field(
+        default_factory=lambda: os.environ.get(
+            "ARTIFACT_BUNDLE_DIR", os.path.join("artifacts", "bundles")
+        )
+    )
+    compression: str = field(
+        default_factory=lambda: os.environ.get("ARTIFACT_COMPRESSION", "none")
+    )
+    # Bundles kept for rollback, including the current one (0 keeps all)
+    keep: int = field(
+        default_factory=lambda: int(os.environ.get("ARTIFACT_BUNDLE_KEEP", 3))
+    )
+
+
+class BundleIntegrityError(ValueError):
+    """Raised when a bundle's files do not match its manifest."""
+
+
+def _file_digest(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file_obj:
+        for block in iter(lambda: file_obj.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _content_hash(files):
+    """One hash over every file entry of a manifest."""
+    digest = hashlib.sha256()
+    for name in sorted(files):
+        entry = files[name]
+        digest.update(f"{name}\0{entry['sha256']}\0{entry['bytes']}\n".encode())
+    return digest.hexdigest()
+
+
+def _array_file(key):
+    """'preprocessor/categories_0' -> 'arrays/preprocessor.categories_0.npy'"""
+    return "arrays/" + key.replace("/", ".") + ".npy"
+
+
+def library_versions(packages=()):
+    """
+    Installed versions of Python, the core libraries and the distributions
+    that provide `packages` (top-level module names such as "sklearn").
+    """
+    distributions = set(CORE_DISTRIBUTIONS)
+    if packages:
+        provided = importlib.metadata.packages_distributions()
+        for package in packages:
+            distributions.update(provided.get(package, [package]))
+
+    versions = {"python": platform.python_version()}
+    for name in sorted(distributions):
+        try:
+            versions[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def library_mismatches(libraries):
+    """
+    {name: (recorded, installed)} for every library whose installed version
+    differs from `libraries`. Python is compared on major.minor only.
+    """
+    mismatches = {}
+    for name, recorded in libraries.items():
+        if name == "python":
+            installed = platform.python_version()
+            if recorded.split(".")[:2] != installed.split(".")[:2]:
+                mismatches[name] = (recorded, installed)
+            continue
+        try:
+            installed = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            installed = None
+        if installed != recorded:
+            mismatches[name] = (recorded, installed)
+    return mismatches
+
+
+def feature_schema(preprocessor):
+    """Input columns of a fitted ColumnTransformer, with their categories."""
+    numerical, categorical = [], {}
+    for name, transformer, columns in getattr(preprocessor, "transformers_", []):
+        if name == "remainder":
+            continue
+        steps = [step for _, step in getattr(transformer, "steps", [("", transformer)])]
+        encoders = [step for step in steps if hasattr(step, "categories_")]
+        if encoders:
+            for column, values in zip(columns, encoders[0].categories_):
+                categorical[str(column)] = [str(value) for value in values]
+        else:
+            numerical.extend(str(column) for column in columns)
+    return {
+        "numerical_columns": numerical,
+        "categorical_columns": categorical,
+        "target_column": TARGET_COLUMN,
+    }
+
+
+def training_metrics(report):
+    """The best model's scores from model_report.json, or {} without one."""
+    if not report:
+        return {}
+    best = report.get("best_model")
+    result = report.get("models", {}).get(best, {})
+    return {
+        "best_model": best,
+        "test_r2": report.get("best_model_score"),
+        "train_r2": result.get("train_score"),
+        "fit_time": result.get("fit_time"),
+        "best_params": result.get("best_params"),
+        "trained_at": report.get("created_at"),
+    }
+
+
+def current_bundle_path(bundle_dir):
+    """Directory of the bundle that CURRENT points at, or None."""
+    try:
+        with open(os.path.join(bundle_dir, CURRENT_FILE)) as file_obj:
+            version = file_obj.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(bundle_dir, version) if version else None
+
+
+class ArtifactBundle:
+    """
+    A bundle directory opened for reading: the model and preprocessor
+    pickles, the compiled scorer's arrays as one .npy file each, the
+    prediction intervals when they were calibrated, and a manifest with
+    library versions, the feature schema, training metrics and the sha256
+    of every file.
+    """
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+
+    @property
+    def version(self):
+        return self.manifest["version"]
+
+    @classmethod
+    def open(cls, path, verify=True):
+        """
+        Read a bundle's manifest and, with `verify`, check every file against
+        it. Raises when the bundle is incomplete, altered or too new.
+        """
+        try:
+            manifest = load_json(os.path.join(path, MANIFEST_FILE))
+            if manifest.get("format_version", 0) > BUNDLE_FORMAT_VERSION:
+                raise BundleIntegrityError(
+                    f"Bundle format {manifest.get('format_version')} at {path} "
+                    f"is newer than {BUNDLE_FORMAT_VERSION}"
+                )
+            bundle = cls(path, manifest)
+            if verify:
+                bundle.verify()
+            return bundle
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _file_path(self, name):
+        return os.path.join(self.path, *name.split("/"))
+
+    def verify(self):
+        files = self.manifest["files"]
+        if _content_hash(files) != self.manifest["content_hash"]:
+            raise BundleIntegrityError(
+                f"Manifest of bundle {self.version} does not match its content hash"
+            )
+        for name, entry in files.items():
+            file_path = self._file_path(name)
+            if os.path.getsize(file_path) != entry["bytes"] or (
+                _file_digest(file_path) != entry["sha256"]
+            ):
+                raise BundleIntegrityError(
+                    f"{name} in bundle {self.version} does not match its manifest"
+                )
+
+    def read_pickles(self):
+        """
+        (model bytes, preprocessor bytes), decompressed. Their hash has to
+        match the bundle version, which is computed like artifact_version().
+        """
+        _, opener = PICKLE_COMPRESSIONS[self.manifest["compression"]]
+        payloads = []
+        digest = hashlib.sha256()
+        for role in ("model", "preprocessor"):
+            with opener(self._file_path(self.manifest["pickles"][role]), "rb") as f:
+                payloads.append(f.read())
+            digest.update(payloads[-1])
+        if digest.hexdigest()[:12] != self.version:
+            raise BundleIntegrityError(
+                f"Pickles in bundle {self.version} hash to {digest.hexdigest()[:12]}"
+            )
+        return tuple(payloads)
+
+    def arrays(self):
+        """The compiled scorer's arrays, memory-mapped read-only."""
+        return {
+            key: np.load(self._file_path(name), mmap_mode="r", allow_pickle=False)
+            for key, name in self.manifest["arrays"].items()
+        }
+
+    def compiled_model(self):
+        """
+        The compiled scorer built on the memory-mapped arrays, so processes
+        serving the same bundle share its pages. None when the model was not
+        compiled.
+        """
+        kind = self.manifest["compiled"]
+        if kind is None:
+            return None
+        data = self.arrays()
+        preprocessor = CompiledPreprocessor.from_arrays(
+            data, prefix=PREPROCESSOR_PREFIX
+        )
+        return COMPILED_MODEL_KINDS[kind].from_arrays(preprocessor, data)
+
+    def prediction_intervals(self):
+        """The bundled PredictionIntervals, or None when none were calibrated."""
+        name = self.manifest.get("intervals")
+        if name is None:
+            return None
+        return PredictionIntervals.from_dict(load_json(self._file_path(name)))
+
+    def library_mismatches(self):
+        return library_mismatches(self.manifest["libraries"])
+
+
+class ArtifactBundler:
+    def __init__(self, config: ArtifactBundleConfig = None):
+        self.artifact_bundle_config = config or ArtifactBundleConfig()
+
+    def _write_files(
+        self, staging, model_bytes, preprocessor_bytes, compiled, intervals
+    ):
+        config = self.artifact_bundle_config
+        suffix, opener = PICKLE_COMPRESSIONS[config.compression]
+        pickles = {}
+        for role, payload in (
+            ("model", model_bytes),
+            ("preprocessor", preprocessor_bytes),
+        ):
+            pickles[role] = f"{role}.pkl{suffix}"
+            with opener(os.path.join(staging, pickles[role]), "wb") as file_obj:
+                file_obj.write(payload)
+
+        arrays = {}
+        if compiled is not None:
+            data = compiled.preprocessor.to_arrays(prefix=PREPROCESSOR_PREFIX)
+            data.update(compiled.to_arrays())
+            os.makedirs(os.path.join(staging, "arrays"))
+            for key, value in data.items():
+                arrays[key] = _array_file(key)
+                np.save(
+                    os.path.join(staging, *arrays[key].split("/")),
+                    value,
+                    allow_pickle=False,
+                )
+
+        intervals_file = None
+        if intervals is not None:
+            intervals_file = INTERVALS_FILE
+            save_json(os.path.join(staging, intervals_file), intervals.to_dict())
+        return pickles, arrays, intervals_file
+
+    def _point_current(self, version):
+        bundle_dir = self.artifact_bundle_config.bundle_dir
+        pointer = os.path.join(bundle_dir, CURRENT_FILE)
+        staging = f"{pointer}.{os.getpid()}.tmp"
+        with open(staging, "w") as file_obj:
+            file_obj.write(version + "\n")
+        os.replace(staging, pointer)
+
+    def _prune(self, current):
+        config = self.artifact_bundle_config
+        if config.keep <= 0:
+            return
+        bundles = []
+        for name in os.listdir(config.bundle_dir):
+            manifest_path = os.path.join(config.bundle_dir, name, MANIFEST_FILE)
+            if name != current and os.path.exists(manifest_path):
+                bundles.append((os.path.getmtime(manifest_path), name))
+        for _, name in sorted(bundles, reverse=True)[config.keep - 1 :]:
+            shutil.rmtree(os.path.join(config.bundle_dir, name))
+            logging.info(f"Removed old artifact bundle {name}")
+
+    def initiate_bundle_creation(self):
+        """
+        Write model.pkl, preprocessor.pkl, the compiled arrays and any
+        up-to-date prediction intervals as a versioned bundle under
+        bundle_dir/<version>, then point CURRENT at it. Both steps are atomic
+        renames, so a serving process never sees a partial bundle. Returns
+        the bundle path.
+        """
+        try:
+            config = self.artifact_bundle_config
+            if config.compression not in PICKLE_COMPRESSIONS:
+                raise ValueError(
+                    f"Unknown artifact compression {config.compression!r}, "
+                    f"expected one of {tuple(PICKLE_COMPRESSIONS)}"
+                )
+
+            with open(config.trained_model_file_path, "rb") as file_obj:
+                model_bytes = file_obj.read()
+            with open(config.preprocessor_obj_file_path, "rb") as file_obj:
+                preprocessor_bytes = file_obj.read()
+            version = artifact_version(
+                config.trained_model_file_path, config.preprocessor_obj_file_path
+            )
+            preprocessor = load_object(file_path=config.preprocessor_obj_file_path)
+            compiled = load_compiled_model(
+                config.compiled_model_file_path, source_version=version
+            )
+            intervals = PredictionIntervals.load(
+                config.prediction_intervals_file_path, source_version=version
+            )
+            report = (
+                load_json(config.model_report_file_path)
+                if os.path.exists(config.model_report_file_path)
+                else None
+            )
+
+            bundle_path = os.path.join(config.bundle_dir, version)
+            staging = os.path.join(config.bundle_dir, f".{version}.{os.getpid()}.tmp")
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+
+            pickles, arrays, intervals_file = self._write_files(
+                staging, model_bytes, preprocessor_bytes, compiled, intervals
+            )
+            files = {}
+            names = list(pickles.values()) + list(arrays.values())
+            if intervals_file is not None:
+                names.append(intervals_file)
+            for name in names:
+                file_path = os.path.join(staging, *name.split("/"))
+                files[name] = {
+                    "sha256": _file_digest(file_path),
+                    "bytes": os.path.getsize(file_path),
+                }
+
+            model_references = pickle_globals(model_bytes)
+            references = model_references + pickle_globals(preprocessor_bytes)
+            save_json(
+                os.path.join(staging, MANIFEST_FILE),
+                {
+                    "format_version": BUNDLE_FORMAT_VERSION,
+                    "version": version,
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "model_class": (
+                        model_references[0][1] if model_references else None
+                    ),
+                    "compiled": compiled.kind if compiled is not None else None,
+                    "compression": config.compression,
+                    "libraries": library_versions(pickle_packages(references)),
+                    "schema": feature_schema(preprocessor),
+                    "metrics": training_metrics(report),
+                    "pickles": pickles,
+                    "arrays": arrays,
+                    "intervals": intervals_file,
+                    "files": files,
+                    "content_hash": _content_hash(files),
+                },
+            )
+
+            # A rebuild of the same version (new metrics or compression)
+            # replaces the old directory; open memory maps keep their inode
+            if os.path.isdir(bundle_path):
+                shutil.rmtree(bundle_path)
+            os.replace(staging, bundle_path)
+            self._point_current(version)
+            self._prune(version)
+
+            logging.info(f"Artifact bundle {version} saved at {bundle_path}")
+            return bundle_path
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    setup_logging()
+    parser = argparse.ArgumentParser(
+        description="Bundle the trained artifacts or verify the current bundle"
+    )
+    parser.add_argument(
+        "--verify", action="store_true", help="only verify the current bundle"
+    )
+    args = parser.parse_args()
+
+    config = ArtifactBundleConfig()
+    if not args.verify:
+        print(
+            f"Artifact bundle saved at: {ArtifactBundler(config).initiate_bundle_creation()}"
+        )
+    bundle = ArtifactBundle.open(current_bundle_path(config.bundle_dir))
+    print(f"Bundle {bundle.version} verified: {len(bundle.manifest['files'])} files")
+    for name, (recorded, installed) in bundle.library_mismatches().items():
+        print(f"  {name}: bundled with {recorded}, installed {installed}")
@@ -0,0 +1,358 @@
+import os
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.components.compiled_preprocessor import (
+    CompiledPreprocessor,
+    is_missing,
+    column_getter,
+    compile_preprocessor,
+)
+from src.exception import CustomException
+from src.logger import logging, setup_logging
+from src.utils import artifact_version, load_object, save_arrays
+
+PREPROCESSOR_PREFIX = "preprocessor/"
+
+
+@dataclass
+class CompiledModelConfig:
+    trained_model_file_path: str = os.path.join("artifacts", "model.pkl")
+    preprocessor_obj_file_path: str = os.path.join("artifacts", "preprocessor.pkl")
+    compiled_model_file_path: str = os.path.join("artifacts", "model_compiled.npz")
+
+
+class CompiledLinearModel:
+    """
+    Standardize + one-hot + linear model fused into additive weights: a bias,
+    one weight per numerical column and one additive term per category.
+    """
+
+    kind = "linear"
+
+    def __init__(self, preprocessor, bias, numerical_weights, category_weights):
+        self.preprocessor = preprocessor
+        self.bias = float(bias)
+        self.numerical_weights = np.asarray(numerical_weights, dtype=np.float64)
+        self.category_weights = np.asarray(category_weights, dtype=np.float64)
+        self._numerical_weights = self.numerical_weights.tolist()
+        self._category_weights = self.category_weights.tolist()
+
+    @classmethod
+    def from_estimator(cls, preprocessor, model):
+        coef = np.ravel(model.coef_).astype(np.float64)
+        intercept = float(np.ravel(model.intercept_)[0])
+        if coef.shape[0] != preprocessor.n_features_out:
+            raise ValueError("Model coefficients do not match the preprocessor")
+
+        n_numerical = len(preprocessor.numerical_columns)
+        num_coef = coef[:n_numerical]
+        bias = (
+            intercept
+            - np.sum(
+                num_coef * preprocessor.numerical_mean / preprocessor.numerical_scale
+            )
+            + np.dot(coef[n_numerical:], preprocessor.cold_values[n_numerical:])
+        )
+        category_weights = coef * (preprocessor.hot_values - preprocessor.cold_values)
+        category_weights[:n_numerical] = 0.0
+        return cls(
+            preprocessor,
+            bias=bias,
+            numerical_weights=num_coef / preprocessor.numerical_scale,
+            category_weights=category_weights,
+        )
+
+    def predict(self, X):
+        n_rows, column = column_getter(X)
+        preprocessor = self.preprocessor
+        if n_rows == 1 and isinstance(X, (dict, list, tuple)):
+            row = {name: column(name)[0] for name in preprocessor.feature_names_in}
+            return np.array([self.predict_row(row)])
+
+        preds = np.full(n_rows, self.bias)
+
+        for index, name in enumerate(preprocessor.numerical_columns):
+            values = np.array(column(name), dtype=np.float64)
+            values[np.isnan(values)] = preprocessor.numerical_fill[index]
+            preds += values * self.numerical_weights[index]
+
+        for index, name in enumerate(preprocessor.categorical_columns):
+            codes = preprocessor.encode(index, name, column(name))
+            preds += np.where(codes >= 0, self.category_weights[codes], 0.0)
+
+        return preds
+
+    def predict_row(self, row):
+        """Score one record with plain float arithmetic."""
+        preprocessor = self.preprocessor
+        score = self.bias
+        for index, name in enumerate(preprocessor.numerical_columns):
+            value = row.get(name)
+            if is_missing(value) or value != value:
+                value = preprocessor.numerical_fill[index]
+            score += float(value) * self._numerical_weights[index]
+
+        for index, name in enumerate(preprocessor.categorical_columns):
+            value = row.get(name)
+            if is_missing(value):
+                value = preprocessor.categorical_fill[index]
+            position = preprocessor.lookups[index].get(value)
+            if position is None:
+                if preprocessor.ignore_unknown:
+                    continue
+                raise ValueError(
+                    f"Found unknown categories ['{value}'] in column '{name}'"
+                )
+            score += self._category_weights[position]
+        return score
+
+    def to_arrays(self):
+        return {
+            "bias": np.array(self.bias),
+            "numerical_weights": self.numerical_weights,
+            "category_weights": self.category_weights,
+        }
+
+    @classmethod
+    def from_arrays(cls, preprocessor, data):
+        return cls(
+            preprocessor,
+            bias=float(data["bias"]),
+            numerical_weights=data["numerical_weights"],
+            category_weights=data["category_weights"],
+        )
+
+
+class CompiledTreeEnsemble:
+    """
+    Decision trees flattened into contiguous node arrays. All rows walk all
+    trees at once, one tree level per step; leaves point at themselves so
+    rows that finish early simply stay put.
+    """
+
+    kind = "tree_ensemble"
+
+    def __init__(
+        self,
+        preprocessor,
+        feature,
+        threshold,
+        children_left,
+        children_right,
+        value,
+        roots,
+        max_depth,
+        base,
+        combine,
+    ):
+        self.preprocessor = preprocessor
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.children_left = np.asarray(children_left, dtype=np.intp)
+        self.children_right = np.asarray(children_right, dtype=np.intp)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.base = float(base)
+        self.combine = str(combine)
+
+    @classmethod
+    def from_estimator(cls, preprocessor, model):
+        name = type(model).__name__
+        if name in ("DecisionTreeRegressor", "ExtraTreeRegressor"):
+            trees, scale, base, combine = [model], 1.0, 0.0, "mean"
+        elif name in ("RandomForestRegressor", "ExtraTreesRegressor"):
+            trees, scale, base, combine = list(model.estimators_), 1.0, 0.0, "mean"
+        elif name == "GradientBoostingRegressor":
+            if model.loss != "squared_error" or not hasattr(model.init_, "constant_"):
+                raise ValueError("Only squared-error boosting with a constant init")
+            trees = [stage[0] for stage in model.estimators_]
+            scale = model.learning_rate
+            base = float(np.ravel(model.init_.constant_)[0])
+            combine = "sum"
+        else:
+            raise ValueError(f"{name} cannot be compiled into a tree ensemble")
+
+        feature, threshold, left, right, value, roots = [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        for estimator in trees:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left < 0
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            left.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            right.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            value.append(tree.value[:, 0, 0] * scale)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += tree.node_count
+
+        return cls(
+            preprocessor,
+            feature=np.concatenate(feature),
+            threshold=np.concatenate(threshold),
+            children_left=np.concatenate(left),
+            children_right=np.concatenate(right),
+            value=np.concatenate(value),
+            roots=roots,
+            max_depth=max_depth,
+            base=base,
+            combine=combine,
+        )
+
+    def predict(self, X):
+        # sklearn evaluates trees on float32 features
+        features = self.preprocessor.transform(X).astype(np.float32)
+        n_rows = features.shape[0]
+        rows = np.arange(n_rows)[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (n_rows, len(self.roots))).copy()
+
+        for _ in range(self.max_depth):
+            go_left = features[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(
+                go_left, self.children_left[nodes], self.children_right[nodes]
+            )
+
+        leaf_values = self.value[nodes]
+        if self.combine == "mean":
+            return leaf_values.sum(axis=1) / len(self.roots)
+        return self.base + leaf_values.sum(axis=1)
+
+    def to_arrays(self):
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "children_left": self.children_left,
+            "children_right": self.children_right,
+            "value": self.value,
+            "roots": self.roots,
+            "max_depth": np.array(self.max_depth),
+            "base": np.array(self.base),
+            "combine": np.array(self.combine),
+        }
+
+    @classmethod
+    def from_arrays(cls, preprocessor, data):
+        return cls(
+            preprocessor,
+            feature=data["feature"],
+            threshold=data["threshold"],
+            children_left=data["children_left"],
+            children_right=data["children_right"],
+            value=data["value"],
+            roots=data["roots"],
+            max_depth=int(data["max_depth"]),
+            base=float(data["base"]),
+            combine=str(data["combine"]),
+        )
+
+
+COMPILED_MODEL_KINDS = {
+    CompiledLinearModel.kind: CompiledLinearModel,
+    CompiledTreeEnsemble.kind: CompiledTreeEnsemble,
+}
+
+
+def compile_model(preprocessor, model):
+    """
+    Fuse a fitted preprocessor and best_model into a single scoring object
+    that takes raw records. Raises ValueError for unsupported models.
+    """
+    preprocessor = compile_preprocessor(preprocessor)
+    if hasattr(model, "coef_") and hasattr(model, "intercept_"):
+        return CompiledLinearModel.from_estimator(preprocessor, model)
+    if hasattr(model, "tree_") or hasattr(model, "estimators_"):
+        return CompiledTreeEnsemble.from_estimator(preprocessor, model)
+    raise ValueError(f"{type(model).__name__} cannot be compiled")
+
+
+def save_compiled_model(file_path, compiled, source_version):
+    arrays = compiled.preprocessor.to_arrays(prefix=PREPROCESSOR_PREFIX)
+    arrays.update(compiled.to_arrays())
+    arrays["kind"] = np.array(compiled.kind)
+    arrays["source_version"] = np.array(source_version)
+    save_arrays(file_path, arrays)
+
+
+def load_compiled_model(file_path, source_version=None):
+    """
+    Load a compiled model artifact. Returns None when it is missing or was
+    compiled from different pickles than `source_version`.
+    """
+    try:
+        if not os.path.exists(file_path):
+            return None
+
+        with np.load(file_path, allow_pickle=False) as data:
+            if source_version is not None and str(data["source_version"]) != (
+                source_version
+            ):
+                logging.warning(f"Ignoring stale compiled model at {file_path}")
+                return None
+
+            preprocessor = CompiledPreprocessor.from_arrays(
+                data, prefix=PREPROCESSOR_PREFIX
+            )
+            compiled_cls = COMPILED_MODEL_KINDS[str(data["kind"])]
+            return compiled_cls.from_arrays(preprocessor, data)
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+class ModelCompiler:
+    def __init__(self):
+        self.compiled_model_config = CompiledModelConfig()
+
+    def initiate_model_compilation(self, validation_features=None):
+        """
+        Compile model.pkl + preprocessor.pkl into model_compiled.npz. Returns
+        the artifact path, or None when the model type is not supported and
+        serving has to stay on the pickles.
+        """
+        try:
+            config = self.compiled_model_config
+            model = load_object(file_path=config.trained_model_file_path)
+            preprocessor = load_object(file_path=config.preprocessor_obj_file_path)
+
+            try:
+                compiled = compile_model(preprocessor, model)
+            except ValueError as e:
+                logging.info(f"Serving from pickles, model not compiled: {e}")
+                if os.path.exists(config.compiled_model_file_path):
+                    os.remove(config.compiled_model_file_path)
+                return None
+
+            if validation_features is not None:
+                expected = model.predict(preprocessor.transform(validation_features))
+                error = np.max(np.abs(compiled.predict(validation_features) - expected))
+                if error > 1e-6:
+                    raise ValueError(f"Compiled model deviates by {error}")
+
+            save_compiled_model(
+                config.compiled_model_file_path,
+                compiled,
+                source_version=artifact_version(
+                    config.trained_model_file_path, config.preprocessor_obj_file_path
+                ),
+            )
+            logging.info(f"Compiled {compiled.kind} model saved successfully")
+            return config.compiled_model_file_path
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    setup_logging()
+    test_df = pd.read_csv(os.path.join("artifacts", "test.csv"))
+    compiled_path = ModelCompiler().initiate_model_compilation(
+        validation_features=test_df.drop(columns=["math_score"])
+    )
+    print(f"Compiled model saved at: {compiled_path}")
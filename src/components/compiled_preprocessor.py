@@ -0,0 +1,350 @@
+import os
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.exception import CustomException
+from src.logger import logging, setup_logging
+from src.utils import load_object, save_arrays
+
+
+@dataclass
+class CompiledPreprocessorConfig:
+    preprocessor_obj_file_path: str = os.path.join("artifacts", "preprocessor.pkl")
+    compiled_preprocessor_file_path: str = os.path.join(
+        "artifacts", "preprocessor_compiled.npz"
+    )
+
+
+def is_missing(value):
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def column_getter(X):
+    """
+    Return (n_rows, get_column) for a dict, a list of dicts, a mapping of
+    columns (including a DataFrame) or a NumPy structured array.
+    """
+    if isinstance(X, dict) and not any(
+        isinstance(value, (list, tuple, np.ndarray)) for value in X.values()
+    ):
+        X = [X]
+
+    if isinstance(X, (list, tuple)):
+        rows = X
+        return len(rows), lambda column: [row.get(column) for row in rows]
+
+    if isinstance(X, np.ndarray) and X.dtype.names:
+        return len(X), lambda column: X[column]
+
+    first = next(iter(X.keys()))
+    return len(X[first]), lambda column: X[column]
+
+
+class CompiledPreprocessor:
+    """
+    NumPy-only equivalent of the fitted ColumnTransformer.
+
+    Medians, means, scales and one-hot lookup tables are held in plain arrays
+    and applied with the same floating point operations sklearn uses, so the
+    output is bit-identical to preprocessor.transform without building a
+    DataFrame or going through sklearn's dispatch.
+    """
+
+    def __init__(
+        self,
+        numerical_columns,
+        numerical_fill,
+        numerical_mean,
+        numerical_scale,
+        categorical_columns,
+        categories,
+        categorical_fill,
+        hot_values,
+        cold_values,
+        ignore_unknown=False,
+    ):
+        self.numerical_columns = [str(column) for column in numerical_columns]
+        self.numerical_fill = np.asarray(numerical_fill, dtype=np.float64)
+        self.numerical_mean = np.asarray(numerical_mean, dtype=np.float64)
+        self.numerical_scale = np.asarray(numerical_scale, dtype=np.float64)
+        self.categorical_columns = [str(column) for column in categorical_columns]
+        self.categories = [np.asarray(values) for values in categories]
+        self.categorical_fill = list(categorical_fill)
+        self.hot_values = np.asarray(hot_values, dtype=np.float64)
+        self.cold_values = np.asarray(cold_values, dtype=np.float64)
+        self.ignore_unknown = bool(ignore_unknown)
+
+        n_numerical = len(self.numerical_columns)
+        self.offsets = np.cumsum(
+            [n_numerical] + [len(values) for values in self.categories]
+        )[:-1]
+        self.lookups = [
+            {value: offset + index for index, value in enumerate(values.tolist())}
+            for offset, values in zip(self.offsets, self.categories)
+        ]
+        self.n_features_out = n_numerical + int(
+            sum(len(values) for values in self.categories)
+        )
+        self.feature_names_in = self.numerical_columns + self.categorical_columns
+
+        self._numerical_params = list(
+            zip(
+                self.numerical_fill.tolist(),
+                self.numerical_mean.tolist(),
+                self.numerical_scale.tolist(),
+            )
+        )
+        self._hot_list = self.hot_values.tolist()
+
+    def transform(self, X):
+        n_rows, column = column_getter(X)
+        if n_rows == 1 and isinstance(X, (dict, list, tuple)):
+            return self.transform_row(
+                {name: column(name)[0] for name in self.feature_names_in}
+            )
+
+        out = np.empty((n_rows, self.n_features_out), dtype=np.float64)
+        out[:] = self.cold_values
+
+        for index, name in enumerate(self.numerical_columns):
+            values = np.array(column(name), dtype=np.float64)
+            values[np.isnan(values)] = self.numerical_fill[index]
+            out[:, index] = (values - self.numerical_mean[index]) / (
+                self.numerical_scale[index]
+            )
+
+        rows = np.arange(n_rows)
+        for index, name in enumerate(self.categorical_columns):
+            codes = self.encode(index, name, column(name))
+            known = codes >= 0
+            out[rows[known], codes[known]] = self.hot_values[codes[known]]
+
+        return out
+
+    def transform_row(self, row, out=None):
+        """
+        Transform a single record into a (1, n_features) matrix, optionally
+        writing into a preallocated buffer.
+        """
+        if out is None:
+            out = self.cold_values.copy()[np.newaxis, :]
+        else:
+            out[0, :] = self.cold_values
+        target = out[0]
+
+        for index, name in enumerate(self.numerical_columns):
+            fill, mean, scale = self._numerical_params[index]
+            value = row.get(name)
+            value = fill if is_missing(value) else float(value)
+            if value != value:
+                value = fill
+            target[index] = (value - mean) / scale
+
+        for index, name in enumerate(self.categorical_columns):
+            value = row.get(name)
+            if is_missing(value):
+                value = self.categorical_fill[index]
+            position = self.lookups[index].get(value)
+            if position is None:
+                if self.ignore_unknown:
+                    continue
+                raise ValueError(
+                    f"Found unknown categories ['{value}'] in column '{name}'"
+                )
+            target[position] = self._hot_list[position]
+
+        return out
+
+    def encode(self, index, name, values):
+        if hasattr(values, "tolist"):
+            values = values.tolist()
+        lookup = self.lookups[index]
+        fill = self.categorical_fill[index]
+        codes = np.empty(len(values), dtype=np.intp)
+        for row, value in enumerate(values):
+            if is_missing(value):
+                value = fill
+            position = lookup.get(value, -1)
+            if position < 0 and not self.ignore_unknown:
+                raise ValueError(
+                    f"Found unknown categories ['{value}'] in column '{name}'"
+                )
+            codes[row] = position
+        return codes
+
+    def to_arrays(self, prefix=""):
+        arrays = {
+            "numerical_columns": np.array(self.numerical_columns, dtype=str),
+            "numerical_fill": self.numerical_fill,
+            "numerical_mean": self.numerical_mean,
+            "numerical_scale": self.numerical_scale,
+            "categorical_columns": np.array(self.categorical_columns, dtype=str),
+            "categorical_fill": np.array(self.categorical_fill, dtype=str),
+            "hot_values": self.hot_values,
+            "cold_values": self.cold_values,
+            "ignore_unknown": np.array(self.ignore_unknown),
+        }
+        for index, values in enumerate(self.categories):
+            arrays[f"categories_{index}"] = np.array(values.tolist(), dtype=str)
+        return {prefix + key: value for key, value in arrays.items()}
+
+    @classmethod
+    def from_arrays(cls, data, prefix=""):
+        categorical_columns = data[prefix + "categorical_columns"].tolist()
+        return cls(
+            numerical_columns=data[prefix + "numerical_columns"].tolist(),
+            numerical_fill=data[prefix + "numerical_fill"],
+            numerical_mean=data[prefix + "numerical_mean"],
+            numerical_scale=data[prefix + "numerical_scale"],
+            categorical_columns=categorical_columns,
+            categories=[
+                np.array(data[f"{prefix}categories_{index}"].tolist(), dtype=object)
+                for index in range(len(categorical_columns))
+            ],
+            categorical_fill=data[prefix + "categorical_fill"].tolist(),
+            hot_values=data[prefix + "hot_values"],
+            cold_values=data[prefix + "cold_values"],
+            ignore_unknown=bool(data[prefix + "ignore_unknown"]),
+        )
+
+    def save(self, file_path):
+        try:
+            save_arrays(file_path, self.to_arrays())
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @classmethod
+    def load(cls, file_path):
+        try:
+            with np.load(file_path, allow_pickle=False) as data:
+                return cls.from_arrays(data)
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+def _pipeline_steps(transformer):
+    return [step for _, step in getattr(transformer, "steps", [("", transformer)])]
+
+
+def compile_preprocessor(preprocessor):
+    """
+    Compile a fitted ColumnTransformer built by
+    DataTransformation.get_data_transformer_object into a
+    CompiledPreprocessor. Raises ValueError for layouts it cannot reproduce
+    exactly.
+    """
+    if isinstance(preprocessor, CompiledPreprocessor):
+        return preprocessor
+
+    numerical = []
+    categorical = []
+
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == "remainder":
+            if transformer != "drop":
+                raise ValueError("Only remainder='drop' can be compiled")
+            continue
+
+        steps = _pipeline_steps(transformer)
+        kinds = [type(step).__name__ for step in steps]
+        encoders = [step for step in steps if hasattr(step, "categories_")]
+
+        if not encoders:
+            if kinds not in (["SimpleImputer", "StandardScaler"], ["StandardScaler"]):
+                raise ValueError(f"Unsupported numerical pipeline: {kinds}")
+            if categorical:
+                raise ValueError("Numerical columns must precede categorical ones")
+            numerical.append((columns, steps))
+        else:
+            if kinds[-2:] != ["OneHotEncoder", "StandardScaler"] or len(kinds) > 3:
+                raise ValueError(f"Unsupported categorical pipeline: {kinds}")
+            categorical.append((columns, steps))
+
+    numerical_columns, numerical_fill = [], []
+    numerical_mean, numerical_scale = [], []
+    for columns, steps in numerical:
+        imputer = steps[0] if len(steps) == 2 else None
+        scaler = steps[-1]
+        n_columns = len(columns)
+        numerical_columns.extend(columns)
+        numerical_fill.extend(
+            imputer.statistics_ if imputer is not None else [np.nan] * n_columns
+        )
+        numerical_mean.extend(scaler.mean_ if scaler.with_mean else np.zeros(n_columns))
+        numerical_scale.extend(scaler.scale_ if scaler.with_std else np.ones(n_columns))
+
+    categorical_columns, categories, categorical_fill = [], [], []
+    hot_values, cold_values = [], []
+    ignore_unknown = False
+    for columns, steps in categorical:
+        imputer = steps[0] if len(steps) == 3 else None
+        encoder, scaler = steps[-2], steps[-1]
+        if getattr(encoder, "drop_idx_", None) is not None:
+            raise ValueError("OneHotEncoder with drop cannot be compiled")
+        ignore_unknown = ignore_unknown or encoder.handle_unknown != "error"
+
+        n_outputs = sum(len(values) for values in encoder.categories_)
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(n_outputs)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n_outputs)
+        if scaler.with_mean:
+            hot = (1.0 - mean) / scale
+            cold = (0.0 - mean) / scale
+        else:
+            # sklearn scales sparse one-hot columns by the reciprocal
+            hot = 1.0 * (1 / scale)
+            cold = np.zeros(n_outputs)
+
+        categorical_columns.extend(columns)
+        categories.extend(encoder.categories_)
+        categorical_fill.extend(
+            imputer.statistics_ if imputer is not None else [None] * len(columns)
+        )
+        hot_values.extend(hot)
+        cold_values.extend(cold)
+
+    n_numerical = len(numerical_columns)
+    return CompiledPreprocessor(
+        numerical_columns=numerical_columns,
+        numerical_fill=numerical_fill,
+        numerical_mean=numerical_mean,
+        numerical_scale=numerical_scale,
+        categorical_columns=categorical_columns,
+        categories=categories,
+        categorical_fill=categorical_fill,
+        hot_values=np.r_[np.zeros(n_numerical), hot_values],
+        cold_values=np.r_[np.zeros(n_numerical), cold_values],
+        ignore_unknown=ignore_unknown,
+    )
+
+
+class PreprocessorCompiler:
+    def __init__(self):
+        self.compiled_preprocessor_config = CompiledPreprocessorConfig()
+
+    def initiate_preprocessor_compilation(self, preprocessor_path=None):
+        try:
+            preprocessor_path = (
+                preprocessor_path
+                or self.compiled_preprocessor_config.preprocessor_obj_file_path
+            )
+            logging.info(f"Compiling preprocessor from {preprocessor_path}")
+            compiled = compile_preprocessor(load_object(file_path=preprocessor_path))
+
+            compiled.save(
+                self.compiled_preprocessor_config.compiled_preprocessor_file_path
+            )
+            logging.info("Compiled preprocessor saved successfully")
+            return self.compiled_preprocessor_config.compiled_preprocessor_file_path
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    setup_logging()
+    compiled_path = PreprocessorCompiler().initiate_preprocessor_compilation()
+    print(f"Compiled preprocessor saved at: {compiled_path}")
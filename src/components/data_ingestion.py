@@ -1,11 +1,15 @@
 import os
 import sys
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from src.exception import CustomException
 from src.logger import logging
+from src.utils import TableWriter, save_table, table_path
 
 
 @dataclass
@@ -13,6 +17,45 @@ class DataIngestionConfig:
     train_data_path: str = os.path.join("artifacts", "train.csv")
     test_data_path: str = os.path.join("artifacts", "test.csv")
     raw_data_path: str = os.path.join("artifacts", "raw.csv")
+    source_data_path: str = os.path.join("notebook", "data", "stud.csv")
+    test_size: float = 0.2
+    random_state: int = 42
+    # csv | parquet | npy (memory-mappable column files, no extra dependency)
+    artifact_format: str = field(
+        default_factory=lambda: os.environ.get("ARTIFACT_FORMAT", "csv")
+    )
+    # Rows per chunk for streaming ingestion; 0 loads the whole file at once
+    chunk_size: int = field(
+        default_factory=lambda: int(os.environ.get("STREAMING_CHUNK_SIZE", 0))
+    )
+    # Column identifying a row for the streaming split (default: row number)
+    id_column: Optional[str] = None
+
+    def __post_init__(self):
+        self.train_data_path = table_path(self.train_data_path, self.artifact_format)
+        self.test_data_path = table_path(self.test_data_path, self.artifact_format)
+        self.raw_data_path = table_path(self.raw_data_path, self.artifact_format)
+
+
+def _mix64(values):
+    # splitmix64 finalizer: spreads nearby keys over the whole uint64 range
+    with np.errstate(over="ignore"):
+        values = values + np.uint64(0x9E3779B97F4A7C15)
+        values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return values ^ (values >> np.uint64(31))
+
+
+def hash_split(keys, test_size, random_state):
+    """
+    Deterministic train/test assignment: a row goes to the test split when
+    the seeded hash of its key falls below `test_size`. The result depends
+    only on the key, not on chunking or row order.
+    """
+    hashes = pd.util.hash_array(np.asarray(keys))
+    seed = _mix64(np.array([random_state], dtype=np.uint64))[0]
+    hashes = _mix64(hashes ^ seed)
+    return (hashes >> np.uint64(11)) * 2.0**-53 < test_size
 
 
 class DataIngestion:
@@ -22,8 +65,11 @@ class DataIngestion:
     def initiate_data_ingestion(self):
         logging.info("Data ingestion process started")
         try:
+            if self.ingestion_config.chunk_size > 0:
+                return self.stream_data_ingestion()
+
             # Load the original dataset
-            df = pd.read_csv("notebook\\data\\stud.csv")
+            df = pd.read_csv(self.ingestion_config.source_data_path)
             logging.info("Dataset successfully loaded into DataFrame")
 
             # Create artifacts directory
@@ -32,22 +78,25 @@ class DataIngestion:
             )
 
             # Save original data as backup
-            df.to_csv(self.ingestion_config.raw_data_path, index=False, header=True)
+            save_table(self.ingestion_config.raw_data_path, df)
             logging.info("Original data saved as backup")
 
             # Split the data into training and testing sets
             logging.info("Initiating train-test split")
-            train_set, test_set = train_test_split(df, test_size=0.2, random_state=42)
+            train_set, test_set = train_test_split(
+                df,
+                test_size=self.ingestion_config.test_size,
+                random_state=self.ingestion_config.random_state,
+            )
 
             # Save split datasets
-            train_set.to_csv(
-                self.ingestion_config.train_data_path, index=False, header=True
-            )
-            test_set.to_csv(
-                self.ingestion_config.test_data_path, index=False, header=True
-            )
+            save_table(self.ingestion_config.train_data_path, train_set)
+            save_table(self.ingestion_config.test_data_path, test_set)
 
-            logging.info("Data ingestion completed successfully")
+            logging.info(
+                f"Data ingestion completed successfully "
+                f"({self.ingestion_config.artifact_format} artifacts)"
+            )
             return (
                 self.ingestion_config.train_data_path,
                 self.ingestion_config.test_data_path,
@@ -55,3 +104,40 @@ class DataIngestion:
 
         except Exception as e:
             raise CustomException(e, sys)
+
+    def stream_data_ingestion(self):
+        """
+        Read the source in chunks and append each chunk's rows to the raw,
+        train and test artifacts, assigning rows with hash_split so memory
+        stays bounded by the chunk size.
+        """
+        try:
+            config = self.ingestion_config
+            logging.info(
+                f"Streaming {config.source_data_path} in chunks of "
+                f"{config.chunk_size} rows"
+            )
+            with TableWriter(config.raw_data_path) as raw, TableWriter(
+                config.train_data_path
+            ) as train, TableWriter(config.test_data_path) as test:
+                for chunk in pd.read_csv(
+                    config.source_data_path, chunksize=config.chunk_size
+                ):
+                    keys = (
+                        chunk[config.id_column]
+                        if config.id_column
+                        else np.arange(raw.n_rows, raw.n_rows + len(chunk))
+                    )
+                    is_test = hash_split(keys, config.test_size, config.random_state)
+                    raw.write(chunk)
+                    train.write(chunk[~is_test])
+                    test.write(chunk[is_test])
+
+            logging.info(
+                f"Data ingestion completed successfully: {train.n_rows} train and "
+                f"{test.n_rows} test rows ({config.artifact_format} artifacts)"
+            )
+            return config.train_data_path, config.test_data_path
+
+        except Exception as e:
+            raise CustomException(e, sys)
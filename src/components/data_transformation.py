@@ -1,8 +1,7 @@
 import sys
 import os
 import numpy as np
-import pandas as pd
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.impute import SimpleImputer
@@ -10,12 +9,28 @@ from sklearn.pipeline import Pipeline
 
 from src.exception import CustomException
 from src.logger import logging
-from src.utils import save_object
+from src.utils import NpyAppender, iter_table, load_table, save_object
+from src.components.streaming_preprocessor import StreamingPreprocessorFit
+from src.components.compiled_preprocessor import compile_preprocessor
 
 
 @dataclass
 class DataTransformationConfig:
     preprocessor_obj_file_path: str = os.path.join("artifacts", "preprocessor.pkl")
+    compiled_preprocessor_file_path: str = os.path.join(
+        "artifacts", "preprocessor_compiled.npz"
+    )
+    train_array_file_path: str = os.path.join("artifacts", "train_array.npy")
+    test_array_file_path: str = os.path.join("artifacts", "test_array.npy")
+    # Rows transformed per step when writing the feature matrices
+    chunk_size: int = field(
+        default_factory=lambda: int(os.environ.get("STREAMING_CHUNK_SIZE", 0))
+        or 100_000
+    )
+    # Fit the preprocessor in one pass over chunks instead of in memory
+    streaming: bool = field(
+        default_factory=lambda: int(os.environ.get("STREAMING_CHUNK_SIZE", 0)) > 0
+    )
 
 
 class DataTransformation:
@@ -70,12 +85,38 @@ class DataTransformation:
         except Exception as e:
             raise CustomException(e, sys)
 
+    def write_feature_matrix(self, file_path, preprocessor, chunks, target_column):
+        """
+        Transform each chunk and append it to a .npy matrix whose last column
+        is the target, so the full dense features never need a second
+        in-memory copy. Returns a read-only memory map of the file.
+        """
+        n_features = len(preprocessor.get_feature_names_out())
+        matrix = NpyAppender(file_path, np.float64, row_shape=(n_features + 1,))
+        try:
+            for chunk in chunks:
+                rows = np.empty((len(chunk), n_features + 1), dtype=np.float64)
+                rows[:, :-1] = preprocessor.transform(
+                    chunk.drop(columns=[target_column])
+                )
+                rows[:, -1] = chunk[target_column]
+                matrix.append(rows)
+        finally:
+            matrix.close()
+        return np.load(file_path, mmap_mode="r")
+
     def initiate_data_transformation(self, train_path, test_path):
+        """
+        Fit the preprocessor on the training split and write both splits'
+        feature matrices (target in the last column) as .npy files. The
+        returned arrays are read-only memory maps of those files.
+
+        In streaming mode neither split is loaded whole: the preprocessor
+        statistics come from one pass over the training chunks and the
+        matrices are written chunk by chunk.
+        """
         try:
-            # Load training and testing data
-            train_df = pd.read_csv(train_path)
-            test_df = pd.read_csv(test_path)
-            logging.info("Training and testing datasets loaded successfully")
+            config = self.data_transformation_config
 
             # Get preprocessing object
             logging.info("Obtaining preprocessing object")
@@ -84,42 +125,71 @@ class DataTransformation:
             # Define target column
             target_column_name = "math_score"
 
-            # Separate input features and target feature for training set
-            input_feature_train_df = train_df.drop(columns=[target_column_name], axis=1)
-            target_feature_train_df = train_df[target_column_name]
-
-            # Separate input features and target feature for testing set
-            input_feature_test_df = test_df.drop(columns=[target_column_name], axis=1)
-            target_feature_test_df = test_df[target_column_name]
+            if config.streaming:
+                logging.info(
+                    f"Fitting preprocessor in one pass over chunks of "
+                    f"{config.chunk_size} rows"
+                )
+                preprocessing_obj = StreamingPreprocessorFit(preprocessing_obj).fit(
+                    chunk.drop(columns=[target_column_name])
+                    for chunk in iter_table(train_path, config.chunk_size)
+                )
+
+                def chunks(path):
+                    return iter_table(path, config.chunk_size)
+
+            else:
+                # Load training and testing data (CSV, Parquet or npy columns)
+                tables = {
+                    train_path: load_table(train_path),
+                    test_path: load_table(test_path),
+                }
+                logging.info("Training and testing datasets loaded successfully")
+                preprocessing_obj.fit(
+                    tables[train_path].drop(columns=[target_column_name])
+                )
+
+                def chunks(path):
+                    df = tables[path]
+                    return (
+                        df.iloc[start : start + config.chunk_size]
+                        for start in range(0, len(df), config.chunk_size)
+                    )
 
             logging.info(
                 "Applying preprocessing object on training and testing dataframes"
             )
 
-            # Apply transformations
-            input_feature_train_arr = preprocessing_obj.fit_transform(
-                input_feature_train_df
+            # Write the transformed features next to the target
+            train_arr = self.write_feature_matrix(
+                config.train_array_file_path,
+                preprocessing_obj,
+                chunks(train_path),
+                target_column_name,
+            )
+            test_arr = self.write_feature_matrix(
+                config.test_array_file_path,
+                preprocessing_obj,
+                chunks(test_path),
+                target_column_name,
             )
-            input_feature_test_arr = preprocessing_obj.transform(input_feature_test_df)
-
-            # Combine processed features with target variable
-            train_arr = np.c_[
-                input_feature_train_arr, np.array(target_feature_train_df)
-            ]
-            test_arr = np.c_[input_feature_test_arr, np.array(target_feature_test_df)]
-
-            logging.info("Preprocessing object saved successfully")
 
             # Save preprocessing object
             save_object(
-                file_path=self.data_transformation_config.preprocessor_obj_file_path,
+                file_path=config.preprocessor_obj_file_path,
                 obj=preprocessing_obj,
             )
+            logging.info("Preprocessing object saved successfully")
+
+            # Export the NumPy-only fast path used at inference time
+            compile_preprocessor(preprocessing_obj).save(
+                config.compiled_preprocessor_file_path
+            )
 
             return (
                 train_arr,
                 test_arr,
-                self.data_transformation_config.preprocessor_obj_file_path,
+                config.preprocessor_obj_file_path,
             )
 
         except Exception as e:
@@ -0,0 +1,373 @@
+import math
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold, ParameterGrid, ParameterSampler
+
+from src.exception import CustomException
+from src.logger import logging
+from src.stage_cache import StageCache, estimator_fingerprint, fingerprint
+
+SEARCH_STRATEGIES = ("grid", "random", "halving")
+
+
+@dataclass
+class ModelSearchConfig:
+    strategy: str = field(
+        default_factory=lambda: os.environ.get("MODEL_SEARCH_STRATEGY", "grid")
+    )
+    cv: int = 3
+    n_jobs: int = field(
+        default_factory=lambda: int(os.environ.get("MODEL_SEARCH_N_JOBS", -1))
+    )
+    # Budgets apply per model; `budgets` overrides them by model name, e.g.
+    # {"Gradient Boosting": {"max_trials": 40, "time_budget": 120}}
+    max_trials: Optional[int] = None
+    time_budget: Optional[float] = None
+    budgets: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    n_iter: int = 10
+    halving_factor: int = 3
+    random_state: int = 42
+    # Fit the winning candidate on the full training set inside the pool
+    refit: bool = True
+
+
+def _seed_estimator(model, random_state):
+    updates = {}
+    if "random_state" in model.get_params():
+        updates["random_state"] = random_state
+    if type(model).__name__.startswith("CatBoost"):
+        updates["random_seed"] = random_state
+    if updates:
+        model.set_params(**updates)
+    return model
+
+
+def _single_thread_estimator(model):
+    """
+    Keep the estimator to one thread when the search itself runs in a
+    process pool, so workers don't oversubscribe the cores.
+    """
+    if "n_jobs" in model.get_params():
+        model.set_params(n_jobs=1)
+    if type(model).__name__.startswith("CatBoost"):
+        model.set_params(thread_count=1)
+    return model
+
+
+def _fit_and_score(estimator, params, X, y, train, test, deadline):
+    if deadline is not None and time.time() > deadline:
+        return None
+    estimator = clone(estimator).set_params(**params)
+    start = time.perf_counter()
+    estimator.fit(X[train], y[train])
+    fit_time = time.perf_counter() - start
+    score = r2_score(y[test], estimator.predict(X[test]))
+    return score, fit_time
+
+
+def _refit(estimator, params, X, y):
+    estimator = clone(estimator).set_params(**params)
+    start = time.perf_counter()
+    estimator.fit(X, y)
+    return estimator, time.perf_counter() - start
+
+
+class ModelSearch:
+    """
+    Hyperparameter search for many models at once. Every (model, candidate,
+    fold) fit is a task on one shared process pool, interleaved across models
+    so they progress concurrently; each model can be capped by a trial count
+    and a wall-clock budget.
+    """
+
+    def __init__(
+        self,
+        config: Optional[ModelSearchConfig] = None,
+        stage_cache: Optional[StageCache] = None,
+    ):
+        self.config = config or ModelSearchConfig()
+        self.stage_cache = stage_cache
+        if self.config.strategy not in SEARCH_STRATEGIES:
+            raise ValueError(
+                f"Unknown search strategy {self.config.strategy!r}, "
+                f"expected one of {SEARCH_STRATEGIES}"
+            )
+
+    def _budget(self, model_name, key):
+        return self.config.budgets.get(model_name, {}).get(
+            key, getattr(self.config, key)
+        )
+
+    def _candidates(self, model_name, param_grid):
+        config = self.config
+        max_trials = self._budget(model_name, "max_trials")
+        if not param_grid:
+            return [{}]
+
+        grid = list(ParameterGrid(param_grid))
+        if config.strategy == "random":
+            n_iter = min(len(grid), max_trials or config.n_iter)
+            return list(
+                ParameterSampler(
+                    param_grid, n_iter=n_iter, random_state=config.random_state
+                )
+            )
+
+        if max_trials and len(grid) > max_trials:
+            rng = np.random.RandomState(config.random_state)
+            keep = np.sort(rng.choice(len(grid), size=int(max_trials), replace=False))
+            grid = [grid[index] for index in keep]
+        return grid
+
+    def run(self, X, y, models, params):
+        """
+        Returns, per model name, the best parameters and their mean CV R2
+        along with trial counts and fit time. With `refit`, the entry also
+        holds `best_estimator`, already fitted on all of X and y.
+
+        Models with a single candidate skip cross-validation: there is
+        nothing to choose between, so their CV score is None. A model whose
+        time budget ran out before any candidate finished every fold has
+        `best_params` None and a NaN CV score, and is not refit.
+
+        With a stage cache, every fold score and refit is keyed by the data,
+        the estimator's parameters and the candidate, so only combinations
+        that were never evaluated before are fitted.
+        """
+        try:
+            config = self.config
+            X = np.asarray(X)
+            y = np.asarray(y)
+            single_threaded = config.n_jobs != 1
+            folds = list(KFold(n_splits=config.cv).split(X))
+
+            rng = np.random.RandomState(config.random_state)
+            shuffled_folds = [(rng.permutation(train), test) for train, test in folds]
+
+            data_key = None
+            if self.stage_cache is not None and self.stage_cache.enabled:
+                data_key = fingerprint(X, y, config.cv, config.random_state)
+
+            # The search configures its own copies; the caller's estimators
+            # are left as they were. Refits start from the seeded copy, CV
+            # fits from one that is also held to a single thread
+            seeded, searched = {}, {}
+            state = {}
+            start = time.time()
+            for model_name, model in models.items():
+                seeded[model_name] = _seed_estimator(clone(model), config.random_state)
+                model_key = (
+                    fingerprint(data_key, estimator_fingerprint(seeded[model_name]))
+                    if data_key
+                    else None
+                )
+                searched[model_name] = seeded[model_name]
+                if single_threaded:
+                    searched[model_name] = _single_thread_estimator(
+                        clone(seeded[model_name])
+                    )
+                time_budget = self._budget(model_name, "time_budget")
+                candidates = self._candidates(model_name, params.get(model_name, {}))
+                skip_cv = len(candidates) == 1
+                state[model_name] = {
+                    "candidates": candidates,
+                    "alive": [] if skip_cv else list(range(len(candidates))),
+                    "skip_cv": skip_cv,
+                    "scores": {},
+                    "fit_time": 0.0,
+                    "n_fits": 0,
+                    "n_cached": 0,
+                    "model_key": model_key,
+                    "timed_out": False,
+                    "deadline": start + time_budget if time_budget else None,
+                    "complete": {},
+                    "rounds": self._n_rounds(len(candidates)),
+                }
+
+            n_rounds = max(entry["rounds"] for entry in state.values())
+            for entry in state.values():
+                # Models with fewer candidates join the later, larger rounds
+                entry["first_round"] = n_rounds - entry["rounds"]
+
+            with Parallel(n_jobs=config.n_jobs) as parallel:
+                for round_index in range(n_rounds):
+                    fraction = config.halving_factor ** (round_index - n_rounds + 1)
+                    active = {
+                        model_name: entry
+                        for model_name, entry in state.items()
+                        if entry["first_round"] <= round_index
+                    }
+                    self._run_round(
+                        parallel, X, y, searched, active, shuffled_folds, fraction
+                    )
+                    if round_index < n_rounds - 1:
+                        self._halve(active)
+
+                report = {
+                    model_name: self._summarize(entry)
+                    for model_name, entry in state.items()
+                }
+
+                if config.refit:
+                    self._refit_all(parallel, X, y, seeded, state, report)
+
+            for model_name, result in report.items():
+                logging.info(
+                    f"{model_name}: best CV R2 {result['cv_score']} from "
+                    f"{result['n_trials']} trials in {result['fit_time']:.1f}s of fitting"
+                )
+            return report
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def refit(self, model, params, X, y):
+        """
+        Fit a copy of `model` with `params` on all of X and y, seeded like the
+        search's own refits. Returns the estimator and its fit time.
+        """
+        seeded = _seed_estimator(clone(model), self.config.random_state)
+        return _refit(seeded, params, np.asarray(X), np.asarray(y))
+
+    def _task_key(self, entry, *parts):
+        if entry["model_key"] is None:
+            return None
+        return fingerprint(entry["model_key"], *parts)
+
+    def _refit_all(self, parallel, X, y, models, state, report):
+        keys, pending = {}, []
+        for model_name, result in report.items():
+            if result["best_params"] is None:
+                continue
+            key = self._task_key(state[model_name], "refit", result["best_params"])
+            cached = self.stage_cache.get_result(key) if key else None
+            if cached is not None:
+                result["best_estimator"], result["refit_time"] = cached
+                result["refit_cached"] = True
+            else:
+                keys[model_name] = key
+                pending.append(model_name)
+
+        refits = parallel(
+            delayed(_refit)(models[model_name], report[model_name]["best_params"], X, y)
+            for model_name in pending
+        )
+        for model_name, refit in zip(pending, refits):
+            result = report[model_name]
+            result["best_estimator"], result["refit_time"] = refit
+            result["refit_cached"] = False
+            if keys[model_name]:
+                self.stage_cache.put_result(keys[model_name], refit)
+
+    def _n_rounds(self, n_candidates):
+        if self.config.strategy != "halving" or n_candidates <= 1:
+            return 1
+        return max(1, math.ceil(math.log(n_candidates, self.config.halving_factor)))
+
+    def _run_round(self, parallel, X, y, models, state, folds, fraction):
+        # Candidate-major, model-minor ordering interleaves the models
+        tasks = []
+        longest = max((len(entry["alive"]) for entry in state.values()), default=0)
+        for position in range(longest):
+            for model_name, entry in state.items():
+                if position >= len(entry["alive"]):
+                    continue
+                candidate = entry["alive"][position]
+                for fold_index, (train, test) in enumerate(folds):
+                    n_train = max(2, int(math.ceil(len(train) * fraction)))
+                    subset = np.sort(train[:n_train])
+                    tasks.append((model_name, candidate, fold_index, subset, test))
+
+        keys = [
+            self._task_key(
+                state[model_name],
+                state[model_name]["candidates"][candidate],
+                fold_index,
+                len(train),
+            )
+            for model_name, candidate, fold_index, train, _ in tasks
+        ]
+        results = [self.stage_cache.get_result(key) if key else None for key in keys]
+        cached = [result is not None for result in results]
+        pending = [index for index, hit in enumerate(cached) if not hit]
+
+        fitted = parallel(
+            delayed(_fit_and_score)(
+                models[tasks[index][0]],
+                state[tasks[index][0]]["candidates"][tasks[index][1]],
+                X,
+                y,
+                tasks[index][3],
+                tasks[index][4],
+                state[tasks[index][0]]["deadline"],
+            )
+            for index in pending
+        )
+        for index, result in zip(pending, fitted):
+            results[index] = result
+            if result is not None and keys[index]:
+                self.stage_cache.put_result(keys[index], result)
+
+        for entry in state.values():
+            entry["scores"] = {}
+        for task, result, hit in zip(tasks, results, cached):
+            model_name, candidate, fold_index, _, _ = task
+            entry = state[model_name]
+            if result is None:
+                entry["timed_out"] = True
+                continue
+            score, fit_time = result
+            entry["scores"].setdefault(candidate, {})[fold_index] = score
+            if hit:
+                entry["n_cached"] += 1
+            else:
+                entry["fit_time"] += fit_time
+                entry["n_fits"] += 1
+
+        n_folds = len(folds)
+        for entry in state.values():
+            complete = {
+                candidate: float(np.mean(list(fold_scores.values())))
+                for candidate, fold_scores in entry["scores"].items()
+                if len(fold_scores) == n_folds
+            }
+            # A round cut short by the budget keeps the previous round's ranking
+            if complete or not entry["complete"]:
+                entry["complete"] = complete
+
+    def _halve(self, state):
+        factor = self.config.halving_factor
+        for entry in state.values():
+            ranked = sorted(entry["complete"], key=lambda c: (-entry["complete"][c], c))
+            keep = max(1, math.ceil(len(entry["alive"]) / factor))
+            entry["alive"] = sorted(ranked[:keep]) or entry["alive"][:keep]
+
+    @staticmethod
+    def _summarize(entry):
+        complete = entry["complete"]
+        if entry["skip_cv"]:
+            best_params, cv_score = entry["candidates"][0], None
+        elif complete:
+            # Ties go to the earliest candidate so the choice is reproducible
+            best = min(complete, key=lambda c: (-complete[c], c))
+            best_params, cv_score = entry["candidates"][best], complete[best]
+        else:
+            best_params, cv_score = None, float("nan")
+        return {
+            "best_params": best_params,
+            "cv_score": cv_score,
+            "n_trials": len(entry["candidates"]),
+            "n_completed": len(complete),
+            "n_fits": entry["n_fits"],
+            "n_cached": entry["n_cached"],
+            "fit_time": entry["fit_time"],
+            "timed_out": entry["timed_out"],
+        }
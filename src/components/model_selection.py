@@ -0,0 +1,165 @@
+import os
+import pickle
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from src.logger import logging
+
+SELECTION_POLICIES = ("best_r2", "fastest")
+LATENCY_METRICS = ("single_row_p50_ms", "single_row_p95_ms", "batch_us_per_row")
+
+
+def default_r2_tolerance():
+    """
+    MODEL_R2_TOLERANCE: models within this much test R2 of the best count
+    as equally good, both when training picks the model to ship and when
+    the router recommends a variant.
+    """
+    return float(os.environ.get("MODEL_R2_TOLERANCE", 0.01))
+
+
+@dataclass
+class ModelSelectionConfig:
+    # "best_r2" ships the highest test R2; "fastest" trades R2 within
+    # r2_tolerance of it for a cheaper model
+    policy: str = field(
+        default_factory=lambda: os.environ.get("MODEL_SELECTION_POLICY", "fastest")
+    )
+    r2_tolerance: float = field(default_factory=default_r2_tolerance)
+    # A lower-R2 model has to be at least this much cheaper to be picked, so
+    # timer jitter between near-identical models cannot change what ships
+    min_speedup: float = field(
+        default_factory=lambda: float(
+            os.environ.get("MODEL_SELECTION_MIN_SPEEDUP", 0.2)
+        )
+    )
+    latency_metric: str = field(
+        default_factory=lambda: os.environ.get(
+            "MODEL_SELECTION_LATENCY_METRIC", "single_row_p50_ms"
+        )
+    )
+    # Models whose single-row p95 exceeds this are never shipped (0 = no cap)
+    latency_slo_ms: float = field(
+        default_factory=lambda: float(os.environ.get("MODEL_LATENCY_SLO_MS", 0))
+    )
+    # Per-model measurement budget: at most this many single-row calls...
+    single_row_repeats: int = 200
+    # ...or this many seconds, whichever comes first (at least 5 calls)
+    measure_seconds: float = 1.0
+
+
+def measure_inference_cost(model, X, config: ModelSelectionConfig = None):
+    """
+    Serving cost of a fitted model on the transformed feature matrix `X`:
+    single-row latency percentiles, best-of-three batch time per row and
+    the pickled size that would be shipped.
+    """
+    config = config or ModelSelectionConfig()
+    X = np.asarray(X)
+    n_rows = len(X)
+
+    # One untimed call so lazy initialization doesn't count
+    model.predict(X[:1])
+    single = []
+    deadline = time.perf_counter() + config.measure_seconds
+    while len(single) < config.single_row_repeats and (
+        len(single) < 5 or time.perf_counter() < deadline
+    ):
+        row = X[len(single) % n_rows : len(single) % n_rows + 1]
+        start = time.perf_counter()
+        model.predict(row)
+        single.append(time.perf_counter() - start)
+
+    batch = []
+    for _ in range(3):
+        start = time.perf_counter()
+        model.predict(X)
+        batch.append(time.perf_counter() - start)
+
+    return {
+        "single_row_p50_ms": float(np.percentile(single, 50) * 1000),
+        "single_row_p95_ms": float(np.percentile(single, 95) * 1000),
+        "batch_us_per_row": min(batch) / n_rows * 1e6,
+        "model_bytes": len(pickle.dumps(model)),
+    }
+
+
+def select_model(report, config: ModelSelectionConfig = None):
+    """
+    Pick the model to ship from an evaluate_models report. Models over the
+    latency SLO are dropped first; then "best_r2" takes the highest test
+    R2. "fastest" considers the models within `r2_tolerance` of it from
+    the highest R2 down, and moves to the next one only when its
+    `latency_metric` is at least `min_speedup` lower than the current
+    pick's. Returns the decision with the candidates that were considered.
+    """
+    config = config or ModelSelectionConfig()
+    if config.policy not in SELECTION_POLICIES:
+        raise ValueError(
+            f"Unknown selection policy {config.policy!r}, "
+            f"expected one of {SELECTION_POLICIES}"
+        )
+    if config.latency_metric not in LATENCY_METRICS:
+        raise ValueError(
+            f"Unknown latency metric {config.latency_metric!r}, "
+            f"expected one of {LATENCY_METRICS}"
+        )
+
+    names = list(report)
+    excluded = []
+    if config.latency_slo_ms > 0:
+        excluded = [
+            name
+            for name in names
+            if report[name].get("single_row_p95_ms", 0.0) > config.latency_slo_ms
+        ]
+        names = [name for name in names if name not in excluded]
+        if not names:
+            raise ValueError(
+                f"No model meets the {config.latency_slo_ms} ms latency SLO"
+            )
+
+    best_r2_model = max(names, key=lambda name: report[name]["test_score"])
+    best_r2 = report[best_r2_model]["test_score"]
+    if config.policy == "best_r2":
+        candidates = [best_r2_model]
+        chosen = best_r2_model
+    else:
+        candidates = [
+            name
+            for name in names
+            if report[name]["test_score"] >= best_r2 - config.r2_tolerance
+        ]
+        # Unmeasured models count as slowest; ties on R2 go by name
+        chosen = best_r2_model
+        for name in sorted(
+            candidates, key=lambda name: (-report[name]["test_score"], name)
+        ):
+            cost = report[name].get(config.latency_metric, float("inf"))
+            current = report[chosen].get(config.latency_metric, float("inf"))
+            if cost < current * (1 - config.min_speedup):
+                chosen = name
+
+    selection = {
+        "policy": config.policy,
+        "model": chosen,
+        "test_score": report[chosen]["test_score"],
+        "best_r2_model": best_r2_model,
+        "best_r2": best_r2,
+        "r2_tolerance": config.r2_tolerance,
+        "min_speedup": config.min_speedup,
+        "latency_metric": config.latency_metric,
+        "latency_slo_ms": config.latency_slo_ms or None,
+        "candidates": candidates,
+        "excluded_by_slo": excluded,
+    }
+    if chosen != best_r2_model:
+        logging.info(
+            f"Selected {chosen} over {best_r2_model}: test R2 "
+            f"{report[chosen]['test_score']} vs {best_r2}, {config.latency_metric} "
+            f"{report[chosen].get(config.latency_metric)} vs "
+            f"{report[best_r2_model].get(config.latency_metric)}"
+        )
+    return selection
@@ -1,7 +1,7 @@
 import os
 import sys
-from dataclasses import dataclass
-from sklearn.metrics import r2_score
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 
 # Machine Learning Models
 from catboost import CatBoostRegressor
@@ -18,19 +18,101 @@ from xgboost import XGBRegressor
 
 from src.exception import CustomException
 from src.logger import logging
-from src.utils import save_object, evaluate_models
+from src.utils import save_object, save_json, evaluate_models, load_table
+from src.components.artifact_bundle import ArtifactBundler
+from src.components.compiled_model import ModelCompiler
+from src.components.data_ingestion import DataIngestionConfig
+from src.components.model_search import ModelSearchConfig
+from src.components.model_selection import ModelSelectionConfig, select_model
+from src.components.model_variants import ModelVariantExporter, ModelVariantsConfig
+from src.components.prediction_intervals import (
+    PredictionIntervalCalibrator,
+    PredictionIntervalConfig,
+)
+from src.components.prediction_table import PredictionTableBuilder
+from src.stage_cache import StageCache
+
+
+def candidate_models():
+    """Fresh, unfitted instances of every model training compares."""
+    return {
+        "Linear Regression": LinearRegression(),
+        "Lasso Regression": Lasso(),
+        "Ridge Regression": Ridge(),
+        "K-Nearest Neighbors": KNeighborsRegressor(),
+        "Decision Tree": DecisionTreeRegressor(),
+        "Random Forest": RandomForestRegressor(),
+        "Gradient Boosting": GradientBoostingRegressor(),
+        "XGBoost": XGBRegressor(),
+        "CatBoost": CatBoostRegressor(verbose=False),
+        "AdaBoost": AdaBoostRegressor(),
+        "Support Vector Regressor": SVR(),
+    }
+
+
+def candidate_params():
+    """The hyperparameter grid searched for each of candidate_models()."""
+    return {
+        "Decision Tree": {
+            "criterion": [
+                "squared_error",
+                "friedman_mse",
+                "absolute_error",
+                "poisson",
+            ],
+        },
+        "Random Forest": {"n_estimators": [8, 16, 32, 64, 128, 256]},
+        "Gradient Boosting": {
+            "learning_rate": [0.1, 0.01, 0.05, 0.001],
+            "subsample": [0.6, 0.7, 0.75, 0.8, 0.85, 0.9],
+            "n_estimators": [8, 16, 32, 64, 128, 256],
+        },
+        "Linear Regression": {},
+        "XGBoost": {
+            "learning_rate": [0.1, 0.01, 0.05, 0.001],
+            "n_estimators": [8, 16, 32, 64, 128, 256],
+        },
+        "CatBoost": {
+            "depth": [6, 8, 10],
+            "learning_rate": [0.01, 0.05, 0.1],
+            "iterations": [30, 50, 100],
+        },
+        "AdaBoost": {
+            "learning_rate": [0.1, 0.01, 0.5, 0.001],
+            "n_estimators": [8, 16, 32, 64, 128, 256],
+        },
+        "Lasso Regression": {"alpha": [0.1, 1.0, 10.0]},
+        "Ridge Regression": {"alpha": [0.1, 1.0, 10.0]},
+        "K-Nearest Neighbors": {"n_neighbors": [3, 5, 7, 9, 11]},
+        "Support Vector Regressor": {
+            "C": [0.1, 1, 10],
+            "kernel": ["linear", "rbf"],
+        },
+    }
 
 
 @dataclass
 class ModelTrainerConfig:
     trained_model_file_path: str = os.path.join("artifacts", "model.pkl")
+    model_report_file_path: str = os.path.join("artifacts", "model_report.json")
+    search_config: ModelSearchConfig = field(default_factory=ModelSearchConfig)
+    selection_config: ModelSelectionConfig = field(default_factory=ModelSelectionConfig)
+    interval_config: PredictionIntervalConfig = field(
+        default_factory=PredictionIntervalConfig
+    )
 
 
 class ModelTrainer:
-    def __init__(self):
+    def __init__(self, stage_cache: StageCache = None):
         self.model_trainer_config = ModelTrainerConfig()
-
-    def initiate_model_training(self, train_array, test_array):
+        self.stage_cache = stage_cache
+
+    def initiate_model_training(self, train_array, test_array, test_data_path=None):
+        """
+        Search, select and save the model, then build the serving artifacts
+        from it. `test_data_path` is the raw test split the compiled model
+        is checked against (the ingestion default when omitted).
+        """
         try:
             logging.info("Splitting training and test input data")
 
@@ -40,59 +122,8 @@ class ModelTrainer:
             X_test = test_array[:, :-1]
             y_test = test_array[:, -1]
 
-            # Define models to evaluate
-            models = {
-                "Linear Regression": LinearRegression(),
-                "Lasso Regression": Lasso(),
-                "Ridge Regression": Ridge(),
-                "K-Nearest Neighbors": KNeighborsRegressor(),
-                "Decision Tree": DecisionTreeRegressor(),
-                "Random Forest": RandomForestRegressor(),
-                "Gradient Boosting": GradientBoostingRegressor(),
-                "XGBoost": XGBRegressor(),
-                "CatBoost": CatBoostRegressor(verbose=False),
-                "AdaBoost": AdaBoostRegressor(),
-                "Support Vector Regressor": SVR(),
-            }
-
-            # Define hyperparameters for tuning
-            params = {
-                "Decision Tree": {
-                    "criterion": [
-                        "squared_error",
-                        "friedman_mse",
-                        "absolute_error",
-                        "poisson",
-                    ],
-                },
-                "Random Forest": {"n_estimators": [8, 16, 32, 64, 128, 256]},
-                "Gradient Boosting": {
-                    "learning_rate": [0.1, 0.01, 0.05, 0.001],
-                    "subsample": [0.6, 0.7, 0.75, 0.8, 0.85, 0.9],
-                    "n_estimators": [8, 16, 32, 64, 128, 256],
-                },
-                "Linear Regression": {},
-                "XGBoost": {
-                    "learning_rate": [0.1, 0.01, 0.05, 0.001],
-                    "n_estimators": [8, 16, 32, 64, 128, 256],
-                },
-                "CatBoost": {
-                    "depth": [6, 8, 10],
-                    "learning_rate": [0.01, 0.05, 0.1],
-                    "iterations": [30, 50, 100],
-                },
-                "AdaBoost": {
-                    "learning_rate": [0.1, 0.01, 0.5, 0.001],
-                    "n_estimators": [8, 16, 32, 64, 128, 256],
-                },
-                "Lasso Regression": {"alpha": [0.1, 1.0, 10.0]},
-                "Ridge Regression": {"alpha": [0.1, 1.0, 10.0]},
-                "K-Nearest Neighbors": {"n_neighbors": [3, 5, 7, 9, 11]},
-                "Support Vector Regressor": {
-                    "C": [0.1, 1, 10],
-                    "kernel": ["linear", "rbf"],
-                },
-            }
+            models = candidate_models()
+            params = candidate_params()
 
             # Evaluate all models
             logging.info("Starting model evaluation and hyperparameter tuning")
@@ -103,15 +134,28 @@ class ModelTrainer:
                 y_test=y_test,
                 models=models,
                 param=params,
+                search_config=self.model_trainer_config.search_config,
+                stage_cache=self.stage_cache,
+                selection_config=self.model_trainer_config.selection_config,
             )
 
-            # Get best model score
-            best_model_score = max(sorted(model_report.values()))
-
-            # Get best model name
-            best_model_name = list(model_report.keys())[
-                list(model_report.values()).index(best_model_score)
-            ]
+            for model_name, model_result in model_report.items():
+                logging.info(
+                    f"{model_name}: train R2 {model_result['train_score']:.4f}, "
+                    f"test R2 {model_result['test_score']:.4f}, "
+                    f"fit time {model_result['fit_time']:.2f}s, "
+                    f"single-row p50 {model_result['single_row_p50_ms']:.3f} ms, "
+                    f"batch {model_result['batch_us_per_row']:.2f} us/row, "
+                    f"size {model_result['model_bytes'] / 1024:.0f} KiB, "
+                    f"params {model_result['best_params']}"
+                )
+
+            # Pick the model to ship by accuracy and serving cost
+            selection = select_model(
+                model_report, self.model_trainer_config.selection_config
+            )
+            best_model_name = selection["model"]
+            best_model_score = model_report[best_model_name]["test_score"]
             best_model = models[best_model_name]
 
             # Check if best model meets minimum performance threshold
@@ -128,11 +172,55 @@ class ModelTrainer:
                 obj=best_model,
             )
 
-            # Make predictions and calculate final score
-            predicted = best_model.predict(X_test)
-            r2_square = r2_score(y_test, predicted)
+            # Uncertainty from held-out residuals, looked up at serve time
+            intervals = PredictionIntervalCalibrator(
+                self.model_trainer_config.interval_config
+            ).initiate_interval_calibration(
+                best_model, X_train, y_train, X_test, y_test
+            )
+
+            # Persist the evaluation report next to the model
+            save_json(
+                self.model_trainer_config.model_report_file_path,
+                {
+                    "best_model": best_model_name,
+                    "best_model_score": best_model_score,
+                    "selection": selection,
+                    "prediction_intervals": intervals,
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "models": model_report,
+                },
+            )
+
+            # Fuse preprocessor and model into a compiled artifact if supported;
+            # training fails if it does not reproduce the pickles on the test split
+            test_df = load_table(test_data_path or DataIngestionConfig().test_data_path)
+            ModelCompiler().initiate_model_compilation(
+                validation_features=test_df.drop(columns=["math_score"])
+            )
+
+            # Versioned, hash-verified bundle that serving loads and memory-maps
+            ArtifactBundler().initiate_bundle_creation()
+
+            # Keep the runners-up servable for A/B routing and shadow scoring
+            ModelVariantExporter(
+                ModelVariantsConfig(
+                    interval_config=self.model_trainer_config.interval_config
+                )
+            ).initiate_variant_export(
+                models,
+                model_report,
+                primary=best_model_name,
+                data=(X_train, y_train, X_test, y_test),
+            )
+
+            # Materialize every integer-score prediction when table serving is on
+            table_builder = PredictionTableBuilder()
+            if table_builder.prediction_table_config.enabled:
+                table_builder.initiate_table_build()
+                table_builder.validate_table()
 
-            return r2_square
+            return best_model_score
 
         except Exception as e:
             raise CustomException(e, sys)
@@ -0,0 +1,174 @@
+import os
+import re
+import shutil
+import sys
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+
+from src.components.artifact_bundle import ArtifactBundleConfig, ArtifactBundler
+from src.components.compiled_model import ModelCompiler
+from src.components.prediction_intervals import (
+    PredictionIntervalCalibrator,
+    PredictionIntervalConfig,
+)
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import save_json, save_object
+
+VARIANTS_INDEX_FILE = "variants.json"
+
+
+def variant_name(model_name):
+    """'K-Nearest Neighbors' -> 'k_nearest_neighbors'"""
+    return re.sub(r"[^a-z0-9]+", "_", model_name.lower()).strip("_")
+
+
+@dataclass
+class ModelVariantsConfig:
+    preprocessor_obj_file_path: str = os.path.join("artifacts", "preprocessor.pkl")
+    variants_dir: str = field(
+        default_factory=lambda: os.environ.get(
+            "MODEL_VARIANTS_DIR", os.path.join("artifacts", "variants")
+        )
+    )
+    # How many of the best models to keep as servable variants (0 disables)
+    top_k: int = field(default_factory=lambda: int(os.environ.get("MODEL_TOP_K", 3)))
+    # Coverage, bins and folds for each variant's intervals; paths are per variant
+    interval_config: PredictionIntervalConfig = field(
+        default_factory=PredictionIntervalConfig
+    )
+
+
+class ModelVariantExporter:
+    def __init__(self, config: ModelVariantsConfig = None):
+        self.model_variants_config = config or ModelVariantsConfig()
+
+    def _export_variant(self, variant_dir, model_name, model, result, data=None):
+        config = self.model_variants_config
+        model_path = os.path.join(variant_dir, "model.pkl")
+        preprocessor_path = os.path.join(variant_dir, "preprocessor.pkl")
+        report_path = os.path.join(variant_dir, "model_report.json")
+        compiled_path = os.path.join(variant_dir, "model_compiled.npz")
+        intervals_path = os.path.join(variant_dir, "prediction_intervals.json")
+
+        save_object(file_path=model_path, obj=model)
+        shutil.copyfile(config.preprocessor_obj_file_path, preprocessor_path)
+        save_json(
+            report_path,
+            {
+                "best_model": model_name,
+                "best_model_score": result["test_score"],
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "models": {model_name: result},
+            },
+        )
+
+        compiler = ModelCompiler()
+        compiler.compiled_model_config.trained_model_file_path = model_path
+        compiler.compiled_model_config.preprocessor_obj_file_path = preprocessor_path
+        compiler.compiled_model_config.compiled_model_file_path = compiled_path
+        compiler.initiate_model_compilation()
+
+        # Calibrated against this variant's own residuals, as for the primary
+        if data is not None:
+            PredictionIntervalCalibrator(
+                replace(
+                    config.interval_config,
+                    trained_model_file_path=model_path,
+                    preprocessor_obj_file_path=preprocessor_path,
+                    intervals_file_path=intervals_path,
+                )
+            ).initiate_interval_calibration(model, *data)
+
+        ArtifactBundler(
+            ArtifactBundleConfig(
+                trained_model_file_path=model_path,
+                preprocessor_obj_file_path=preprocessor_path,
+                compiled_model_file_path=compiled_path,
+                model_report_file_path=report_path,
+                prediction_intervals_file_path=intervals_path,
+                bundle_dir=os.path.join(variant_dir, "bundles"),
+            )
+        ).initiate_bundle_creation()
+
+    def initiate_variant_export(
+        self, models, model_report, primary=None, n_test_rows=None, data=None
+    ):
+        """
+        Save the `top_k` models by test R2 as named variants under
+        variants_dir/<name>/, each with its own copy of the preprocessor,
+        compiled scorer and artifact bundle, plus a variants.json index with
+        their scores and offline prediction cost. `primary`, the model that
+        was shipped as model.pkl, is always included. Variants that dropped
+        out are removed. Returns the index.
+
+        `data` is the (X_train, y_train, X_test, y_test) the models were
+        evaluated on; with it every variant gets its own calibrated
+        prediction intervals.
+        """
+        try:
+            config = self.model_variants_config
+            if config.top_k <= 0:
+                return None
+
+            ranking = sorted(
+                model_report,
+                key=lambda name: model_report[name]["test_score"],
+                reverse=True,
+            )
+            ranked = ranking[: config.top_k]
+            primary = primary or ranked[0]
+            if primary not in ranked:
+                ranked.append(primary)
+
+            variants = []
+            for model_name in ranked:
+                result = model_report[model_name]
+                name = variant_name(model_name)
+                self._export_variant(
+                    os.path.join(config.variants_dir, name),
+                    model_name,
+                    models[model_name],
+                    result,
+                    data,
+                )
+                if "batch_us_per_row" in result:
+                    seconds_per_record = result["batch_us_per_row"] / 1e6
+                elif result.get("predict_time") is not None and n_test_rows:
+                    seconds_per_record = result["predict_time"] / n_test_rows
+                else:
+                    seconds_per_record = None
+                variants.append(
+                    {
+                        "name": name,
+                        "model": model_name,
+                        "rank": ranking.index(model_name) + 1,
+                        "test_r2": result["test_score"],
+                        "train_r2": result["train_score"],
+                        "predict_seconds_per_record": seconds_per_record,
+                        "single_row_p50_ms": result.get("single_row_p50_ms"),
+                        "model_bytes": result.get("model_bytes"),
+                    }
+                )
+
+            kept = {variant["name"] for variant in variants}
+            for name in os.listdir(config.variants_dir):
+                variant_dir = os.path.join(config.variants_dir, name)
+                if name not in kept and os.path.exists(
+                    os.path.join(variant_dir, "model.pkl")
+                ):
+                    shutil.rmtree(variant_dir)
+                    logging.info(f"Removed model variant {name}")
+
+            index = {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "best": variants[0]["name"],
+                "primary": variant_name(primary),
+                "variants": variants,
+            }
+            save_json(os.path.join(config.variants_dir, VARIANTS_INDEX_FILE), index)
+            logging.info(f"Exported model variants: {sorted(kept)}")
+            return index
+
+        except Exception as e:
+            raise CustomException(e, sys)
@@ -0,0 +1,234 @@
+import bisect
+import math
+import os
+import sys
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import artifact_version, load_json, save_json
+
+
+@dataclass
+class PredictionIntervalConfig:
+    trained_model_file_path: str = os.path.join("artifacts", "model.pkl")
+    preprocessor_obj_file_path: str = os.path.join("artifacts", "preprocessor.pkl")
+    intervals_file_path: str = field(
+        default_factory=lambda: os.environ.get(
+            "PREDICTION_INTERVALS_PATH",
+            os.path.join("artifacts", "prediction_intervals.json"),
+        )
+    )
+    # Share of true scores the interval should contain; 0 disables intervals
+    coverage: float = field(
+        default_factory=lambda: float(
+            os.environ.get("PREDICTION_INTERVAL_COVERAGE", 0.9)
+        )
+    )
+    # Residual quantiles are taken per predicted-score range, so intervals
+    # are wider where the model is less accurate
+    bins: int = field(
+        default_factory=lambda: int(os.environ.get("PREDICTION_INTERVAL_BINS", 4))
+    )
+    min_bin_size: int = 100
+    # Cross-validation folds that produce the out-of-fold residuals
+    folds: int = field(
+        default_factory=lambda: int(os.environ.get("PREDICTION_INTERVAL_FOLDS", 5))
+    )
+    score_min: float = 0.0
+    score_max: float = 100.0
+    random_state: int = 42
+
+
+def conformal_quantile(values, level):
+    """
+    The ceil((n + 1) * level)-th smallest of `values`: the split-conformal
+    quantile, which covers a new exchangeable value with probability at
+    least `level`.
+    """
+    values = np.sort(np.asarray(values, dtype=float))
+    rank = min(math.ceil((len(values) + 1) * level), len(values))
+    return float(values[rank - 1])
+
+
+class PredictionIntervals:
+    """
+    Conformal prediction intervals around the model's point prediction.
+    Predictions are split into score bins at `edges`; each bin has a lower
+    and an upper residual offset, so an interval costs a bin lookup and two
+    additions. Bounds are clipped to the valid score range.
+    """
+
+    def __init__(self, edges, lower, upper, coverage, score_min, score_max):
+        self.edges = [float(edge) for edge in edges]
+        self.lower = [float(offset) for offset in lower]
+        self.upper = [float(offset) for offset in upper]
+        self.coverage = float(coverage)
+        self.score_min = float(score_min)
+        self.score_max = float(score_max)
+        self._edges = np.asarray(self.edges)
+        self._lower = np.asarray(self.lower)
+        self._upper = np.asarray(self.upper)
+
+    @classmethod
+    def calibrate(
+        cls, predictions, targets, coverage, bins=1, min_bin_size=1, bounds=(0, 100)
+    ):
+        """
+        Fit the per-bin offsets from held-out `predictions` and `targets`.
+        Bins hold equal numbers of predictions and at least `min_bin_size`;
+        if ties leave one too small, a single bin is used.
+        """
+        predictions = np.asarray(predictions, dtype=float)
+        residuals = np.asarray(targets, dtype=float) - predictions
+        n_bins = max(1, min(bins, len(predictions) // max(min_bin_size, 1)))
+        ordered = np.sort(predictions)
+        edges = np.unique(
+            [chunk[0] for chunk in np.array_split(ordered, n_bins)[1:]]
+        ).tolist()
+        assignment = np.searchsorted(edges, predictions, side="right")
+        counts = np.bincount(assignment, minlength=len(edges) + 1)
+        if counts.min() < min(min_bin_size, len(predictions)):
+            edges, assignment = [], np.zeros(len(predictions), dtype=int)
+
+        # Each tail gets half the miss rate
+        tail = 1 - (1 - coverage) / 2
+        lower, upper = [], []
+        for index in range(len(edges) + 1):
+            in_bin = residuals[assignment == index]
+            lower.append(-conformal_quantile(-in_bin, tail))
+            upper.append(conformal_quantile(in_bin, tail))
+        return cls(edges, lower, upper, coverage, *bounds)
+
+    def interval(self, score):
+        """(lower, upper) for a single score, without building arrays."""
+        index = bisect.bisect_right(self.edges, score)
+        return (
+            min(max(score + self.lower[index], self.score_min), self.score_max),
+            min(max(score + self.upper[index], self.score_min), self.score_max),
+        )
+
+    def intervals(self, scores):
+        """(lower, upper) arrays for an array of scores."""
+        scores = np.asarray(scores, dtype=float)
+        index = np.searchsorted(self._edges, scores, side="right")
+        return (
+            np.clip(scores + self._lower[index], self.score_min, self.score_max),
+            np.clip(scores + self._upper[index], self.score_min, self.score_max),
+        )
+
+    def evaluate(self, predictions, targets):
+        """Empirical coverage and mean width on `predictions` vs `targets`."""
+        lower, upper = self.intervals(predictions)
+        targets = np.asarray(targets, dtype=float)
+        return {
+            "coverage": float(np.mean((targets >= lower) & (targets <= upper))),
+            "mean_width": float(np.mean(upper - lower)),
+        }
+
+    def to_dict(self):
+        return {
+            "coverage": self.coverage,
+            "edges": self.edges,
+            "lower": self.lower,
+            "upper": self.upper,
+            "score_min": self.score_min,
+            "score_max": self.score_max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["edges"],
+            data["lower"],
+            data["upper"],
+            data["coverage"],
+            data["score_min"],
+            data["score_max"],
+        )
+
+    @classmethod
+    def load(cls, file_path, source_version=None):
+        """
+        Read intervals saved by PredictionIntervalCalibrator. Returns None
+        when the file is missing or was calibrated for different pickles
+        than `source_version`.
+        """
+        try:
+            if not os.path.exists(file_path):
+                return None
+            data = load_json(file_path)
+            if source_version is not None and data["source_version"] != (
+                source_version
+            ):
+                logging.warning(f"Ignoring stale prediction intervals at {file_path}")
+                return None
+            return cls.from_dict(data)
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+class PredictionIntervalCalibrator:
+    def __init__(self, config: PredictionIntervalConfig = None):
+        self.prediction_interval_config = config or PredictionIntervalConfig()
+
+    def initiate_interval_calibration(self, model, X_train, y_train, X_test, y_test):
+        """
+        Calibrate intervals for the fitted `model` from out-of-fold
+        residuals on the training data, check their coverage on the test
+        set and save them next to model.pkl. Returns the saved summary, or
+        None when intervals are disabled.
+        """
+        try:
+            # Training-only; serving imports this module for PredictionIntervals
+            from sklearn.base import clone
+            from sklearn.model_selection import KFold, cross_val_predict
+
+            config = self.prediction_interval_config
+            if config.coverage <= 0:
+                if os.path.exists(config.intervals_file_path):
+                    os.remove(config.intervals_file_path)
+                return None
+            if not 0 < config.coverage < 1:
+                raise ValueError(
+                    f"Prediction interval coverage must be in (0, 1), got "
+                    f"{config.coverage}"
+                )
+
+            folds = KFold(
+                n_splits=config.folds, shuffle=True, random_state=config.random_state
+            )
+            held_out = cross_val_predict(clone(model), X_train, y_train, cv=folds)
+            intervals = PredictionIntervals.calibrate(
+                held_out,
+                y_train,
+                config.coverage,
+                bins=config.bins,
+                min_bin_size=config.min_bin_size,
+                bounds=(config.score_min, config.score_max),
+            )
+            test = intervals.evaluate(model.predict(X_test), y_test)
+
+            summary = dict(
+                intervals.to_dict(),
+                method="split conformal, out-of-fold residuals",
+                calibration_rows=len(held_out),
+                folds=config.folds,
+                test_coverage=test["coverage"],
+                test_mean_width=test["mean_width"],
+                source_version=artifact_version(
+                    config.trained_model_file_path, config.preprocessor_obj_file_path
+                ),
+            )
+            save_json(config.intervals_file_path, summary)
+            logging.info(
+                f"{config.coverage:.0%} prediction intervals: test coverage "
+                f"{test['coverage']:.1%}, mean width {test['mean_width']:.2f}"
+            )
+            return summary
+
+        except Exception as e:
+            raise CustomException(e, sys)
@@ -0,0 +1,347 @@
+import itertools
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+
+from src.components.compiled_model import compile_model
+from src.components.compiled_preprocessor import column_getter
+from src.exception import CustomException
+from src.logger import logging, setup_logging
+from src.utils import artifact_version, load_json, load_object, save_json
+
+# float32 is within ~4e-6 of the model; float64 also reproduces 2-decimal
+# rounding exactly, float16 halves the size at ~0.03 precision
+TABLE_DTYPES = ("float32", "float64", "float16")
+
+
+def _env_flag(name, default="false"):
+    return os.environ.get(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class PredictionTableConfig:
+    trained_model_file_path: str = os.path.join("artifacts", "model.pkl")
+    preprocessor_obj_file_path: str = os.path.join("artifacts", "preprocessor.pkl")
+    table_file_path: str = field(
+        default_factory=lambda: os.environ.get(
+            "PREDICTION_TABLE_PATH", os.path.join("artifacts", "prediction_table.npy")
+        )
+    )
+    # Build the table after training and serve integer-score requests from it
+    enabled: bool = field(default_factory=lambda: _env_flag("PREDICTION_TABLE_ENABLED"))
+    dtype: str = field(
+        default_factory=lambda: os.environ.get("PREDICTION_TABLE_DTYPE", "float32")
+    )
+    score_min: int = 0
+    score_max: int = 100
+
+
+def table_meta_path(table_path):
+    return os.path.splitext(table_path)[0] + ".json"
+
+
+def _grid_axes(preprocessor):
+    """
+    Categorical columns with their fitted vocabularies, then numerical
+    columns, in the order the preprocessor lists them.
+    """
+    categorical, numerical = {}, []
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == "remainder":
+            continue
+        steps = [step for _, step in getattr(transformer, "steps", [])]
+        encoders = [step for step in steps if hasattr(step, "categories_")]
+        if encoders:
+            for column, values in zip(columns, encoders[0].categories_):
+                categorical[column] = values.tolist()
+        else:
+            numerical.extend(columns)
+    return categorical, numerical
+
+
+class PredictionTable:
+    """
+    Every prediction for the integer score grid, held in a memory-mapped
+    array with one axis per categorical column followed by one axis per
+    score. Lookups are pure index arithmetic; records with fractional or
+    out-of-range scores, or unseen categories, are reported as not found so
+    the caller can fall back to the live model.
+    """
+
+    def __init__(self, values, categories, numerical_columns, score_min, score_max):
+        self.values = values
+        self.categorical_columns = list(categories)
+        self.categories = [list(values) for values in categories.values()]
+        self.numerical_columns = list(numerical_columns)
+        self.score_min = int(score_min)
+        self.score_max = int(score_max)
+        self.lookups = [
+            {value: index for index, value in enumerate(values)}
+            for values in self.categories
+        ]
+        strides = np.cumprod((values.shape[1:] + (1,))[::-1])[::-1]
+        self.strides = [int(stride) for stride in strides]
+        self._flat = values.reshape(-1)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def lookup_row(self, record):
+        """Return the tabulated score for one record dict, or None."""
+        index = 0
+        strides = iter(self.strides)
+        for column, lookup in zip(self.categorical_columns, self.lookups):
+            position = lookup.get(record.get(column))
+            if position is None:
+                return None
+            index += position * next(strides)
+
+        for column in self.numerical_columns:
+            try:
+                value = float(record.get(column))
+            except (TypeError, ValueError):
+                return None
+            if not value.is_integer() or not (
+                self.score_min <= value <= self.score_max
+            ):
+                return None
+            index += (int(value) - self.score_min) * next(strides)
+
+        return float(self._flat[index])
+
+    def predict(self, features):
+        """
+        Vectorized lookup. Returns (scores, found); scores are NaN where the
+        record is not on the grid.
+        """
+        n_rows, column = column_getter(features)
+        index = np.zeros(n_rows, dtype=np.int64)
+        found = np.ones(n_rows, dtype=bool)
+        strides = iter(self.strides)
+
+        for name, categories in zip(self.categorical_columns, self.categories):
+            codes = pd.Categorical(column(name), categories=categories).codes
+            found &= codes >= 0
+            index += codes.astype(np.int64) * next(strides)
+
+        for name in self.numerical_columns:
+            values = pd.to_numeric(pd.Series(column(name)), errors="coerce")
+            values = values.to_numpy(dtype=np.float64)
+            on_grid = (
+                (values == np.floor(values))
+                & (values >= self.score_min)
+                & (values <= self.score_max)
+            )
+            found &= on_grid
+            offsets = np.where(on_grid, values - self.score_min, 0).astype(np.int64)
+            index += offsets * next(strides)
+
+        scores = np.full(n_rows, np.nan)
+        scores[found] = self._flat[index[found]]
+        return scores, found
+
+    @classmethod
+    def load(cls, table_path, source_version=None):
+        """
+        Memory-map a table built by PredictionTableBuilder. Returns None when
+        it is missing or was built from different pickles than
+        `source_version`.
+        """
+        try:
+            meta_path = table_meta_path(table_path)
+            if not (os.path.exists(table_path) and os.path.exists(meta_path)):
+                return None
+
+            meta = load_json(meta_path)
+            if source_version is not None and meta["source_version"] != (
+                source_version
+            ):
+                logging.warning(f"Ignoring stale prediction table at {table_path}")
+                return None
+
+            return cls(
+                np.load(table_path, mmap_mode="r"),
+                categories=meta["categories"],
+                numerical_columns=meta["numerical_columns"],
+                score_min=meta["score_min"],
+                score_max=meta["score_max"],
+            )
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+class PredictionTableBuilder:
+    def __init__(self, config: PredictionTableConfig = None):
+        self.prediction_table_config = config or PredictionTableConfig()
+
+    def _load_predictor(self):
+        config = self.prediction_table_config
+        model = load_object(file_path=config.trained_model_file_path)
+        preprocessor = load_object(file_path=config.preprocessor_obj_file_path)
+        try:
+            predict = compile_model(preprocessor, model).predict
+        except ValueError:
+
+            def predict(features):
+                return model.predict(preprocessor.transform(pd.DataFrame(features)))
+
+        return preprocessor, predict
+
+    def _grid_block(self, categorical, numerical, combination):
+        """Inputs for one categorical combination across the score grid."""
+        config = self.prediction_table_config
+        scores = np.arange(config.score_min, config.score_max + 1, dtype=np.float64)
+        grids = np.meshgrid(*([scores] * len(numerical)), indexing="ij")
+        n_rows = grids[0].size if grids else 1
+        block = {
+            column: np.full(n_rows, value, dtype=object)
+            for column, value in zip(categorical, combination)
+        }
+        for column, grid in zip(numerical, grids):
+            block[column] = grid.reshape(-1)
+        return block
+
+    def initiate_table_build(self):
+        """
+        Score the full categorical x integer-score grid with the trained model
+        and write it as a memory-mappable .npy next to model.pkl, with its
+        axes and source version in a JSON sidecar.
+        """
+        try:
+            config = self.prediction_table_config
+            if config.dtype not in TABLE_DTYPES:
+                raise ValueError(
+                    f"Unknown table dtype {config.dtype!r}, expected one of "
+                    f"{TABLE_DTYPES}"
+                )
+
+            start = time.perf_counter()
+            preprocessor, predict = self._load_predictor()
+            categorical, numerical = _grid_axes(preprocessor)
+            n_scores = config.score_max - config.score_min + 1
+            shape = tuple(len(values) for values in categorical.values()) + (
+                (n_scores,) * len(numerical)
+            )
+
+            dir_path = os.path.dirname(config.table_file_path)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+            table = open_memmap(
+                config.table_file_path, mode="w+", dtype=config.dtype, shape=shape
+            )
+            blocks = table.reshape(-1, n_scores ** len(numerical))
+            combinations = itertools.product(*categorical.values())
+            for row, combination in enumerate(combinations):
+                block = self._grid_block(categorical, numerical, combination)
+                blocks[row] = predict(block)
+            table.flush()
+            del table, blocks
+
+            save_json(
+                table_meta_path(config.table_file_path),
+                {
+                    "categories": categorical,
+                    "numerical_columns": numerical,
+                    "score_min": config.score_min,
+                    "score_max": config.score_max,
+                    "dtype": config.dtype,
+                    "shape": shape,
+                    "source_version": artifact_version(
+                        config.trained_model_file_path,
+                        config.preprocessor_obj_file_path,
+                    ),
+                },
+            )
+            logging.info(
+                f"Prediction table {shape} built in "
+                f"{time.perf_counter() - start:.1f}s at {config.table_file_path}"
+            )
+            return config.table_file_path
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def validate_table(self, n_samples=10000, full=False, random_state=42):
+        """
+        Compare the table with the live sklearn model on `n_samples` random
+        grid cells (or all of them with `full`). Reports the largest absolute
+        error and how many cells round to a different 2-decimal score.
+        """
+        try:
+            config = self.prediction_table_config
+            model = load_object(file_path=config.trained_model_file_path)
+            preprocessor = load_object(file_path=config.preprocessor_obj_file_path)
+            table = PredictionTable.load(
+                config.table_file_path,
+                source_version=artifact_version(
+                    config.trained_model_file_path, config.preprocessor_obj_file_path
+                ),
+            )
+            if table is None:
+                raise ValueError(
+                    f"No up-to-date prediction table at {config.table_file_path}"
+                )
+
+            size = int(np.prod(table.shape))
+            if full or n_samples >= size:
+                cells = np.arange(size)
+            else:
+                rng = np.random.RandomState(random_state)
+                cells = np.sort(rng.choice(size, size=n_samples, replace=False))
+
+            max_error, mismatches = 0.0, 0
+            for start in range(0, len(cells), 100_000):
+                chunk = cells[start : start + 100_000]
+                axes = np.unravel_index(chunk, table.shape)
+                features = {
+                    column: np.asarray(values, dtype=object)[positions]
+                    for column, values, positions in zip(
+                        table.categorical_columns, table.categories, axes
+                    )
+                }
+                for column, positions in zip(
+                    table.numerical_columns, axes[len(table.categories) :]
+                ):
+                    features[column] = positions + float(table.score_min)
+
+                expected = model.predict(preprocessor.transform(pd.DataFrame(features)))
+                actual = table.predict(features)[0]
+                max_error = max(max_error, float(np.max(np.abs(actual - expected))))
+                mismatches += int(np.sum(np.round(actual, 2) != np.round(expected, 2)))
+
+            report = {
+                "cells_checked": int(len(cells)),
+                "max_abs_error": max_error,
+                "rounding_mismatches": mismatches,
+                "dtype": str(table.values.dtype),
+            }
+            logging.info(f"Prediction table validation: {report}")
+            return report
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    setup_logging()
+    parser = argparse.ArgumentParser(
+        description="Build or validate the full-grid prediction table"
+    )
+    parser.add_argument("--validate", action="store_true", help="only validate")
+    parser.add_argument("--full", action="store_true", help="validate every cell")
+    parser.add_argument("--samples", type=int, default=10000)
+    args = parser.parse_args()
+
+    builder = PredictionTableBuilder()
+    if not args.validate:
+        print(f"Prediction table saved at: {builder.initiate_table_build()}")
+    print(builder.validate_table(n_samples=args.samples, full=args.full))
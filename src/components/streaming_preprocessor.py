@@ -0,0 +1,175 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.exception import CustomException
+
+
+def _column_roles(preprocessor):
+    """Split the ColumnTransformer's columns into numerical and categorical."""
+    numerical, categorical = [], []
+    for _, transformer, columns in preprocessor.transformers:
+        steps = [step for _, step in getattr(transformer, "steps", [])]
+        if any(type(step).__name__ == "OneHotEncoder" for step in steps):
+            categorical.extend(columns)
+        else:
+            numerical.extend(columns)
+    return numerical, categorical
+
+
+def _merge_counts(counts, values):
+    uniques, n = np.unique(values, return_counts=True)
+    for value, count in zip(uniques.tolist(), n.tolist()):
+        counts[value] = counts.get(value, 0) + count
+
+
+def _median_from_counts(counts):
+    values = np.array(sorted(counts), dtype=np.float64)
+    cumulative = np.cumsum([counts[value] for value in sorted(counts)])
+    total = int(cumulative[-1])
+    lower = values[np.searchsorted(cumulative, (total - 1) // 2, side="right")]
+    upper = values[np.searchsorted(cumulative, total // 2, side="right")]
+    return (lower + upper) / 2
+
+
+class StreamingPreprocessorFit:
+    """
+    Fit DataTransformation's ColumnTransformer (median imputer + scaler for
+    numerical columns, most-frequent imputer + one-hot + scaler for
+    categorical ones) in a single pass over chunks.
+
+    Per column it keeps the count, mean and sum of squared deviations of the
+    observed values (merged chunk by chunk with Chan's formula) and a
+    value -> count table, so memory grows with the number of distinct values
+    rather than rows. Medians, modes and vocabularies are exact; means and
+    scales match an in-memory fit up to floating point rounding.
+    """
+
+    def __init__(self, preprocessor):
+        self.preprocessor = preprocessor
+        self.numerical_columns, self.categorical_columns = _column_roles(preprocessor)
+        self.n_rows = 0
+        self.numerical = {
+            column: {"counts": {}, "n": 0, "mean": 0.0, "m2": 0.0}
+            for column in self.numerical_columns
+        }
+        self.categorical = {column: {} for column in self.categorical_columns}
+
+    def update(self, chunk):
+        for column, stats in self.numerical.items():
+            values = pd.to_numeric(chunk[column]).to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            if not len(values):
+                continue
+            _merge_counts(stats["counts"], values)
+            n, mean = len(values), float(values.mean())
+            m2 = float(((values - mean) ** 2).sum())
+            total = stats["n"] + n
+            delta = mean - stats["mean"]
+            stats["mean"] += delta * n / total
+            stats["m2"] += m2 + delta**2 * stats["n"] * n / total
+            stats["n"] = total
+
+        for column, counts in self.categorical.items():
+            for value, count in chunk[column].value_counts(sort=False).items():
+                if count:
+                    counts[value] = counts.get(value, 0) + int(count)
+
+        self.n_rows += len(chunk)
+        return self
+
+    def _numerical_stats(self):
+        medians, means, variances = [], [], []
+        for column, stats in self.numerical.items():
+            if not stats["n"]:
+                raise ValueError(f"Column {column!r} has no observed values")
+            median = _median_from_counts(stats["counts"])
+            # Missing values are imputed with the median before scaling
+            n_missing = self.n_rows - stats["n"]
+            delta = median - stats["mean"]
+            mean = stats["mean"] + delta * n_missing / self.n_rows
+            m2 = stats["m2"] + delta**2 * stats["n"] * n_missing / self.n_rows
+            medians.append(median)
+            means.append(mean)
+            variances.append(m2 / self.n_rows)
+        return medians, np.array(means), np.array(variances)
+
+    def _categorical_stats(self):
+        modes, vocabularies, frequencies = [], [], []
+        for column, counts in self.categorical.items():
+            if not counts:
+                raise ValueError(f"Column {column!r} has no observed values")
+            # Ties go to the smallest value, as in SimpleImputer
+            top = max(counts.values())
+            mode = min(value for value, count in counts.items() if count == top)
+            counts = dict(counts)
+            counts[mode] += self.n_rows - sum(counts.values())
+            vocabulary = sorted(counts)
+            modes.append(mode)
+            vocabularies.append(vocabulary)
+            frequencies.extend(counts[value] / self.n_rows for value in vocabulary)
+        return modes, vocabularies, np.array(frequencies)
+
+    def finalize(self):
+        """
+        Return the preprocessor fitted to the streamed statistics.
+
+        The transformer is first fitted on a small summary frame that
+        reproduces the exact medians, modes and vocabularies; the scalers'
+        moments are then replaced with the streamed ones.
+        """
+        try:
+            if not self.n_rows:
+                raise ValueError("No rows were streamed")
+            medians, means, variances = self._numerical_stats()
+            modes, vocabularies, frequencies = self._categorical_stats()
+
+            # One extra row of modes keeps each mode the most frequent value
+            n_summary = max([len(vocabulary) for vocabulary in vocabularies] + [0]) + 1
+            summary = {
+                column: np.full(n_summary, median)
+                for column, median in zip(self.numerical_columns, medians)
+            }
+            for column, mode, vocabulary in zip(
+                self.categorical_columns, modes, vocabularies
+            ):
+                summary[column] = np.array(
+                    vocabulary + [mode] * (n_summary - len(vocabulary)), dtype=object
+                )
+            preprocessor = self.preprocessor.fit(pd.DataFrame(summary))
+
+            for name, transformer, columns in preprocessor.transformers_:
+                if name == "remainder":
+                    continue
+                scaler = transformer.steps[-1][1]
+                if set(columns) <= set(self.numerical_columns):
+                    index = [self.numerical_columns.index(c) for c in columns]
+                    mean, var = means[index], variances[index]
+                else:
+                    # A one-hot column's mean is its frequency p, variance p(1 - p)
+                    mean, var = frequencies, frequencies * (1 - frequencies)
+                self._set_moments(scaler, mean, var)
+
+            return preprocessor
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _set_moments(self, scaler, mean, var):
+        if scaler.mean_ is not None:
+            scaler.mean_ = mean
+        if scaler.var_ is not None:
+            scaler.var_ = var
+            scale = np.sqrt(var)
+            # StandardScaler leaves constant features unscaled
+            scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+            scaler.scale_ = scale
+        scaler.n_samples_seen_ = np.asarray(scaler.n_samples_seen_).dtype.type(
+            self.n_rows
+        )
+
+    def fit(self, chunks):
+        for chunk in chunks:
+            self.update(chunk)
+        return self.finalize()
@@ -1,5 +1,5 @@
 import sys
-from src.logger import logging
+from src.logger import logging, setup_logging
 
 
 def error_message_detail(error, error_detail: sys):
@@ -23,6 +23,7 @@ class CustomException(Exception):
 
 
 if __name__ == "__main__":
+    setup_logging()
     try:
         a = 1 / 0
 
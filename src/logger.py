@@ -1,19 +1,225 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import sys
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Optional
 
-LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
-logs_path = os.path.join(os.getcwd(), "logs")
-os.makedirs(logs_path, exist_ok=True)
+FORMAT = "[%(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s"
 
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRIBUTES = set(logging.LogRecord("", 0, "", 0, "", None, None).__dict__) | {
+    "message",
+    "asctime",
+    "taskName",
+}
 
-LOG_FILE_PATH = os.path.join(logs_path, LOG_FILE)
 
-logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    format="[%(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
-)
+def _env_flag(name, default="false"):
+    return os.environ.get(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _parse_levels(spec):
+    """'uvicorn.access=WARNING,src.pipeline=DEBUG' -> {logger: level}"""
+    levels = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+@dataclass
+class LoggingConfig:
+    level: str = field(
+        default_factory=lambda: os.environ.get("LOG_LEVEL", "INFO").upper()
+    )
+    # Per-logger overrides, e.g. LOG_LEVELS="uvicorn.access=WARNING,src=DEBUG"
+    module_levels: Dict[str, str] = field(
+        default_factory=lambda: _parse_levels(os.environ.get("LOG_LEVELS", ""))
+    )
+    # Empty disables the file; "{pid}" is replaced per process so gunicorn
+    # workers don't rotate each other's files (the default has one)
+    file_path: str = field(
+        default_factory=lambda: os.environ.get(
+            "LOG_FILE", os.path.join("logs", "app-{pid}.log")
+        )
+    )
+    # Size-based rotation, or time-based when rotate_when is set
+    # (e.g. "midnight", "H"; see TimedRotatingFileHandler)
+    max_bytes: int = field(
+        default_factory=lambda: int(os.environ.get("LOG_MAX_BYTES", 10 * 1024 * 1024))
+    )
+    rotate_when: str = field(
+        default_factory=lambda: os.environ.get("LOG_ROTATE_WHEN", "")
+    )
+    backup_count: int = field(
+        default_factory=lambda: int(os.environ.get("LOG_BACKUP_COUNT", 5))
+    )
+    json: bool = field(default_factory=lambda: _env_flag("LOG_JSON"))
+    # Also write to stderr, e.g. for container log collection
+    console: bool = field(default_factory=lambda: _env_flag("LOG_CONSOLE"))
+    queue_size: int = field(
+        default_factory=lambda: int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+    )
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any `extra=` fields."""
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc)
+            .isoformat(timespec="milliseconds")
+            .replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Never blocks the caller: when the queue is full the record is dropped
+    and counted instead of stalling a request thread on slow disk I/O.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _LoggingState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.config: Optional[LoggingConfig] = None
+        self.handler: Optional[_DroppingQueueHandler] = None
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self.fork_hook = False
+
+
+_state = _LoggingState()
+
+
+def _output_handlers(config):
+    formatter = JsonFormatter() if config.json else logging.Formatter(FORMAT)
+    handlers = []
+    if config.file_path:
+        file_path = config.file_path.replace("{pid}", str(os.getpid()))
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        if config.rotate_when:
+            handler = logging.handlers.TimedRotatingFileHandler(
+                file_path,
+                when=config.rotate_when,
+                backupCount=config.backup_count,
+                delay=True,
+            )
+        else:
+            handler = logging.handlers.RotatingFileHandler(
+                file_path,
+                maxBytes=config.max_bytes,
+                backupCount=config.backup_count,
+                delay=True,
+            )
+        handlers.append(handler)
+    if config.console:
+        handlers.append(logging.StreamHandler(sys.stderr))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def _start(config):
+    log_queue = queue.Queue(maxsize=max(0, config.queue_size))
+    handler = _DroppingQueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(
+        log_queue, *_output_handlers(config), respect_handler_level=True
+    )
+    listener.start()
+
+    root = logging.getLogger()
+    if _state.handler is not None:
+        root.removeHandler(_state.handler)
+    root.addHandler(handler)
+    root.setLevel(config.level)
+    for name, level in config.module_levels.items():
+        logging.getLogger(name).setLevel(level)
+
+    _state.config = config
+    _state.handler = handler
+    _state.listener = listener
+
+
+def _stop():
+    listener = _state.listener
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+    logging.getLogger().removeHandler(_state.handler)
+    _state.listener = None
+    _state.handler = None
+
+
+def _restart_after_fork():
+    # The listener thread does not survive fork; give the child its own
+    if _state.listener is None:
+        return
+    _state.lock = threading.Lock()
+    _state.listener = None
+    _start(_state.config)
+
+
+def setup_logging(config: Optional[LoggingConfig] = None):
+    """
+    Route all logging through a bounded in-memory queue to a background
+    thread that writes the rotating log file and/or stderr, so callers never
+    wait on I/O. Entry points call this once; calling it again reconfigures.
+    Returns the active LoggingConfig.
+    """
+    with _state.lock:
+        _stop()
+        _start(config or LoggingConfig())
+        if not _state.fork_hook:
+            os.register_at_fork(after_in_child=_restart_after_fork)
+            atexit.register(shutdown_logging)
+            _state.fork_hook = True
+        return _state.config
+
+
+def shutdown_logging():
+    """Flush queued records and close the log files."""
+    with _state.lock:
+        _stop()
+
+
+def dropped_records():
+    return _state.handler.dropped if _state.handler is not None else 0
+
 
 if __name__ == "__main__":
+    setup_logging()
     logging.info("logging started")
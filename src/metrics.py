@@ -0,0 +1,328 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+SIZE_BUCKETS = tuple(2**power for power in range(17))
+DELTA_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        (registry or metrics).register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        with self._lock:
+            return [
+                (self.name, self.labelnames, key, (), value)
+                for key, value in sorted(self._values.items())
+            ]
+
+    def collect(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for name, labelnames, key, extra, value in self._samples():
+            labels = _format_labels(labelnames, key, extra)
+            lines.append(f"{name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """
+    A value that goes up and down. `set_function` makes the gauge read its
+    value at scrape time, e.g. a queue length, instead of being updated on
+    the hot path.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._function = None
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function):
+        self._function = function
+
+    def _samples(self):
+        if self._function is None:
+            return super()._samples()
+        try:
+            value = float(self._function())
+        except Exception:
+            value = math.nan
+        return [(self.name, (), (), (), value)]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, **kwargs
+    ):
+        super().__init__(name, documentation, labelnames, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def sum(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[1] if state else 0.0
+
+    def _samples(self):
+        samples = []
+        with self._lock:
+            items = sorted(
+                (key, (list(state[0]), state[1], state[2]))
+                for key, state in self._values.items()
+            )
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                samples.append(
+                    (
+                        f"{self.name}_bucket",
+                        self.labelnames,
+                        key,
+                        (("le", _format_value(float(bound))),),
+                        cumulative,
+                    )
+                )
+            samples.append(
+                (f"{self.name}_bucket", self.labelnames, key, (("le", "+Inf"),), count)
+            )
+            samples.append((f"{self.name}_sum", self.labelnames, key, (), total))
+            samples.append((f"{self.name}_count", self.labelnames, key, (), count))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            registered = list(self._metrics.values())
+        lines = []
+        for metric in registered:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route and status code.",
+    ("method", "route", "status"),
+)
+REQUEST_ERRORS = Counter(
+    "http_request_errors_total",
+    "HTTP requests that ended with a 5xx status or an unhandled exception.",
+    ("method", "route"),
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of the response.",
+    ("method", "route"),
+)
+STAGE_LATENCY = Histogram(
+    "prediction_stage_duration_seconds",
+    "Time spent in each prediction stage (predict includes preprocessing "
+    "when the compiled scorer is in use).",
+    ("stage",),
+)
+BATCH_SIZE = Histogram(
+    "prediction_batch_size",
+    "Records per scored batch, by source (batch endpoint or micro-batch).",
+    ("source",),
+    buckets=SIZE_BUCKETS,
+)
+MODEL_LOADS = Counter(
+    "model_loads_total", "Model artifact loads by outcome.", ("result",)
+)
+MODEL_LOAD_LATENCY = Histogram(
+    "model_load_duration_seconds",
+    "Time to read, unpickle and prepare the serving artifacts.",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+MODEL_INFERENCE_LATENCY = Histogram(
+    "model_inference_duration_seconds",
+    "Model scoring time per call (cache hits excluded), by model variant.",
+    ("variant",),
+)
+MODEL_RECORDS = Counter(
+    "model_records_scored_total",
+    "Records scored by the model (cache hits excluded), by model variant.",
+    ("variant",),
+)
+ROUTED_REQUESTS = Counter(
+    "model_routed_requests_total",
+    "Prediction requests by the model variant that served them.",
+    ("variant",),
+)
+SHADOW_REQUESTS = Counter(
+    "shadow_requests_total",
+    "Shadow scoring jobs by variant and result (scored, dropped, failed).",
+    ("variant", "result"),
+)
+SHADOW_DELTA = Histogram(
+    "shadow_prediction_delta",
+    "Absolute difference between a shadow variant's score and the served score.",
+    ("variant",),
+    buckets=DELTA_BUCKETS,
+)
+
+MICRO_BATCH_QUEUE_DEPTH = Gauge(
+    "micro_batch_queue_depth", "Requests waiting in the micro-batcher."
+)
+INFERENCE_POOL_IN_FLIGHT = Gauge(
+    "inference_pool_in_flight", "Calls running or queued on the inference pool."
+)
+MODEL_LOADED = Gauge("model_loaded", "1 when a model is resident, else 0.")
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware that counts requests and times them by route
+    template, so unmatched paths don't create unbounded label values.
+    """
+
+    def __init__(self, app, exclude=("/metrics",)):
+        self.app = app
+        self.exclude = set(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Middleware answers such as CORS preflights match no route either
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            method = scope["method"]
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start, method=method, route=route
+            )
+            REQUESTS.inc(method=method, route=route, status=status)
+            if status >= 500:
+                REQUEST_ERRORS.inc(method=method, route=route)
@@ -0,0 +1,273 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from src.exception import CustomException
+from src.logger import logging, setup_logging
+from src.pipeline.inference_pool import _init_worker, _worker_pipeline
+from src.pipeline.model_registry import ModelRegistry, ModelRegistryConfig
+from src.pipeline.predict_pipeline import PRIMARY_VARIANT, PredictPipeline
+from src.pipeline.prediction_cache import PredictionCache, PredictionCacheConfig
+from src.stage_cache import path_fingerprint
+from src.utils import iter_table
+
+PROGRESS_SUFFIX = ".progress.json"
+
+
+@dataclass
+class BulkPredictConfig:
+    # Rows read, scored and written together; also the resume granularity
+    chunk_size: int = field(
+        default_factory=lambda: int(os.environ.get("BULK_PREDICT_CHUNK_SIZE", 50000))
+    )
+    # Scoring processes; 1 scores in this process
+    workers: int = field(
+        default_factory=lambda: int(
+            os.environ.get("BULK_PREDICT_WORKERS") or os.cpu_count() or 1
+        )
+    )
+    start_method: str = field(
+        default_factory=lambda: os.environ.get(
+            "BULK_PREDICT_START_METHOD", "forkserver"
+        )
+    )
+    # Chunks read ahead per worker; bounds memory while keeping workers busy
+    prefetch: int = 2
+    registry_config: ModelRegistryConfig = field(
+        # The whole job is scored with the model it started with
+        default_factory=lambda: ModelRegistryConfig(reload_interval=0)
+    )
+
+
+def _scored_frame(chunk, results):
+    scored = chunk.reset_index(drop=True)
+    scored["predicted_math_score"] = [
+        result.get("predicted_math_score", np.nan) for result in results
+    ]
+    scored["confidence_level"] = [result.get("confidence_level") for result in results]
+    intervals = [result.get("prediction_interval") or {} for result in results]
+    scored["prediction_lower"] = [
+        interval.get("lower", np.nan) for interval in intervals
+    ]
+    scored["prediction_upper"] = [
+        interval.get("upper", np.nan) for interval in intervals
+    ]
+    scored["error"] = [result.get("error") for result in results]
+    return scored
+
+
+def _score_chunk(chunk, registry_config):
+    """Pool task: score one chunk with this process's resident model."""
+    pipeline = _worker_pipeline(registry_config, PRIMARY_VARIANT)
+    results = pipeline.predict_batch(chunk, chunk_size=len(chunk) or 1)
+    return pipeline.registry.get().version, _scored_frame(chunk, results)
+
+
+class BulkPredictPipeline:
+    """
+    Scores a whole CSV, Parquet or npy table offline. Chunks are read as a
+    stream and scored on a process pool whose workers each load the model
+    once; results are written to a CSV in input order as they complete.
+
+    After every chunk a <output>.progress.json checkpoint records how far
+    the output is complete. A rerun with the same input, chunk size and
+    model resumes after the last completed chunk; anything else starts
+    over. The checkpoint is removed when the job finishes.
+    """
+
+    def __init__(self, config: BulkPredictConfig = None):
+        self.bulk_predict_config = config or BulkPredictConfig()
+
+    @staticmethod
+    def _progress_path(output_path):
+        return output_path + PROGRESS_SUFFIX
+
+    def _resume_point(self, output_path, job):
+        """Chunks and output bytes already done for `job`, or None."""
+        progress_path = self._progress_path(output_path)
+        if not os.path.exists(progress_path) or not os.path.exists(output_path):
+            return None
+        with open(progress_path) as file_obj:
+            progress = json.load(file_obj)
+        if any(progress.get(key) != value for key, value in job.items()):
+            logging.warning(
+                f"Ignoring {progress_path}: it was written for a different "
+                "input, chunk size or model"
+            )
+            return None
+        if os.path.getsize(output_path) < progress["output_bytes"]:
+            logging.warning(f"{output_path} is shorter than its checkpoint")
+            return None
+        return progress
+
+    @staticmethod
+    def _checkpoint(progress_path, progress):
+        tmp_path = progress_path + ".tmp"
+        with open(tmp_path, "w") as file_obj:
+            json.dump(progress, file_obj, indent=2)
+        os.replace(tmp_path, progress_path)
+
+    def _chunks(self, input_path, skip):
+        for index, chunk in enumerate(
+            iter_table(input_path, self.bulk_predict_config.chunk_size)
+        ):
+            if index >= skip:
+                yield chunk
+
+    def _scored_chunks(self, chunks, version):
+        """Scored frames in input order, from the pool or this process."""
+        config = self.bulk_predict_config
+        if config.workers <= 1:
+            pipeline = PredictPipeline(
+                registry=ModelRegistry(config.registry_config),
+                cache=PredictionCache(PredictionCacheConfig(enabled=False)),
+            )
+            for chunk in chunks:
+                results = pipeline.predict_batch(chunk, chunk_size=len(chunk) or 1)
+                yield _scored_frame(chunk, results)
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=config.workers,
+            mp_context=multiprocessing.get_context(config.start_method),
+            initializer=_init_worker,
+            initargs=(config.registry_config,),
+        ) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(
+                    executor.submit(_score_chunk, chunk, config.registry_config)
+                )
+                if len(pending) >= config.workers * config.prefetch:
+                    yield self._collect(pending.popleft(), version)
+            while pending:
+                yield self._collect(pending.popleft(), version)
+
+    @staticmethod
+    def _collect(future, version):
+        worker_version, scored = future.result()
+        if worker_version != version:
+            raise RuntimeError(
+                f"A worker scored with model {worker_version}, expected {version}"
+            )
+        return scored
+
+    def initiate_bulk_prediction(self, input_path, output_path):
+        """
+        Score every row of `input_path` into the CSV `output_path` (the
+        input columns plus predicted_math_score, confidence_level, the
+        prediction interval bounds and error). Returns a summary with the row counts and throughput.
+        """
+        try:
+            config = self.bulk_predict_config
+            version = ModelRegistry(config.registry_config).get().version
+            job = {
+                "input_path": os.path.abspath(input_path),
+                "input_fingerprint": path_fingerprint(input_path),
+                "chunk_size": config.chunk_size,
+                "model_version": version,
+            }
+            progress_path = self._progress_path(output_path)
+            progress = self._resume_point(output_path, job)
+            if progress is None:
+                progress = dict(
+                    job, chunks=0, rows=0, succeeded=0, failed=0, output_bytes=0
+                )
+            resumed_chunks = progress["chunks"]
+            resumed_rows = progress["rows"]
+            if resumed_chunks:
+                logging.info(
+                    f"Resuming {output_path} after chunk {resumed_chunks} "
+                    f"({resumed_rows} rows)"
+                )
+
+            dir_path = os.path.dirname(output_path)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+            start = time.perf_counter()
+            mode = "r+b" if resumed_chunks else "wb"
+            with open(output_path, mode) as file_obj:
+                # Drop anything written after the last checkpoint
+                file_obj.truncate(progress["output_bytes"])
+                file_obj.seek(progress["output_bytes"])
+                chunks = self._chunks(input_path, resumed_chunks)
+                for scored in self._scored_chunks(chunks, version):
+                    csv = scored.to_csv(header=progress["chunks"] == 0, index=False)
+                    file_obj.write(csv.encode("utf-8"))
+                    file_obj.flush()
+                    os.fsync(file_obj.fileno())
+
+                    failed = int(scored["error"].notna().sum())
+                    progress["chunks"] += 1
+                    progress["rows"] += len(scored)
+                    progress["failed"] += failed
+                    progress["succeeded"] += len(scored) - failed
+                    progress["output_bytes"] = file_obj.tell()
+                    self._checkpoint(progress_path, progress)
+
+                    elapsed = time.perf_counter() - start
+                    logging.info(
+                        f"Chunk {progress['chunks']}: {progress['rows']} rows "
+                        f"scored, {(progress['rows'] - resumed_rows) / elapsed:.0f} "
+                        "rows/s"
+                    )
+
+            elapsed = time.perf_counter() - start
+            scored_rows = progress["rows"] - resumed_rows
+            if os.path.exists(progress_path):
+                os.remove(progress_path)
+            summary = {
+                "output_path": output_path,
+                "model_version": version,
+                "rows": progress["rows"],
+                "succeeded": progress["succeeded"],
+                "failed": progress["failed"],
+                "chunks": progress["chunks"],
+                "resumed_after_chunk": resumed_chunks,
+                "seconds": elapsed,
+                "rows_per_second": scored_rows / elapsed if elapsed else None,
+                "workers": config.workers,
+            }
+            logging.info(f"Bulk prediction finished: {summary}")
+            return summary
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    setup_logging()
+    parser = argparse.ArgumentParser(
+        description="Score a CSV, Parquet or npy table of students into a CSV"
+    )
+    parser.add_argument("input_path")
+    parser.add_argument("output_path")
+    parser.add_argument("--chunk-size", type=int)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    bulk_config = BulkPredictConfig()
+    if args.chunk_size:
+        bulk_config.chunk_size = args.chunk_size
+    if args.workers:
+        bulk_config.workers = args.workers
+    try:
+        summary = BulkPredictPipeline(bulk_config).initiate_bulk_prediction(
+            args.input_path, args.output_path
+        )
+        print(
+            f"Scored {summary['rows']} rows ({summary['failed']} failed) in "
+            f"{summary['seconds']:.1f}s, {summary['rows_per_second']:.0f} rows/s"
+        )
+        print(f"Predictions saved at: {summary['output_path']}")
+    except Exception as e:
+        print(f"Bulk prediction failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,124 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from src.logger import logging
+from src.pipeline.predict_pipeline import (
+    CATEGORICAL_COLUMNS,
+    NUMERICAL_COLUMNS,
+    PredictPipeline,
+)
+
+CANARY_SCORE = 70.0
+
+
+def _timestamp(seconds):
+    if seconds is None:
+        return None
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
+
+def canary_record(loaded):
+    """
+    A valid input built from the loaded preprocessor's own vocabularies, so
+    the canary keeps working when the categories change between versions.
+    """
+    record = {
+        column: (loaded.categories.get(column) or [""])[0]
+        for column in CATEGORICAL_COLUMNS
+    }
+    record.update({column: CANARY_SCORE for column in NUMERICAL_COLUMNS})
+    return record
+
+
+class ModelHealth:
+    """
+    Readiness of the resident model. Each model version is scored once on a
+    canary record, right after it is loaded, and the outcome is kept; probes
+    only read that result, the registry snapshot and the pool's last
+    successful call, so they never add inference load.
+    """
+
+    def __init__(self, registry, pool=None):
+        self.registry = registry
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._canary = None
+
+    def run_canary(self):
+        """
+        Score the canary on the currently loaded version unless that version
+        was already checked. Returns the canary result dict.
+        """
+        loaded = self.registry.get()
+        canary = self._canary
+        if canary is not None and canary["version"] == loaded.version:
+            return canary
+
+        with self._lock:
+            if self._canary is not None and self._canary["version"] == loaded.version:
+                return self._canary
+
+            start = time.perf_counter()
+            result = {"version": loaded.version, "checked_at": time.time()}
+            try:
+                features = pd.DataFrame([canary_record(loaded)])
+                score = float(PredictPipeline._predict_loaded(loaded, features)[0])
+                if not np.isfinite(score):
+                    raise ValueError(f"Canary prediction is not finite: {score}")
+                result.update(ok=True, score=round(score, 4), error=None)
+            except Exception as e:
+                logging.error(f"Canary prediction failed for {loaded.version}: {e}")
+                result.update(ok=False, score=None, error=str(e))
+            result["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            self._canary = result
+            return result
+
+    def needs_canary(self):
+        """True when a loaded version has not been canaried yet."""
+        current = self.registry.info()
+        canary = self._canary
+        return current["loaded"] and (
+            canary is None or canary["version"] != current["version"]
+        )
+
+    def readiness(self):
+        """
+        Ready means: a model is resident, its canary prediction succeeded and
+        the inference pool (when there is one) is accepting work.
+        """
+        info = self.registry.info()
+        canary = self._canary
+        if canary is not None and canary["version"] != info.get("version"):
+            canary = None
+
+        checks = {
+            "model_loaded": info["loaded"],
+            "canary_passed": bool(canary and canary["ok"]),
+        }
+        if self.pool is not None:
+            checks["inference_pool"] = self.pool.running
+
+        pool_stats = self.pool.stats() if self.pool is not None else {}
+        return {
+            "ready": all(checks.values()),
+            "checks": checks,
+            "model_version": info.get("version"),
+            "loaded_at": info.get("loaded_at"),
+            "load_duration_ms": info.get("load_duration_ms"),
+            "canary": (
+                None
+                if canary is None
+                else {
+                    "ok": canary["ok"],
+                    "score": canary["score"],
+                    "error": canary["error"],
+                    "duration_ms": canary["duration_ms"],
+                    "checked_at": _timestamp(canary["checked_at"]),
+                }
+            ),
+            "last_inference_at": _timestamp(pool_stats.get("last_success_at")),
+        }
@@ -0,0 +1,263 @@
+import asyncio
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Optional
+
+from src.exception import CustomException
+from src.logger import logging
+from src.pipeline.micro_batcher import QueueFullError
+from src.pipeline.model_registry import ModelRegistry
+from src.pipeline.predict_pipeline import (
+    PRIMARY_VARIANT,
+    PredictPipeline,
+    feature_key,
+)
+from src.pipeline.prediction_cache import PredictionCache, PredictionCacheConfig
+
+POOL_MODES = ("thread", "process")
+
+
+@dataclass
+class InferencePoolConfig:
+    # "thread" shares the worker's model; "process" gives each pool process
+    # its own copy and sidesteps the GIL for long batches
+    mode: str = field(
+        default_factory=lambda: os.environ.get("INFERENCE_POOL_MODE", "thread")
+    )
+    size: int = field(
+        default_factory=lambda: int(os.environ.get("INFERENCE_POOL_SIZE", 4))
+    )
+    # Calls allowed to wait for a free pool slot before new ones get a 503
+    max_queue: int = field(
+        default_factory=lambda: int(os.environ.get("INFERENCE_POOL_MAX_QUEUE", 64))
+    )
+    timeout: float = field(
+        default_factory=lambda: float(os.environ.get("INFERENCE_TIMEOUT", 10))
+    )
+    batch_timeout: float = field(
+        default_factory=lambda: float(os.environ.get("INFERENCE_BATCH_TIMEOUT", 120))
+    )
+    start_method: str = field(
+        default_factory=lambda: os.environ.get(
+            "INFERENCE_POOL_START_METHOD", "forkserver"
+        )
+    )
+
+
+class InferenceTimeoutError(TimeoutError):
+    """Raised when a pooled prediction does not finish within the timeout."""
+
+
+# Per pool process: one pipeline per model variant, created on first use
+_worker_pipelines = {}
+_worker_refreshed_at = {}
+
+
+def _worker_pipeline(registry_config, variant):
+    pipeline = _worker_pipelines.get(variant)
+    if pipeline is None:
+        # The parent owns the prediction cache; results are stored there
+        pipeline = PredictPipeline(
+            registry=ModelRegistry(registry_config),
+            cache=PredictionCache(PredictionCacheConfig(enabled=False)),
+            variant=variant,
+        )
+        pipeline.registry.load()
+        _worker_pipelines[variant] = pipeline
+        _worker_refreshed_at[variant] = time.monotonic()
+    return pipeline
+
+
+def _init_worker(registry_config):
+    """Load the primary model once per pool process, before it takes any work."""
+    _worker_pipeline(registry_config, PRIMARY_VARIANT)
+
+
+def _call_worker(method, args, kwargs, registry_config=None, variant=None):
+    variant = variant or PRIMARY_VARIANT
+    pipeline = _worker_pipeline(registry_config, variant)
+    registry = pipeline.registry
+    interval = registry.config.reload_interval
+    if interval > 0 and time.monotonic() - _worker_refreshed_at[variant] >= interval:
+        registry.refresh()
+        _worker_refreshed_at[variant] = time.monotonic()
+    version = registry.get().version
+    return version, getattr(pipeline, method)(*args, **kwargs)
+
+
+def _worker_ready():
+    return _worker_pipelines[PRIMARY_VARIANT].registry.get().version
+
+
+class InferencePool:
+    """
+    Runs PredictPipeline methods on a bounded thread or process pool so the
+    event loop never blocks on unpickling, transforms or sklearn compute.
+
+    At most `size` calls run at once and `max_queue` more may wait; beyond
+    that `run` raises QueueFullError straight away. A call that takes longer
+    than `timeout` raises InferenceTimeoutError; if it had not started yet
+    it is dropped, otherwise its slot stays taken until it finishes so a
+    slow model cannot pile up unbounded work.
+    """
+
+    def __init__(self, pipeline, config: Optional[InferencePoolConfig] = None):
+        self.pipeline = pipeline
+        self.config = config or InferencePoolConfig()
+        if self.config.mode not in POOL_MODES:
+            raise ValueError(
+                f"Unknown inference pool mode {self.config.mode!r}, "
+                f"expected one of {POOL_MODES}"
+            )
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.last_success_at = None
+
+    @property
+    def running(self):
+        return self._executor is not None
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def start(self):
+        """
+        Create the executor. Process pools are warmed up here so every
+        process has loaded the model before the first request.
+        """
+        try:
+            if self.running:
+                return
+            size = max(1, self.config.size)
+            if self.config.mode == "thread":
+                self._executor = ThreadPoolExecutor(
+                    max_workers=size, thread_name_prefix="inference"
+                )
+            else:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=size,
+                    mp_context=multiprocessing.get_context(self.config.start_method),
+                    initializer=_init_worker,
+                    initargs=(self.pipeline.registry.config,),
+                )
+                warmups = [self._executor.submit(_worker_ready) for _ in range(size)]
+                for warmup in warmups:
+                    warmup.result()
+            logging.info(
+                f"Inference pool started: {size} {self.config.mode}s, "
+                f"queue {self.config.max_queue}, timeout {self.config.timeout}s"
+            )
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _release(self, future):
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled():
+                return
+            if future.exception() is None:
+                self.completed += 1
+                self.last_success_at = time.time()
+            else:
+                self.failed += 1
+
+    async def run(self, method, *args, timeout=None, **kwargs):
+        """
+        Call `pipeline.<method>(*args, **kwargs)` on the pool, waiting at most
+        `timeout` seconds (the configured timeout by default).
+        """
+        return await self.run_on(
+            self.pipeline, method, *args, timeout=timeout, **kwargs
+        )
+
+    async def run_on(self, pipeline, method, *args, timeout=None, **kwargs):
+        """
+        Like `run`, for another PredictPipeline such as a model variant. Pool
+        processes build their own copy of it from its registry config.
+        """
+        timeout = self.config.timeout if timeout is None else timeout
+        if not self.running:
+            self.start()
+
+        with self._lock:
+            limit = max(1, self.config.size) + self.config.max_queue
+            if self._in_flight >= limit:
+                self.rejected += 1
+                raise QueueFullError(
+                    f"Inference pool is full ({self._in_flight} calls in flight)"
+                )
+            self._in_flight += 1
+
+        try:
+            if self.config.mode == "thread":
+                call = partial(getattr(pipeline, method), *args, **kwargs)
+                future = self._executor.submit(call)
+            else:
+                future = self._executor.submit(
+                    _call_worker,
+                    method,
+                    args,
+                    kwargs,
+                    pipeline.registry.config,
+                    pipeline.variant,
+                )
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise InferenceTimeoutError(f"Prediction did not finish within {timeout}s")
+
+        if self.config.mode == "process":
+            version, result = result
+            if method == "predict_record":
+                record = args[0] if args else kwargs["record"]
+                key = feature_key(record)
+                pipeline.cache.put(version, key, result, shared=False)
+                if pipeline.cache.shared is not None:
+                    # SQLite write; kept off the event loop
+                    await asyncio.to_thread(
+                        pipeline.cache.put_shared, version, key, result
+                    )
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "running": self.running,
+                "mode": self.config.mode,
+                "size": self.config.size,
+                "in_flight": self._in_flight,
+                "max_queue": self.config.max_queue,
+                "timeout_seconds": self.config.timeout,
+                "batch_timeout_seconds": self.config.batch_timeout,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "last_success_at": self.last_success_at,
+            }
@@ -0,0 +1,209 @@
+import asyncio
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Optional
+
+from src.exception import CustomException
+from src.logger import logging
+from src.metrics import BATCH_SIZE
+
+
+def _env_flag(name, default="false"):
+    return os.environ.get(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class MicroBatcherConfig:
+    enabled: bool = field(default_factory=lambda: _env_flag("MICRO_BATCHING_ENABLED"))
+    max_wait_ms: float = field(
+        default_factory=lambda: float(os.environ.get("MICRO_BATCH_WAIT_MS", 2))
+    )
+    max_batch_size: int = field(
+        default_factory=lambda: int(os.environ.get("MICRO_BATCH_MAX_SIZE", 64))
+    )
+    max_queue_depth: int = field(
+        default_factory=lambda: int(os.environ.get("MICRO_BATCH_MAX_QUEUE", 1024))
+    )
+
+
+class QueueFullError(Exception):
+    """Raised when the micro-batcher is saturated and sheds load."""
+
+
+class BatcherStoppedError(QueueFullError):
+    """
+    Raised for requests still waiting when the micro-batcher stops; a
+    QueueFullError, so callers answer it with a 503 like other overload.
+    """
+
+
+class PredictionError(Exception):
+    """Raised for a record the pipeline rejected inside a micro-batch."""
+
+
+class MicroBatcher:
+    """
+    Collects single prediction requests arriving within a short window and
+    scores them as one vectorized batch in a worker thread (or by awaiting
+    `predict_batch` when it is a coroutine function), resolving each
+    caller's future with its own result.
+    """
+
+    def __init__(self, predict_batch, config: Optional[MicroBatcherConfig] = None):
+        self.predict_batch = predict_batch
+        self.config = config or MicroBatcherConfig()
+        self._queue: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._in_flight = set()
+        # The batch the collector is still filling, not yet dispatched
+        self._collecting = []
+        self._stopping = False
+        self._pending = 0
+        self.batches = 0
+        self.requests = 0
+        self.rejected = 0
+        self.largest_batch = 0
+
+    @property
+    def queue_depth(self):
+        return self._pending
+
+    @property
+    def running(self):
+        return self._collector is not None and not self._collector.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._stopping = False
+        self._collector = asyncio.create_task(self._collect())
+        logging.info(
+            f"Micro-batching started: window {self.config.max_wait_ms} ms, "
+            f"batch {self.config.max_batch_size}, queue {self.config.max_queue_depth}"
+        )
+
+    async def stop(self):
+        """
+        Stop collecting, fail every request that was queued or in the
+        unfinished batch with BatcherStoppedError, and wait for the batches
+        already being scored.
+        """
+        self._stopping = True
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
+
+        waiting, self._collecting = self._collecting, []
+        while self._queue is not None and not self._queue.empty():
+            waiting.append(self._queue.get_nowait())
+        for _, future in waiting:
+            if not future.done():
+                future.set_exception(
+                    BatcherStoppedError("Micro-batcher stopped before scoring")
+                )
+
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def submit(self, record):
+        """Queue one record and wait for its result dict."""
+        if not self.running:
+            raise BatcherStoppedError("Micro-batcher is not running")
+        if self._pending >= self.config.max_queue_depth:
+            self.rejected += 1
+            raise QueueFullError(
+                f"Prediction queue is full ({self._pending} pending requests)"
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending += 1
+        self.requests += 1
+        try:
+            self._queue.put_nowait((record, future))
+            return await future
+        finally:
+            self._pending -= 1
+
+    def stats(self):
+        return {
+            "enabled": self.running,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.config.max_queue_depth,
+            "requests": self.requests,
+            "batches": self.batches,
+            "rejected": self.rejected,
+            "largest_batch": self.largest_batch,
+            "average_batch_size": (
+                round(self.requests / self.batches, 2) if self.batches else 0.0
+            ),
+        }
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        window = self.config.max_wait_ms / 1000
+
+        while not self._stopping:
+            batch = self._collecting = [await self._queue.get()]
+            deadline = loop.time() + window
+
+            # wait_for can swallow the cancel from stop() when a record
+            # arrives at the same moment, so the flag is checked as well
+            while len(batch) < self.config.max_batch_size and not self._stopping:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            if self._stopping:
+                # stop() fails the unfinished batch
+                return
+
+            # Keep collecting the next window while this batch is scored
+            task = asyncio.create_task(self._dispatch(batch))
+            self._collecting = []
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch):
+        batch = [(record, future) for record, future in batch if not future.done()]
+        if not batch:
+            return
+
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        BATCH_SIZE.observe(len(batch), source="micro_batch")
+        records = [record for record, _ in batch]
+
+        try:
+            if asyncio.iscoroutinefunction(self.predict_batch):
+                # e.g. InferencePool.run, which bounds and times the call itself
+                results = await self.predict_batch(records)
+            else:
+                results = await asyncio.to_thread(self.predict_batch, records)
+        except Exception as e:
+            # Overload and timeouts reach the caller as-is so they map to 503/504
+            error = (
+                e
+                if isinstance(e, (QueueFullError, TimeoutError))
+                else (CustomException(e, sys))
+            )
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if result["status"] == "success":
+                future.set_result(result)
+            else:
+                future.set_exception(PredictionError(result["error"]))
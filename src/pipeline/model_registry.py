@@ -0,0 +1,475 @@
+import asyncio
+import hashlib
+import importlib.util
+import os
+import pickle
+import sys
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.components.artifact_bundle import (
+    CURRENT_FILE,
+    ArtifactBundle,
+    current_bundle_path,
+)
+from src.components.compiled_model import load_compiled_model
+from src.components.compiled_preprocessor import compile_preprocessor
+from src.components.prediction_intervals import PredictionIntervals
+from src.components.prediction_table import PredictionTable, table_meta_path
+from src.exception import CustomException
+from src.logger import logging
+from src.metrics import MODEL_LOAD_LATENCY, MODEL_LOADS
+from src.utils import pickle_globals, pickle_packages
+
+PROJECT_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+def _artifact_path(env_var, file_name):
+    path = os.environ.get(env_var, os.path.join("artifacts", file_name))
+    if not os.path.isabs(path):
+        path = os.path.join(PROJECT_ROOT, path)
+    return path
+
+
+@dataclass
+class ModelRegistryConfig:
+    model_path: str = field(
+        default_factory=lambda: _artifact_path("MODEL_PATH", "model.pkl")
+    )
+    preprocessor_path: str = field(
+        default_factory=lambda: _artifact_path("PREPROCESSOR_PATH", "preprocessor.pkl")
+    )
+    compiled_model_path: str = field(
+        default_factory=lambda: _artifact_path(
+            "COMPILED_MODEL_PATH", "model_compiled.npz"
+        )
+    )
+    reload_interval: float = field(
+        default_factory=lambda: float(os.environ.get("MODEL_RELOAD_INTERVAL", 30))
+    )
+    prediction_table_path: str = field(
+        default_factory=lambda: _artifact_path(
+            "PREDICTION_TABLE_PATH", "prediction_table.npy"
+        )
+    )
+    # Answer integer-score requests from the precomputed table when present
+    prediction_table_enabled: bool = field(
+        default_factory=lambda: os.environ.get("PREDICTION_TABLE_ENABLED", "false")
+        .strip()
+        .lower()
+        in ("1", "true", "yes", "on")
+    )
+    prediction_intervals_path: str = field(
+        default_factory=lambda: _artifact_path(
+            "PREDICTION_INTERVALS_PATH", "prediction_intervals.json"
+        )
+    )
+    # Versioned artifact bundles; empty means "bundles" next to model_path.
+    # When its CURRENT pointer exists the bundle is served instead of the
+    # loose pickles
+    bundle_dir: str = field(
+        default_factory=lambda: os.environ.get("ARTIFACT_BUNDLE_DIR", "")
+    )
+    # Check every bundle file against the manifest's sha256 on load
+    verify_bundle: bool = field(
+        default_factory=lambda: os.environ.get("ARTIFACT_BUNDLE_VERIFY", "true")
+        .strip()
+        .lower()
+        in ("1", "true", "yes", "on")
+    )
+
+
+_MISSING = object()
+
+
+class PickledArtifact:
+    """
+    A pickled object that is only unpickled on first use, so serving never
+    imports the training libraries when the compiled scorer covers every
+    request. The classes the pickle needs are read from its opcodes without
+    importing anything.
+    """
+
+    def __init__(self, payload=None, value=_MISSING):
+        self._payload = payload
+        self._value = value
+        self._lock = threading.Lock()
+        references = pickle_globals(payload) if payload is not None else []
+        if references:
+            self.class_name = references[0][1]
+        else:
+            self.class_name = type(value).__name__ if value is not _MISSING else None
+        self.packages = pickle_packages(references)
+
+    @classmethod
+    def of(cls, value):
+        return cls(value=value)
+
+    @property
+    def loaded(self):
+        return self._value is not _MISSING
+
+    def get(self):
+        if self._value is _MISSING:
+            with self._lock:
+                if self._value is _MISSING:
+                    self._value = pickle.loads(self._payload)
+                    self._payload = None
+        return self._value
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """
+    An immutable snapshot of the serving artifacts. Requests grab one snapshot
+    and use it end to end, so a reload never mixes an old preprocessor with a
+    new model mid-request.
+
+    With a valid compiled scorer the pickles are kept unread until something
+    asks for `model` or `preprocessor`.
+    """
+
+    model_artifact: PickledArtifact
+    preprocessor_artifact: PickledArtifact
+    version: str
+    loaded_at: str
+    load_duration: float
+    fingerprint: Tuple
+    categories: Dict[str, List[str]] = field(default_factory=dict)
+    transformer: Any = None
+    scorer: Any = None
+    table: Any = None
+    bundle: Any = None
+    intervals: Any = None
+
+    @property
+    def model(self):
+        return self.model_artifact.get()
+
+    @property
+    def preprocessor(self):
+        return self.preprocessor_artifact.get()
+
+
+def _fitted_categories(preprocessor):
+    """
+    Map each categorical input column to the vocabulary its OneHotEncoder was
+    fitted on, so requests can be checked before they reach the encoder.
+    """
+    categories = {}
+    for _, transformer, columns in getattr(preprocessor, "transformers_", []):
+        steps = getattr(transformer, "steps", [("", transformer)])
+        for _, step in steps:
+            if hasattr(step, "categories_"):
+                for column, values in zip(columns, step.categories_):
+                    categories[column] = [str(value) for value in values]
+    return categories
+
+
+def _compiled_categories(compiled_preprocessor):
+    return {
+        column: [str(value) for value in values]
+        for column, values in zip(
+            compiled_preprocessor.categorical_columns,
+            compiled_preprocessor.categories,
+        )
+    }
+
+
+def _missing_packages(packages):
+    return [
+        package for package in packages if importlib.util.find_spec(package) is None
+    ]
+
+
+def _fast_transformer(preprocessor):
+    try:
+        return compile_preprocessor(preprocessor)
+    except (AttributeError, ValueError) as e:
+        logging.warning(f"Serving with the sklearn preprocessor: {e}")
+        return preprocessor
+
+
+def _bundle_info(bundle):
+    if bundle is None:
+        return None
+    return {
+        "path": bundle.path,
+        "format_version": bundle.manifest["format_version"],
+        "created_at": bundle.manifest["created_at"],
+        "compression": bundle.manifest["compression"],
+        "memory_mapped_arrays": len(bundle.manifest["arrays"]),
+        "metrics": bundle.manifest["metrics"],
+    }
+
+
+def _stat_fingerprint(*paths, optional=()):
+    fingerprint = []
+    for path in paths:
+        stat = os.stat(path)
+        fingerprint.append((stat.st_mtime_ns, stat.st_size))
+    for path in optional:
+        try:
+            stat = os.stat(path)
+            fingerprint.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            fingerprint.append(None)
+    return tuple(fingerprint)
+
+
+class ModelRegistry:
+    """
+    Process-wide holder for the model and preprocessor. Artifacts are
+    unpickled once and swapped atomically when the files on disk change.
+    """
+
+    def __init__(self, config: Optional[ModelRegistryConfig] = None):
+        self.config = config or ModelRegistryConfig()
+        self._current: Optional[LoadedModel] = None
+        self._pending_fingerprint = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self):
+        return self._current is not None
+
+    def get(self) -> LoadedModel:
+        current = self._current
+        if current is None:
+            with self._lock:
+                if self._current is None:
+                    self._current = self._load()
+                current = self._current
+        return current
+
+    def load(self) -> LoadedModel:
+        with self._lock:
+            self._current = self._load()
+            self._pending_fingerprint = None
+            return self._current
+
+    def refresh(self) -> bool:
+        """
+        Reload the artifacts if they changed on disk. A change has to be seen
+        on two consecutive checks before it is picked up, so a training run
+        that is still writing model.pkl and preprocessor.pkl is not loaded
+        half-way through. Returns True when a new version was swapped in.
+        """
+        try:
+            fingerprint = self._fingerprint()
+        except OSError as e:
+            logging.warning(f"Model artifacts unavailable for refresh: {e}")
+            return False
+
+        current = self._current
+        if current is not None and fingerprint == current.fingerprint:
+            self._pending_fingerprint = None
+            return False
+
+        if current is not None and fingerprint != self._pending_fingerprint:
+            self._pending_fingerprint = fingerprint
+            return False
+
+        with self._lock:
+            try:
+                candidate = self._load()
+            except CustomException as e:
+                logging.error(f"Model reload failed, keeping current version: {e}")
+                return False
+
+            self._pending_fingerprint = None
+            if self._current is not None and candidate.version == self._current.version:
+                # Touched but identical content: keep the existing objects
+                self._current = replace(
+                    self._current, fingerprint=candidate.fingerprint
+                )
+                return False
+
+            self._current = candidate
+            logging.info(f"Model registry swapped in version {candidate.version}")
+            return True
+
+    async def watch(self, interval: Optional[float] = None):
+        interval = self.config.reload_interval if interval is None else interval
+        if interval <= 0:
+            return
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.refresh)
+
+    def info(self):
+        current = self._current
+        if current is None:
+            return {"loaded": False}
+        return {
+            "loaded": True,
+            "version": current.version,
+            "loaded_at": current.loaded_at,
+            "load_duration_ms": round(current.load_duration * 1000, 3),
+            "model_class": current.model_artifact.class_name,
+            "pickles_loaded": current.model_artifact.loaded,
+            "required_packages": sorted(
+                set(current.model_artifact.packages)
+                | set(current.preprocessor_artifact.packages)
+            ),
+            "compiled": current.scorer.kind if current.scorer is not None else None,
+            "prediction_table": (
+                list(current.table.shape) if current.table is not None else None
+            ),
+            "bundle": _bundle_info(current.bundle),
+            "prediction_interval_coverage": (
+                current.intervals.coverage if current.intervals is not None else None
+            ),
+        }
+
+    def _bundle_dir(self):
+        if self.config.bundle_dir:
+            return self.config.bundle_dir
+        return os.path.join(os.path.dirname(self.config.model_path), "bundles")
+
+    def _fingerprint(self):
+        optional = [
+            self.config.compiled_model_path,
+            self.config.prediction_intervals_path,
+        ]
+        if self.config.prediction_table_enabled:
+            optional.append(table_meta_path(self.config.prediction_table_path))
+        # Bundles are immutable, so the CURRENT pointer stands for all of them
+        pointer = os.path.join(self._bundle_dir(), CURRENT_FILE)
+        if os.path.exists(pointer):
+            return _stat_fingerprint(pointer, optional=optional)
+        return _stat_fingerprint(
+            self.config.model_path,
+            self.config.preprocessor_path,
+            optional=optional + [pointer],
+        )
+
+    def _load_scorer(self, version, bundle=None):
+        if bundle is not None:
+            try:
+                scorer = bundle.compiled_model()
+                if scorer is not None:
+                    return scorer
+            except Exception as e:
+                logging.warning(f"Bundled compiled model unusable: {e}")
+        try:
+            return load_compiled_model(
+                self.config.compiled_model_path, source_version=version
+            )
+        except CustomException as e:
+            logging.warning(f"Compiled model unusable, serving from pickles: {e}")
+            return None
+
+    def _load_table(self, version):
+        if not self.config.prediction_table_enabled:
+            return None
+        try:
+            return PredictionTable.load(
+                self.config.prediction_table_path, source_version=version
+            )
+        except CustomException as e:
+            logging.warning(f"Prediction table unusable, scoring live: {e}")
+            return None
+
+    def _load_intervals(self, version, bundle=None):
+        try:
+            if bundle is not None:
+                intervals = bundle.prediction_intervals()
+                if intervals is not None:
+                    return intervals
+            return PredictionIntervals.load(
+                self.config.prediction_intervals_path, source_version=version
+            )
+        except Exception as e:
+            logging.warning(f"Prediction intervals unusable, serving without: {e}")
+            return None
+
+    def _load(self) -> LoadedModel:
+        try:
+            start = time.perf_counter()
+            model_path = self.config.model_path
+            preprocessor_path = self.config.preprocessor_path
+
+            fingerprint = self._fingerprint()
+            bundle_path = current_bundle_path(self._bundle_dir())
+            if bundle_path is not None:
+                bundle = ArtifactBundle.open(
+                    bundle_path, verify=self.config.verify_bundle
+                )
+                model_bytes, preprocessor_bytes = bundle.read_pickles()
+                version = bundle.version
+                source = bundle_path
+                mismatches = bundle.library_mismatches()
+                if mismatches:
+                    logging.warning(
+                        f"Bundle {version} was built with different library "
+                        f"versions (bundled, installed): {mismatches}"
+                    )
+            else:
+                bundle = None
+                with open(model_path, "rb") as file_obj:
+                    model_bytes = file_obj.read()
+                with open(preprocessor_path, "rb") as file_obj:
+                    preprocessor_bytes = file_obj.read()
+
+                digest = hashlib.sha256()
+                digest.update(model_bytes)
+                digest.update(preprocessor_bytes)
+                version = digest.hexdigest()[:12]
+                source = model_path
+
+            model_artifact = PickledArtifact(model_bytes)
+            preprocessor_artifact = PickledArtifact(preprocessor_bytes)
+            missing = _missing_packages(
+                set(model_artifact.packages) | set(preprocessor_artifact.packages)
+            )
+            if missing:
+                logging.warning(
+                    f"Packages needed to unpickle model {version} are not "
+                    f"installed: {missing}"
+                )
+
+            scorer = self._load_scorer(version, bundle)
+            if scorer is not None:
+                # Everything serving needs is in the compiled artifact
+                categories = _compiled_categories(scorer.preprocessor)
+                transformer = scorer.preprocessor
+            else:
+                preprocessor = preprocessor_artifact.get()
+                model_artifact.get()
+                categories = _fitted_categories(preprocessor)
+                transformer = _fast_transformer(preprocessor)
+
+            loaded = LoadedModel(
+                model_artifact=model_artifact,
+                preprocessor_artifact=preprocessor_artifact,
+                version=version,
+                loaded_at=datetime.now(timezone.utc).isoformat(),
+                load_duration=time.perf_counter() - start,
+                fingerprint=fingerprint,
+                categories=categories,
+                transformer=transformer,
+                scorer=scorer,
+                table=self._load_table(version),
+                bundle=bundle,
+                intervals=self._load_intervals(version, bundle),
+            )
+            logging.info(
+                f"Loaded model {loaded.version} from {source} "
+                f"in {loaded.load_duration * 1000:.1f} ms"
+            )
+            MODEL_LOADS.inc(result="success")
+            MODEL_LOAD_LATENCY.observe(loaded.load_duration)
+            return loaded
+
+        except Exception as e:
+            MODEL_LOADS.inc(result="failure")
+            raise CustomException(e, sys)
+
+
+model_registry = ModelRegistry()
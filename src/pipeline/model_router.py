@@ -0,0 +1,318 @@
+import asyncio
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Dict, List
+
+import numpy as np
+
+from src.components.model_selection import default_r2_tolerance
+from src.components.model_variants import VARIANTS_INDEX_FILE
+from src.logger import logging
+from src.metrics import (
+    MODEL_INFERENCE_LATENCY,
+    MODEL_RECORDS,
+    ROUTED_REQUESTS,
+    SHADOW_DELTA,
+    SHADOW_REQUESTS,
+)
+from src.pipeline.model_registry import PROJECT_ROOT, ModelRegistry
+from src.pipeline.predict_pipeline import PRIMARY_VARIANT, PredictPipeline
+from src.pipeline.prediction_cache import PredictionCache
+from src.utils import load_json
+
+VARIANT_HEADER = "X-Model-Variant"
+
+
+def _parse_weights(spec):
+    """'primary=90,ridge_regression=10' -> {variant: weight}"""
+    weights = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, weight = item.split("=", 1)
+            weights[name.strip()] = float(weight)
+    return weights
+
+
+def _parse_names(spec):
+    return [name.strip() for name in spec.split(",") if name.strip()]
+
+
+def _variants_dir():
+    path = os.environ.get("MODEL_VARIANTS_DIR", os.path.join("artifacts", "variants"))
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+
+@dataclass
+class ModelRouterConfig:
+    variants_dir: str = field(default_factory=_variants_dir)
+    # Share of traffic per variant, e.g. "primary=90,ridge_regression=10";
+    # empty sends everything to the primary model
+    weights: Dict[str, float] = field(
+        default_factory=lambda: _parse_weights(
+            os.environ.get("MODEL_ROUTING_WEIGHTS", "")
+        )
+    )
+    # Variants that score a copy of live traffic without serving it
+    shadow: List[str] = field(
+        default_factory=lambda: _parse_names(os.environ.get("MODEL_SHADOW", ""))
+    )
+    # Shadow jobs allowed to wait; beyond that new ones are dropped
+    shadow_max_pending: int = field(
+        default_factory=lambda: int(os.environ.get("MODEL_SHADOW_MAX_PENDING", 64))
+    )
+    # Variants within this much test R2 of the best count as equally good
+    r2_tolerance: float = field(default_factory=default_r2_tolerance)
+
+
+class UnknownVariantError(ValueError):
+    """Raised when a request or the routing config names no known variant."""
+
+
+class ModelRouter:
+    """
+    Serves the primary model and the runner-up variants saved by training
+    side by side. Each request goes to one variant, chosen by the
+    X-Model-Variant header or at random by the configured weights. Shadow
+    variants then score a copy of the same input on their own single
+    thread with a bounded backlog, so they never hold up the response.
+
+    Per-variant scoring cost and each shadow's distance from the served
+    scores are exported as metrics and summarized by `report`.
+    """
+
+    def __init__(self, primary, config=None):
+        self.primary = primary
+        self.config = config or ModelRouterConfig()
+        self._pipelines = {PRIMARY_VARIANT: primary}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self._index = None
+        self._shadow_executor = None
+        self._shadow_pending = 0
+
+    def index(self):
+        """The variants.json written by training, reread when it changes."""
+        path = os.path.join(self.config.variants_dir, VARIANTS_INDEX_FILE)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return {"best": None, "primary": None, "variants": []}
+        cached = self._index
+        if cached is None or cached[0] != mtime:
+            cached = self._index = (mtime, load_json(path))
+        return cached[1]
+
+    def variant_names(self):
+        return [PRIMARY_VARIANT] + [
+            variant["name"] for variant in self.index()["variants"]
+        ]
+
+    def pipeline(self, variant):
+        """The PredictPipeline for `variant`, created on first use."""
+        pipeline = self._pipelines.get(variant)
+        if pipeline is not None:
+            return pipeline
+        if variant not in self.variant_names():
+            raise UnknownVariantError(f"Unknown model variant {variant!r}")
+
+        with self._lock:
+            if variant not in self._pipelines:
+                variant_dir = os.path.join(self.config.variants_dir, variant)
+                registry = ModelRegistry(
+                    replace(
+                        self.primary.registry.config,
+                        model_path=os.path.join(variant_dir, "model.pkl"),
+                        preprocessor_path=os.path.join(variant_dir, "preprocessor.pkl"),
+                        compiled_model_path=os.path.join(
+                            variant_dir, "model_compiled.npz"
+                        ),
+                        prediction_intervals_path=os.path.join(
+                            variant_dir, "prediction_intervals.json"
+                        ),
+                        prediction_table_enabled=False,
+                        bundle_dir="",
+                    )
+                )
+                # A cache treats a new version as a model swap and drops the
+                # old one, so each variant caches separately from the primary
+                self._pipelines[variant] = PredictPipeline(
+                    registry=registry,
+                    cache=PredictionCache(replace(self.primary.cache.config)),
+                    variant=variant,
+                )
+            return self._pipelines[variant]
+
+    def choose(self, requested=None):
+        """The variant named by `requested`, else a weighted random pick."""
+        if requested:
+            requested = requested.strip()
+            self.pipeline(requested)
+            return requested
+        weights = self.config.weights
+        if not weights:
+            return PRIMARY_VARIANT
+        names = list(weights)
+        return self._random.choices(names, weights=[weights[n] for n in names])[0]
+
+    def load(self):
+        """Load every variant the routing weights or shadow list refer to."""
+        for variant in set(self.config.weights) | set(self.config.shadow):
+            if variant != PRIMARY_VARIANT:
+                self.pipeline(variant).registry.get()
+
+    async def watch(self, interval=None):
+        """
+        Hot-reload every loaded variant, including those first requested
+        after startup (the primary has its own watcher).
+        """
+        config = self.primary.registry.config
+        interval = config.reload_interval if interval is None else interval
+        if interval <= 0:
+            return
+        while True:
+            await asyncio.sleep(interval)
+            for variant, pipeline in list(self._pipelines.items()):
+                # Unloaded variants load the current files on first use
+                if variant != PRIMARY_VARIANT and pipeline.registry.is_loaded:
+                    await asyncio.to_thread(pipeline.registry.refresh)
+
+    def served(self, variant):
+        ROUTED_REQUESTS.inc(variant=variant)
+
+    def shadow(self, records, scores, served=PRIMARY_VARIANT):
+        """
+        Score `records` (a list of dicts or a DataFrame) with every shadow
+        variant except `served`, in the background, and compare with the
+        served `scores` (NaN where a record failed). Returns immediately;
+        jobs beyond shadow_max_pending are dropped.
+        """
+        scores = np.asarray(scores, dtype=float)
+        for variant in self.config.shadow:
+            if variant == served:
+                continue
+            with self._lock:
+                if self._shadow_pending >= self.config.shadow_max_pending:
+                    SHADOW_REQUESTS.inc(variant=variant, result="dropped")
+                    continue
+                self._shadow_pending += 1
+                if self._shadow_executor is None:
+                    self._shadow_executor = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="shadow"
+                    )
+                executor = self._shadow_executor
+            executor.submit(self._score_shadow, variant, records, scores)
+
+    def _score_shadow(self, variant, records, served_scores):
+        try:
+            results = self.pipeline(variant).predict_batch(records)
+            scores = np.array(
+                [result.get("predicted_math_score", np.nan) for result in results],
+                dtype=float,
+            )
+            deltas = np.abs(scores - served_scores)
+            for delta in deltas[~np.isnan(deltas)].tolist():
+                SHADOW_DELTA.observe(delta, variant=variant)
+            SHADOW_REQUESTS.inc(variant=variant, result="scored")
+        except Exception as e:
+            logging.warning(f"Shadow scoring with {variant} failed: {e}")
+            SHADOW_REQUESTS.inc(variant=variant, result="failed")
+        finally:
+            with self._lock:
+                self._shadow_pending -= 1
+
+    def stop(self, wait=False):
+        """Shut down the shadow thread; `wait` lets queued jobs finish."""
+        with self._lock:
+            executor, self._shadow_executor = self._shadow_executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _rows(self):
+        index = self.index()
+        entries = {variant["name"]: variant for variant in index["variants"]}
+        weights = self.config.weights
+        rows = []
+        for variant in self.variant_names():
+            if variant == PRIMARY_VARIANT:
+                entry = entries.get(index.get("primary") or index["best"])
+            else:
+                entry = entries.get(variant)
+            entry = entry or {}
+            pipeline = self._pipelines.get(variant)
+            records = MODEL_RECORDS.value(variant=variant)
+            deltas = SHADOW_DELTA.count(variant=variant)
+            rows.append(
+                {
+                    "variant": variant,
+                    "model": entry.get("model"),
+                    "test_r2": entry.get("test_r2"),
+                    "train_r2": entry.get("train_r2"),
+                    "loaded": pipeline is not None and pipeline.registry.is_loaded,
+                    "routing_weight": weights.get(
+                        variant, float(not weights and variant == PRIMARY_VARIANT)
+                    ),
+                    "shadow": variant in self.config.shadow,
+                    "served_requests": ROUTED_REQUESTS.value(variant=variant),
+                    "records_scored": records,
+                    "seconds_per_record": (
+                        MODEL_INFERENCE_LATENCY.sum(variant=variant) / records
+                        if records
+                        else None
+                    ),
+                    "offline_seconds_per_record": entry.get(
+                        "predict_seconds_per_record"
+                    ),
+                    "mean_abs_delta": (
+                        SHADOW_DELTA.sum(variant=variant) / deltas if deltas else None
+                    ),
+                    "shadow_dropped": SHADOW_REQUESTS.value(
+                        variant=variant, result="dropped"
+                    ),
+                }
+            )
+        return rows
+
+    def recommend(self, rows=None):
+        """
+        The cheapest variant whose test R2 is within r2_tolerance of the
+        best. Cost is the live seconds per record when every candidate has
+        been measured in this process, else the offline prediction time
+        recorded at training. None without a variants index.
+        """
+        rows = self._rows() if rows is None else rows
+        scored = [row for row in rows if row["test_r2"] is not None]
+        if not scored:
+            return None
+        best_r2 = max(row["test_r2"] for row in scored)
+        candidates = [
+            row
+            for row in scored
+            if row["test_r2"] >= best_r2 - self.config.r2_tolerance
+        ]
+        for basis, key in (
+            ("live", "seconds_per_record"),
+            ("offline", "offline_seconds_per_record"),
+        ):
+            if all(row[key] is not None for row in candidates):
+                choice = min(candidates, key=lambda row: row[key])
+                return {
+                    "variant": choice["variant"],
+                    "model": choice["model"],
+                    "test_r2": choice["test_r2"],
+                    "best_test_r2": best_r2,
+                    "seconds_per_record": choice[key],
+                    "basis": basis,
+                }
+        return None
+
+    def report(self):
+        rows = self._rows()
+        return {
+            "variants": rows,
+            "shadow_pending": self._shadow_pending,
+            "r2_tolerance": self.config.r2_tolerance,
+            "recommendation": self.recommend(rows),
+        }
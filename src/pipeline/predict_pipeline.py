@@ -1,41 +1,356 @@
+import bisect
+import itertools
 import sys
-import os
+import threading
+import numpy as np
 import pandas as pd
 from src.exception import CustomException
-from src.utils import load_object
+from src.metrics import MODEL_INFERENCE_LATENCY, MODEL_RECORDS, STAGE_LATENCY
+from src.pipeline.model_registry import model_registry
+from src.pipeline.prediction_cache import prediction_cache
+
+NUMERICAL_COLUMNS = ["reading_score", "writing_score"]
+CATEGORICAL_COLUMNS = [
+    "gender",
+    "race_ethnicity",
+    "parental_level_of_education",
+    "lunch",
+    "test_preparation_course",
+]
+FEATURE_COLUMNS = CATEGORICAL_COLUMNS + NUMERICAL_COLUMNS
+
+SCORE_MIN = 0
+SCORE_MAX = 100
+
+# Name of the model served from artifacts/model.pkl; see model_router
+PRIMARY_VARIANT = "primary"
+
+
+# Lower bounds of Medium and High; anything below the first is Low
+CONFIDENCE_THRESHOLDS = (60, 80)
+CONFIDENCE_LABELS = ("Low", "Medium", "High")
+_CONFIDENCE_LABELS = np.array(CONFIDENCE_LABELS)
+
+
+def confidence_levels(scores):
+    """
+    Bucket predicted scores into High (>= 80), Medium (>= 60) and Low.
+    """
+    scores = np.asarray(scores, dtype=float)
+    return _CONFIDENCE_LABELS[
+        np.searchsorted(CONFIDENCE_THRESHOLDS, scores, side="right")
+    ]
+
+
+def confidence_level(score):
+    """confidence_levels for a single score, without building arrays."""
+    return CONFIDENCE_LABELS[bisect.bisect_right(CONFIDENCE_THRESHOLDS, score)]
+
+
+def interval_entry(lower, upper, coverage):
+    """The prediction_interval field of a response."""
+    return {"lower": round(lower, 2), "upper": round(upper, 2), "coverage": coverage}
+
+
+def validate_record(record, categories):
+    """
+    Check a single record's categorical values against the fitted
+    vocabularies, trimming whitespace in place. Returns {column: message}
+    for the values the encoder would reject.
+    """
+    errors = {}
+    for column in CATEGORICAL_COLUMNS:
+        value = record.get(column)
+        if isinstance(value, str):
+            value = record[column] = value.strip()
+        vocabulary = categories.get(column)
+        if value is None:
+            errors[column] = f"{column} is required"
+        elif vocabulary and value not in vocabulary:
+            errors[column] = f"{column} has unknown value"
+    return errors
+
+
+# Per thread: a reusable (1, n_features) row for the single-record path
+_row_buffers = threading.local()
+
+
+def _row_buffer(width):
+    buffer = getattr(_row_buffers, "buffer", None)
+    if buffer is None or buffer.shape[1] != width:
+        buffer = _row_buffers.buffer = np.empty((1, width), dtype=np.float64)
+    return buffer
+
+
+def feature_key(record):
+    """
+    Canonical feature tuple for a record: trimmed strings for the
+    categoricals and floats for the scores, so 70 and "70.0" share a key.
+    Returns None when the record cannot be canonicalized.
+    """
+    try:
+        return tuple(str(record[column]).strip() for column in CATEGORICAL_COLUMNS) + (
+            tuple(float(record[column]) for column in NUMERICAL_COLUMNS)
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def validate_features(df, categories=None):
+    """
+    Validate every row of a feature DataFrame at once.
+
+    Returns the cleaned DataFrame (numeric columns coerced to float) and a
+    Series holding an error message per row, or None for valid rows.
+    """
+    df = df.reindex(columns=FEATURE_COLUMNS)
+    errors = pd.Series("", index=df.index, dtype=object)
+
+    def flag(mask, message):
+        nonlocal errors
+        errors = errors.where(~mask, errors + message + "; ")
+
+    for column in CATEGORICAL_COLUMNS:
+        values = df[column]
+        missing = values.isna()
+        flag(missing, f"{column} is required")
+        values = values.astype(str).str.strip()
+        df[column] = values.where(~missing)
+
+        vocabulary = (categories or {}).get(column)
+        if vocabulary:
+            flag(~missing & ~values.isin(vocabulary), f"{column} has unknown value")
+
+    for column in NUMERICAL_COLUMNS:
+        raw = df[column]
+        values = pd.to_numeric(raw, errors="coerce")
+        missing = raw.isna()
+        flag(missing, f"{column} is required")
+        flag(~missing & values.isna(), f"{column} must be a number")
+        out_of_range = (values < SCORE_MIN) | (values > SCORE_MAX)
+        flag(out_of_range, f"{column} must be between {SCORE_MIN} and {SCORE_MAX}")
+        df[column] = values.astype(float)
+
+    errors = errors.str.rstrip("; ")
+    return df, errors.where(errors != "", None)
 
 
 class PredictPipeline:
-    def __init__(self):
-        pass
+    def __init__(self, registry=None, cache=None, variant=PRIMARY_VARIANT):
+        self.registry = registry or model_registry
+        self.cache = cache if cache is not None else prediction_cache
+        # Labels the per-variant inference metrics
+        self.variant = variant
 
     def predict(self, features):
         try:
-            # Get the absolute path to the project root directory
-            project_root = os.path.dirname(
-                os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            )
+            # Take one snapshot so a concurrent reload cannot mix versions
+            loaded = self.registry.get()
+
+            return self._predict_loaded(loaded, features)
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def cached_prediction(self, record, shared=True):
+        """
+        Return the cached score for a single record under the current model
+        version, or None on a miss. With `shared=False` only the in-process
+        cache is checked; shared_cached_prediction covers the host's
+        shared cache.
+        """
+        return self.cache.get(
+            self.registry.get().version, feature_key(record), shared=shared
+        )
+
+    def shared_cached_prediction(self, record):
+        """Like cached_prediction, against the shared cache only. Blocking."""
+        return self.cache.get_shared(self.registry.get().version, feature_key(record))
+
+    def prediction_interval(self, score):
+        """
+        The interval entry for a score from predict_record or the cache, or
+        None when the loaded model has no calibrated intervals.
+        """
+        intervals = self.registry.get().intervals
+        if intervals is None:
+            return None
+        return interval_entry(*intervals.interval(score), intervals.coverage)
+
+    def predict_record(self, record):
+        """Score a single record dict and remember the result in the cache."""
+        try:
+            loaded = self.registry.get()
+            score = None
+            with MODEL_INFERENCE_LATENCY.time(variant=self.variant):
+                if loaded.table is not None:
+                    with STAGE_LATENCY.time(stage="table_lookup"):
+                        score = loaded.table.lookup_row(record)
+                if score is None:
+                    score = self._predict_row(loaded, record)
+            MODEL_RECORDS.inc(variant=self.variant)
+            self.cache.put(loaded.version, feature_key(record), score)
+            return score
 
-            model_path = os.path.join(project_root, "artifacts", "model.pkl")
-            preprocessor_path = os.path.join(
-                project_root, "artifacts", "preprocessor.pkl"
-            )
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def predict_batch(self, records, chunk_size=5000, use_cache=False):
+        """
+        Score many records with one transform and one predict per chunk.
+
+        `records` is a list of dicts or a DataFrame. Returns one result dict
+        per record, in input order; invalid rows carry an error instead of a
+        prediction and do not fail the rest of the batch. With `use_cache`,
+        rows already in the prediction cache skip the model and new scores
+        are added to it; bulk jobs leave it off so they don't evict the hot
+        interactive entries.
+        """
+        try:
+            loaded = self.registry.get()
+
+            with STAGE_LATENCY.time(stage="dataframe"):
+                if isinstance(records, pd.DataFrame):
+                    df = records.reset_index(drop=True)
+                else:
+                    df = pd.DataFrame.from_records(list(records))
 
-            print(f"Loading model from: {model_path}")
-            print(f"Loading preprocessor from: {preprocessor_path}")
+            with STAGE_LATENCY.time(stage="validation"):
+                df, errors = validate_features(df, loaded.categories)
+            predictions = np.full(len(df), np.nan)
 
-            model = load_object(file_path=model_path)
-            preprocessor = load_object(file_path=preprocessor_path)
+            valid_positions = np.flatnonzero(errors.isna().to_numpy())
+            keys = None
+            if use_cache and self.cache.enabled:
+                keys = list(
+                    zip(
+                        *(
+                            df[column]
+                            for column in CATEGORICAL_COLUMNS + NUMERICAL_COLUMNS
+                        )
+                    )
+                )
+                cached = [
+                    self.cache.get(loaded.version, keys[position])
+                    for position in valid_positions
+                ]
+                hits = np.array([score is not None for score in cached], dtype=bool)
+                predictions[valid_positions[hits]] = [
+                    score for score in cached if score is not None
+                ]
+                valid_positions = valid_positions[~hits]
 
-            print("Model and preprocessor loaded successfully")
+            if len(valid_positions):
+                with MODEL_INFERENCE_LATENCY.time(variant=self.variant):
+                    self._predict_chunks(
+                        loaded, df, valid_positions, predictions, errors, chunk_size
+                    )
+                MODEL_RECORDS.inc(len(valid_positions), variant=self.variant)
 
-            data_scaled = preprocessor.transform(features)
-            preds = model.predict(data_scaled)
-            return preds
+            if keys is not None:
+                for position in valid_positions:
+                    if not np.isnan(predictions[position]):
+                        self.cache.put(
+                            loaded.version, keys[position], predictions[position]
+                        )
+
+            with STAGE_LATENCY.time(stage="serialization"):
+                return self._results(errors, predictions, loaded.intervals)
 
         except Exception as e:
             raise CustomException(e, sys)
 
+    @classmethod
+    def _predict_chunks(cls, loaded, df, positions, predictions, errors, chunk_size):
+        for start in range(0, len(positions), chunk_size):
+            chunk_positions = positions[start : start + chunk_size]
+            try:
+                predictions[chunk_positions] = cls._predict_loaded(
+                    loaded, df.iloc[chunk_positions]
+                )
+            except Exception:
+                # Isolate the offending rows instead of failing the chunk
+                for position in chunk_positions:
+                    try:
+                        row = df.iloc[[position]]
+                        predictions[position] = cls._predict_loaded(loaded, row)[0]
+                    except Exception as row_error:
+                        errors.iat[position] = str(row_error)
+
+    @staticmethod
+    def _results(errors, predictions, intervals=None):
+        levels = confidence_levels(predictions)
+        if intervals is not None:
+            lower, upper = intervals.intervals(predictions)
+            bounds = zip(lower.tolist(), upper.tolist())
+        else:
+            bounds = itertools.repeat(None)
+        results = []
+        for index, (error, score, level, bound) in enumerate(
+            zip(errors.tolist(), predictions.tolist(), levels.tolist(), bounds)
+        ):
+            if error is None:
+                results.append(
+                    {
+                        "index": index,
+                        "status": "success",
+                        "predicted_math_score": round(score, 2),
+                        "confidence_level": level,
+                        "prediction_interval": (
+                            None
+                            if bound is None
+                            else interval_entry(*bound, intervals.coverage)
+                        ),
+                    }
+                )
+            else:
+                results.append({"index": index, "status": "error", "error": error})
+        return results
+
+    @classmethod
+    def _predict_loaded(cls, loaded, features):
+        if loaded.table is None:
+            return cls._predict_model(loaded, features)
+        # Integer-score rows come from the table, the rest from the model
+        with STAGE_LATENCY.time(stage="table_lookup"):
+            scores, found = loaded.table.predict(features)
+        if not found.all():
+            missing = np.flatnonzero(~found)
+            scores[missing] = cls._predict_model(loaded, features.iloc[missing])
+        return scores
+
+    @classmethod
+    def _predict_row(cls, loaded, record):
+        """
+        Score one record dict without building a DataFrame: the compiled
+        scorer takes the dict as is, and a compiled preprocessor writes it
+        straight into this thread's preallocated feature row.
+        """
+        if loaded.scorer is not None:
+            with STAGE_LATENCY.time(stage="predict"):
+                return float(loaded.scorer.predict(record)[0])
+        transformer = loaded.transformer
+        if hasattr(transformer, "transform_row"):
+            with STAGE_LATENCY.time(stage="preprocess"):
+                row = transformer.transform_row(
+                    record, out=_row_buffer(transformer.n_features_out)
+                )
+            with STAGE_LATENCY.time(stage="predict"):
+                return float(loaded.model.predict(row)[0])
+        with STAGE_LATENCY.time(stage="dataframe"):
+            features = pd.DataFrame([record])
+        return float(cls._predict_model(loaded, features)[0])
+
+    @staticmethod
+    def _predict_model(loaded, features):
+        if loaded.scorer is not None:
+            with STAGE_LATENCY.time(stage="predict"):
+                return loaded.scorer.predict(features)
+        with STAGE_LATENCY.time(stage="preprocess"):
+            transformed = loaded.transformer.transform(features)
+        with STAGE_LATENCY.time(stage="predict"):
+            return loaded.model.predict(transformed)
+
 
 class CustomData:
     def __init__(
@@ -0,0 +1,277 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from src.exception import CustomException
+from src.logger import logging
+
+
+def _env_flag(name, default="false"):
+    return os.environ.get(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class PredictionCacheConfig:
+    enabled: bool = field(
+        default_factory=lambda: _env_flag("PREDICTION_CACHE_ENABLED", "true")
+    )
+    max_size: int = field(
+        default_factory=lambda: int(os.environ.get("PREDICTION_CACHE_MAX_SIZE", 10000))
+    )
+    ttl: float = field(
+        default_factory=lambda: float(os.environ.get("PREDICTION_CACHE_TTL", 300))
+    )
+    # Optional SQLite file shared by all workers on a host, e.g.
+    # /tmp/prediction_cache.sqlite; empty keeps the cache per process
+    shared_path: str = field(
+        default_factory=lambda: os.environ.get("PREDICTION_CACHE_SHARED_PATH", "")
+    )
+
+
+class SharedCacheBackend:
+    """
+    Prediction cache in a local SQLite file, so gunicorn workers on one host
+    share hits. Entries expire after the TTL and the table is trimmed to
+    `max_size` by least recent use.
+    """
+
+    TRIM_EVERY = 256
+
+    def __init__(self, path, max_size, ttl):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connect(self):
+        """
+        This thread's connection, opened on first use. SQLite connections
+        must not cross fork(), so a connection inherited from a preloading
+        gunicorn master is left alone and the worker opens its own.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=1.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key TEXT PRIMARY KEY, value REAL, expires_at REAL, used_at REAL)"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key):
+        now = time.time()
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT value FROM predictions WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    "UPDATE predictions SET used_at = ? WHERE key = ?", (now, key)
+                )
+        return None if row is None else row[0]
+
+    def put(self, key, value):
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now),
+            )
+            self._writes += 1
+            if self._writes % self.TRIM_EVERY == 0:
+                connection.execute(
+                    "DELETE FROM predictions WHERE expires_at <= ?", (now,)
+                )
+                connection.execute(
+                    "DELETE FROM predictions WHERE key IN (SELECT key FROM "
+                    "predictions ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_size,),
+                )
+
+    def clear(self):
+        with self._connect() as connection:
+            connection.execute("DELETE FROM predictions")
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of predicted scores keyed by model version and a
+    canonical feature tuple. Entries expire after `ttl` seconds; when a new
+    model version shows up the cache drops everything it holds, and lookups
+    or stores still carrying a replaced version are ignored.
+
+    With `shared_path`, a local miss falls through to a SQLite file shared
+    by the workers on the host before the model is called.
+    """
+
+    def __init__(self, config: Optional[PredictionCacheConfig] = None):
+        self.config = config or PredictionCacheConfig()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._retired = set()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.shared = None
+        if self.config.enabled and self.config.shared_path:
+            try:
+                self.shared = SharedCacheBackend(
+                    self.config.shared_path, self.config.max_size, self.config.ttl
+                )
+            except Exception as e:
+                raise CustomException(e, sys)
+
+    @property
+    def enabled(self):
+        return self.config.enabled
+
+    def _check_version(self, version):
+        """
+        Called with the lock held. Returns False for a replaced version; a
+        new version makes every entry stale.
+        """
+        if version == self._version:
+            return True
+        if version in self._retired:
+            return False
+        if self._version is not None:
+            self._retired.add(self._version)
+            self.invalidations += 1
+        self._entries.clear()
+        self._version = version
+        return True
+
+    @staticmethod
+    def _shared_key(version, key):
+        return json.dumps([version, *key])
+
+    def get(self, version, key, shared=True):
+        """
+        Return the cached score for `key` under `version`, or None. With
+        `shared=False` only the in-process LRU is checked, so callers on the
+        event loop can leave the blocking SQLite lookup to get_shared.
+        """
+        if not self.enabled or key is None:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            if not self._check_version(version):
+                self.misses += 1
+                return None
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            if self.shared is None:
+                self.misses += 1
+                return None
+
+        # The miss is counted by get_shared
+        return self.get_shared(version, key) if shared else None
+
+    def get_shared(self, version, key):
+        """Look `key` up in the shared backend only. Blocks on SQLite."""
+        if not self.enabled or key is None or self.shared is None:
+            return None
+        with self._lock:
+            if version in self._retired:
+                return None
+
+        try:
+            value = self.shared.get(self._shared_key(version, key))
+        except sqlite3.Error as e:
+            logging.warning(f"Shared prediction cache unavailable: {e}")
+            value = None
+        if value is not None:
+            self._store(version, key, value)
+            with self._lock:
+                self.shared_hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, version, key, value, shared=True):
+        """
+        Store a score. With `shared=False` it only goes into the in-process
+        LRU; put_shared writes it to the shared backend.
+        """
+        if not self.enabled or key is None:
+            return
+        value = float(value)
+        self._store(version, key, value)
+        if shared:
+            self.put_shared(version, key, value)
+
+    def put_shared(self, version, key, value):
+        """Write a score to the shared backend only. Blocks on SQLite."""
+        if not self.enabled or key is None or self.shared is None:
+            return
+        try:
+            self.shared.put(self._shared_key(version, key), float(value))
+        except sqlite3.Error as e:
+            logging.warning(f"Shared prediction cache unavailable: {e}")
+
+    def _store(self, version, key, value):
+        expires_at = time.monotonic() + self.config.ttl
+        with self._lock:
+            if not self._check_version(version):
+                return
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.config.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "shared": self.shared is not None,
+                "size": len(self._entries),
+                "max_size": self.config.max_size,
+                "ttl_seconds": self.config.ttl,
+                "model_version": self._version,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": (
+                    (self.hits + self.shared_hits) / lookups if lookups else None
+                ),
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+prediction_cache = PredictionCache()
@@ -0,0 +1,200 @@
+import json
+import os
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.logger import logging
+from src.pipeline.model_router import VARIANT_HEADER
+
+_VARIANT_HEADER = VARIANT_HEADER.lower().encode("latin-1")
+
+
+def _parse_names(spec):
+    return [name.strip() for name in spec.split(",") if name.strip()]
+
+
+@dataclass
+class RequestRecorderConfig:
+    # JSONL file the requests are appended to; empty disables recording.
+    # "{pid}" is replaced per process so gunicorn workers get their own file
+    path: str = field(default_factory=lambda: os.environ.get("REQUEST_RECORD_PATH", ""))
+    # Share of matching requests that are recorded
+    sample_rate: float = field(
+        default_factory=lambda: float(os.environ.get("REQUEST_RECORD_SAMPLE_RATE", 1))
+    )
+    routes: List[str] = field(
+        default_factory=lambda: _parse_names(
+            os.environ.get("REQUEST_RECORD_ROUTES", "/api/predict,/api/predict/batch")
+        )
+    )
+    # Larger JSON bodies (big batches) are skipped rather than copied
+    max_body_bytes: int = field(
+        default_factory=lambda: int(
+            os.environ.get("REQUEST_RECORD_MAX_BODY_BYTES", 64 * 1024)
+        )
+    )
+    queue_size: int = 10000
+
+
+class RequestRecorder:
+    """
+    Appends sampled API requests to a JSONL traffic file that
+    `python -m benchmarks.load` can replay. One line per request:
+
+        {"ts": 1760000000.12, "method": "POST", "path": "/api/predict",
+         "variant": null, "status": 200, "body": {...}}
+
+    Requests are handed to a background writer thread through a bounded
+    queue, so recording never waits on disk; when the queue is full the
+    request is dropped and counted. The writer starts on first use in each
+    process, which keeps it working in forked gunicorn workers.
+    """
+
+    def __init__(self, config: Optional[RequestRecorderConfig] = None):
+        self.config = config or RequestRecorderConfig()
+        self._lock = threading.Lock()
+        self._queue = None
+        self._writer = None
+        self._pid = None
+        self.recorded = 0
+        self.dropped = 0
+        self.skipped = 0
+
+    @property
+    def enabled(self):
+        return bool(self.config.path)
+
+    def wants(self, path):
+        """Whether a request to `path` should be recorded (sampling included)."""
+        return (
+            self.enabled
+            and path in self.config.routes
+            and random.random() < self.config.sample_rate
+        )
+
+    def _ensure_writer(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.config.queue_size)
+            self._writer = threading.Thread(
+                target=self._write, args=(self._queue,), daemon=True
+            )
+            self._writer.start()
+            self._pid = os.getpid()
+
+    def record(self, method, path, body, status, variant=None, ts=None):
+        """Queue one request whose JSON `body` is bytes."""
+        if len(body) > self.config.max_body_bytes:
+            self.skipped += 1
+            return
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            # Only JSON requests can be replayed
+            self.skipped += 1
+            return
+        entry = {
+            "ts": time.time() if ts is None else ts,
+            "method": method,
+            "path": path,
+            "variant": variant,
+            "status": status,
+            "body": payload,
+        }
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write(self, entries):
+        path = self.config.path.replace("{pid}", str(os.getpid()))
+        dir_path = os.path.dirname(path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        with open(path, "a") as file_obj:
+            while True:
+                entry = entries.get()
+                if entry is None:
+                    file_obj.flush()
+                    return
+                file_obj.write(json.dumps(entry) + "\n")
+                self.recorded += 1
+                if entries.empty():
+                    file_obj.flush()
+
+    def close(self):
+        """Write out everything queued and stop the writer."""
+        with self._lock:
+            writer, entries = self._writer, self._queue
+            self._writer = self._queue = self._pid = None
+        if writer is not None:
+            entries.put(None)
+            writer.join(timeout=5)
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "path": self.config.path or None,
+            "sample_rate": self.config.sample_rate,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "skipped": self.skipped,
+        }
+
+
+class RequestRecordingMiddleware:
+    """
+    Pure ASGI middleware that copies the body of sampled requests as the app
+    reads it and hands it to the RequestRecorder with the response status.
+    """
+
+    def __init__(self, app, recorder: Optional[RequestRecorder] = None):
+        self.app = app
+        self.recorder = recorder or request_recorder
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.recorder.wants(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        status = 500
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request":
+                chunks.append(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            headers = dict(scope.get("headers") or ())
+            variant = headers.get(_VARIANT_HEADER)
+            try:
+                self.recorder.record(
+                    scope["method"],
+                    scope["path"],
+                    b"".join(chunks),
+                    status,
+                    variant.decode("latin-1") if variant else None,
+                )
+            except Exception as e:
+                logging.warning(f"Request recording failed: {e}")
+
+
+request_recorder = RequestRecorder()
@@ -3,39 +3,105 @@ import os
 import pandas as pd
 import numpy as np
 from src.exception import CustomException
-from src.logger import logging
+from src.logger import logging, setup_logging
 from src.components.data_ingestion import DataIngestion
 from src.components.data_transformation import DataTransformation
 from src.components.model_trainer import ModelTrainer
+from src.stage_cache import StageCache, file_fingerprint, fingerprint, path_fingerprint
 from src.utils import save_object
 
 
 class TrainPipeline:
-    def __init__(self):
+    def __init__(self, stage_cache: StageCache = None):
+        self.stage_cache = stage_cache or StageCache()
         self.data_ingestion = DataIngestion()
         self.data_transformation = DataTransformation()
-        self.model_trainer = ModelTrainer()
+        self.model_trainer = ModelTrainer(stage_cache=self.stage_cache)
+
+    def _ingest(self):
+        """
+        Split stud.csv into train/test CSVs, reusing the cached split when
+        the source file and the split settings are unchanged.
+        """
+        config = self.data_ingestion.ingestion_config
+        outputs = {
+            "raw": config.raw_data_path,
+            "train": config.train_data_path,
+            "test": config.test_data_path,
+        }
+        key = fingerprint(
+            "ingestion",
+            file_fingerprint(config.source_data_path),
+            config.test_size,
+            config.random_state,
+            config.artifact_format,
+            # Streaming splits by row hash, so it yields a different split
+            config.chunk_size > 0,
+            config.id_column,
+        )
+        if self.stage_cache.restore("ingestion", key, outputs) is None:
+            self.data_ingestion.initiate_data_ingestion()
+            self.stage_cache.store("ingestion", key, outputs)
+        return config.train_data_path, config.test_data_path
+
+    def _transform(self, train_data_path, test_data_path):
+        """
+        Fit the preprocessor and transform both splits, reusing the cached
+        preprocessor and arrays when the splits and the preprocessor
+        definition are unchanged.
+        """
+        config = self.data_transformation.data_transformation_config
+        outputs = {
+            "preprocessor.pkl": config.preprocessor_obj_file_path,
+            "preprocessor_compiled.npz": config.compiled_preprocessor_file_path,
+            "train_array.npy": config.train_array_file_path,
+            "test_array.npy": config.test_array_file_path,
+        }
+        key = fingerprint(
+            "transformation",
+            path_fingerprint(train_data_path),
+            path_fingerprint(test_data_path),
+            repr(self.data_transformation.get_data_transformer_object()),
+            config.streaming,
+        )
+        if self.stage_cache.restore("transformation", key, outputs) is not None:
+            return (
+                np.load(config.train_array_file_path, mmap_mode="r"),
+                np.load(config.test_array_file_path, mmap_mode="r"),
+                config.preprocessor_obj_file_path,
+            )
+
+        result = self.data_transformation.initiate_data_transformation(
+            train_data_path, test_data_path
+        )
+        self.stage_cache.store("transformation", key, outputs)
+        return result
 
     def initiate_training(self):
         try:
             logging.info("Starting training pipeline")
 
             logging.info("Step 1: Data Ingestion")
-            train_data_path, test_data_path = (
-                self.data_ingestion.initiate_data_ingestion()
-            )
+            train_data_path, test_data_path = self._ingest()
 
             logging.info("Step 2: Data Transformation")
-            train_arr, test_arr, preprocessor_path = (
-                self.data_transformation.initiate_data_transformation(
-                    train_data_path, test_data_path
-                )
+            train_arr, test_arr, preprocessor_path = self._transform(
+                train_data_path, test_data_path
             )
 
             logging.info("Step 3: Model Training")
-            model_path = self.model_trainer.initiate_model_trainer(train_arr, test_arr)
+            # Search results are cached per model, candidate and fold, so
+            # only new models or parameter combinations are fitted
+            self.model_trainer.initiate_model_training(
+                train_arr, test_arr, test_data_path=test_data_path
+            )
+            model_path = self.model_trainer.model_trainer_config.trained_model_file_path
 
-            logging.info("Training pipeline completed successfully")
+            logging.info(
+                f"Training pipeline completed successfully "
+                f"(stage cache: {self.stage_cache.hits} hits, "
+                f"{self.stage_cache.misses} misses)"
+            )
             return {
                 "model_path": model_path,
                 "preprocessor_path": preprocessor_path,
@@ -49,6 +115,7 @@ class TrainPipeline:
 
 
 if __name__ == "__main__":
+    setup_logging()
     try:
         train_pipeline = TrainPipeline()
         results = train_pipeline.initiate_training()
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from src.exception import CustomException
+from src.logger import logging
+
+
+@dataclass
+class StageCacheConfig:
+    cache_dir: str = os.path.join("artifacts", "cache")
+    enabled: bool = field(
+        default_factory=lambda: os.environ.get("TRAINING_CACHE_ENABLED", "true")
+        .strip()
+        .lower()
+        in ("1", "true", "yes", "on")
+    )
+
+
+def _canonical(part):
+    if isinstance(part, np.ndarray):
+        digest = hashlib.sha256()
+        digest.update(str((part.dtype.str, part.shape)).encode())
+        digest.update(np.ascontiguousarray(part).data)
+        return "ndarray:" + digest.hexdigest()
+    if isinstance(part, dict):
+        return {str(key): _canonical(value) for key, value in sorted(part.items())}
+    if isinstance(part, (list, tuple)):
+        return [_canonical(value) for value in part]
+    if isinstance(part, (str, int, float, bool)) or part is None:
+        return part
+    if isinstance(part, np.generic):
+        return part.item()
+    return repr(part)
+
+
+def fingerprint(*parts):
+    """
+    Stable hash of JSON-like values, arrays and objects (via repr).
+    """
+    payload = json.dumps(_canonical(list(parts)), sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def file_fingerprint(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file_obj:
+        for block in iter(lambda: file_obj.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def path_fingerprint(path):
+    """
+    file_fingerprint for a file; for a directory, a hash over its files'
+    relative paths and contents.
+    """
+    if not os.path.isdir(path):
+        return file_fingerprint(path)
+    files = []
+    for root, _, names in os.walk(path):
+        for name in names:
+            file_path = os.path.join(root, name)
+            relative = os.path.relpath(file_path, path).replace(os.sep, "/")
+            files.append((relative, file_fingerprint(file_path)))
+    return fingerprint(sorted(files))
+
+
+def _copy(source, dest):
+    if os.path.isdir(dest):
+        shutil.rmtree(dest)
+    elif os.path.exists(dest):
+        os.remove(dest)
+    if os.path.isdir(source):
+        shutil.copytree(source, dest)
+    else:
+        shutil.copyfile(source, dest)
+
+
+def estimator_fingerprint(estimator):
+    estimator_type = type(estimator)
+    return fingerprint(
+        f"{estimator_type.__module__}.{estimator_type.__qualname__}",
+        estimator.get_params(deep=False),
+    )
+
+
+def _atomic_write(file_path, write):
+    dir_path = os.path.dirname(file_path)
+    os.makedirs(dir_path, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dir_path, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file_obj:
+            write(file_obj)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class StageCache:
+    """
+    Content-addressed cache for training stages.
+
+    Stage outputs (files) are stored under `<cache_dir>/<stage>/<key>/`
+    together with a manifest of their hashes; small results such as
+    per-candidate CV scores are stored as individual pickles under
+    `<cache_dir>/results/`. Keys are fingerprints of a stage's inputs and
+    config, so changing either produces a miss.
+    """
+
+    def __init__(self, config: StageCacheConfig = None):
+        self.config = config or StageCacheConfig()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.config.enabled
+
+    def _stage_dir(self, stage, key):
+        return os.path.join(self.config.cache_dir, stage, key)
+
+    def restore(self, stage, key, outputs):
+        """
+        Put a cached stage's files or directories at the paths in `outputs`
+        (name -> path). Returns the manifest metadata on a hit, None on a miss.
+        """
+        try:
+            if not self.enabled:
+                return None
+
+            stage_dir = self._stage_dir(stage, key)
+            manifest_path = os.path.join(stage_dir, "manifest.json")
+            if not os.path.exists(manifest_path):
+                self.misses += 1
+                return None
+
+            with open(manifest_path) as file_obj:
+                manifest = json.load(file_obj)
+
+            if set(outputs) - set(manifest["files"]):
+                self.misses += 1
+                return None
+
+            for name, dest in outputs.items():
+                expected = manifest["files"][name]
+                if os.path.exists(dest) and path_fingerprint(dest) == expected:
+                    continue
+                dest_dir = os.path.dirname(dest)
+                if dest_dir:
+                    os.makedirs(dest_dir, exist_ok=True)
+                _copy(os.path.join(stage_dir, name), dest)
+
+            self.hits += 1
+            logging.info(f"Stage cache hit for {stage} ({key[:12]})")
+            return manifest.get("metadata", {})
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def store(self, stage, key, outputs, metadata=None):
+        try:
+            if not self.enabled:
+                return
+
+            stage_dir = self._stage_dir(stage, key)
+            os.makedirs(stage_dir, exist_ok=True)
+            files = {}
+            for name, source in outputs.items():
+                _copy(source, os.path.join(stage_dir, name))
+                files[name] = path_fingerprint(source)
+
+            manifest = json.dumps(
+                {
+                    "stage": stage,
+                    "key": key,
+                    "files": files,
+                    "metadata": metadata or {},
+                },
+                indent=2,
+            ).encode()
+            # The manifest goes last: its presence marks a complete entry
+            _atomic_write(
+                os.path.join(stage_dir, "manifest.json"),
+                lambda file_obj: file_obj.write(manifest),
+            )
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _result_path(self, key):
+        return os.path.join(self.config.cache_dir, "results", key[:2], f"{key}.pkl")
+
+    def get_result(self, key, default=None):
+        if not self.enabled:
+            return default
+        try:
+            with open(self._result_path(key), "rb") as file_obj:
+                return pickle.load(file_obj)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return default
+
+    def put_result(self, key, value):
+        if not self.enabled:
+            return
+        try:
+            _atomic_write(
+                self._result_path(key), lambda file_obj: pickle.dump(value, file_obj)
+            )
+        except Exception as e:
+            raise CustomException(e, sys)
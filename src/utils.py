@@ -1,12 +1,17 @@
+import hashlib
+import json
 import os
 import sys
 import numpy as np
 import pandas as pd
 import pickle
-from sklearn.metrics import r2_score
-from sklearn.model_selection import GridSearchCV
+import pickletools
+import shutil
+import struct
+import time
 
 from src.exception import CustomException
+from src.logger import logging
 
 
 def save_object(file_path, obj):
@@ -30,29 +35,458 @@ def load_object(file_path):
         raise CustomException(e, sys)
 
 
-def evaluate_models(X_train, y_train, X_test, y_test, models, param):
+def pickle_globals(payload):
+    """(module, name) of every class or function a pickle references."""
+    found, pushed, memo = [], [], {}
+    for opcode, arg, _ in pickletools.genops(payload):
+        name = opcode.name
+        if name in ("SHORT_BINUNICODE", "BINUNICODE", "BINUNICODE8", "UNICODE"):
+            pushed.append(arg)
+        elif name == "MEMOIZE":
+            memo[len(memo)] = pushed[-1] if pushed else None
+        elif name in ("PUT", "BINPUT", "LONG_BINPUT"):
+            memo[arg] = pushed[-1] if pushed else None
+        elif name in ("GET", "BINGET", "LONG_BINGET"):
+            pushed.append(memo.get(arg))
+        elif name == "STACK_GLOBAL":
+            module, qualname = pushed[-2:] if len(pushed) >= 2 else (None, None)
+            if isinstance(module, str) and isinstance(qualname, str):
+                found.append((module, qualname))
+            pushed.append(None)
+        elif name in ("GLOBAL", "INST"):
+            module, qualname = arg.split(" ", 1)
+            found.append((module, qualname))
+            pushed.append(None)
+        elif name not in ("PROTO", "FRAME"):
+            pushed.append(None)
+    return found
+
+
+def pickle_packages(references):
+    """Top-level third-party packages among pickle_globals() references."""
+    return sorted(
+        {module.split(".")[0] for module, _ in references}
+        - set(sys.stdlib_module_names)
+    )
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+
+def save_json(file_path, obj):
     try:
-        report = {}
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+        with open(file_path, "w") as file_obj:
+            json.dump(obj, file_obj, indent=2, default=_json_default)
+
+    except Exception as e:
+        raise CustomException(e, sys)
 
-        for model_name, model in models.items():
-            model_params = param.get(model_name, {})
 
-            if model_params:
-                gs = GridSearchCV(model, model_params, cv=3, scoring="r2")
-                gs.fit(X_train, y_train)
+def load_json(file_path):
+    try:
+        with open(file_path, "r") as file_obj:
+            return json.load(file_obj)
 
-                model.set_params(**gs.best_params_)
+    except Exception as e:
+        raise CustomException(e, sys)
 
-            model.fit(X_train, y_train)
 
-            y_train_pred = model.predict(X_train)
-            y_test_pred = model.predict(X_test)
+def save_arrays(file_path, arrays):
+    try:
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+        with open(file_path, "wb") as file_obj:
+            np.savez(file_obj, **arrays)
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def artifact_version(*file_paths):
+    """
+    Short content hash identifying a set of artifact files, in order.
+    """
+    try:
+        digest = hashlib.sha256()
+        for file_path in file_paths:
+            with open(file_path, "rb") as file_obj:
+                for block in iter(lambda: file_obj.read(1 << 20), b""):
+                    digest.update(block)
+        return digest.hexdigest()[:12]
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+TABLE_FORMATS = {"csv": ".csv", "parquet": ".parquet", "npy": ""}
+TABLE_SCHEMA_FILE = "schema.json"
+
+
+def table_path(file_path, table_format):
+    """
+    Path of a table artifact in the given format: "artifacts/train.csv"
+    becomes "artifacts/train.parquet", or the directory "artifacts/train"
+    for the npy format.
+    """
+    if table_format not in TABLE_FORMATS:
+        raise ValueError(
+            f"Unknown table format {table_format!r}, "
+            f"expected one of {tuple(TABLE_FORMATS)}"
+        )
+    return os.path.splitext(file_path)[0] + TABLE_FORMATS[table_format]
+
+
+class NpyAppender:
+    """
+    Append rows to a .npy file whose final length isn't known up front. The
+    header is written with a fixed size and rewritten with the real shape on
+    close, so the data is never copied.
+    """
+
+    HEADER_SIZE = 128
+
+    def __init__(self, file_path, dtype, row_shape=()):
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        self.file_path = file_path
+        self.dtype = np.dtype(dtype)
+        self.row_shape = tuple(row_shape)
+        self.n_rows = 0
+        self._file = open(file_path, "wb")
+        self._write_header()
+
+    def _write_header(self):
+        header = repr(
+            {
+                "descr": np.lib.format.dtype_to_descr(self.dtype),
+                "fortran_order": False,
+                "shape": (self.n_rows, *self.row_shape),
+            }
+        ).encode("latin1")
+        length = self.HEADER_SIZE - 10
+        self._file.write(
+            np.lib.format.MAGIC_PREFIX
+            + b"\x01\x00"
+            + struct.pack("<H", length)
+            + header.ljust(length - 1)
+            + b"\n"
+        )
+
+    def append(self, values):
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        if values.shape[1:] != self.row_shape:
+            raise ValueError(
+                f"Expected rows of shape {self.row_shape}, got {values.shape[1:]}"
+            )
+        self._file.write(values.tobytes())
+        self.n_rows += len(values)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.seek(0)
+        self._write_header()
+        self._file.close()
+
 
-            train_model_score = r2_score(y_train, y_train_pred)
-            test_model_score = r2_score(y_test, y_test_pred)
+class TableWriter:
+    """
+    Write a table chunk by chunk as CSV, Parquet or an npy directory, chosen
+    by the path's extension (no extension means npy).
+
+    The npy format stores one .npy file per column plus schema.json.
+    Numerical columns are stored as float64; other columns are stored as
+    int32 category codes (-1 for missing), with the sorted categories kept
+    in the schema. Parquet tables have to be written in a single chunk.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.extension = os.path.splitext(file_path)[1]
+        self.n_rows = 0
+        self._columns = None
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        if not self.extension:
+            if os.path.isdir(file_path):
+                shutil.rmtree(file_path)
+            os.makedirs(file_path)
+
+    def write(self, df):
+        try:
+            first = self._columns is None
+            if self.extension == ".csv":
+                df.to_csv(
+                    self.file_path,
+                    mode="w" if first else "a",
+                    index=False,
+                    header=first,
+                )
+                self._columns = list(df.columns)
+            elif self.extension == ".parquet":
+                if not first:
+                    raise ValueError(
+                        "Parquet tables are written in one chunk; use the csv or "
+                        "npy format for streaming"
+                    )
+                df.astype(
+                    {
+                        column: "category"
+                        for column in df.columns
+                        if not pd.api.types.is_numeric_dtype(df[column])
+                    }
+                ).to_parquet(self.file_path, index=False)
+                self._columns = list(df.columns)
+            else:
+                if first:
+                    self._open_columns(df)
+                for column in self._columns:
+                    self._write_column(column, df[column["name"]])
+            self.n_rows += len(df)
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _open_columns(self, df):
+        self._columns = []
+        for index, name in enumerate(df.columns):
+            kind = (
+                "numerical"
+                if pd.api.types.is_numeric_dtype(df[name])
+                else "categorical"
+            )
+            file_name = f"{index}.npy"
+            self._columns.append(
+                {
+                    "name": str(name),
+                    "file": file_name,
+                    "kind": kind,
+                    "appender": NpyAppender(
+                        os.path.join(self.file_path, file_name),
+                        np.float64 if kind == "numerical" else np.int32,
+                    ),
+                    "vocabulary": {},
+                }
+            )
+
+    @staticmethod
+    def _write_column(column, values):
+        if column["kind"] == "numerical":
+            column["appender"].append(values.to_numpy(dtype=np.float64))
+            return
+        # Codes are assigned in order of first appearance, sorted on close
+        codes, uniques = pd.factorize(values)
+        vocabulary = column["vocabulary"]
+        mapping = np.array(
+            [vocabulary.setdefault(value, len(vocabulary)) for value in uniques],
+            dtype=np.int32,
+        )
+        column["appender"].append(
+            np.where(codes >= 0, mapping[np.maximum(codes, 0)], -1)
+        )
+
+    def close(self):
+        try:
+            if self.extension or self._columns is None:
+                return
+            schema = []
+            for column in self._columns:
+                column["appender"].close()
+                entry = {key: column[key] for key in ("name", "file", "kind")}
+                if column["kind"] == "categorical":
+                    entry["categories"] = self._sort_categories(column)
+                schema.append(entry)
+            save_json(
+                os.path.join(self.file_path, TABLE_SCHEMA_FILE),
+                {"n_rows": self.n_rows, "columns": schema},
+            )
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _sort_categories(self, column, chunk_size=1_000_000):
+        vocabulary = column["vocabulary"]
+        categories = sorted(vocabulary)
+        remap = np.empty(len(categories), dtype=np.int32)
+        for new_code, value in enumerate(categories):
+            remap[vocabulary[value]] = new_code
+        if column["appender"].n_rows and not np.array_equal(
+            remap, np.arange(len(remap))
+        ):
+            codes = np.load(
+                os.path.join(self.file_path, column["file"]), mmap_mode="r+"
+            )
+            for start in range(0, len(codes), chunk_size):
+                block = codes[start : start + chunk_size]
+                block[:] = np.where(block >= 0, remap[np.maximum(block, 0)], -1)
+            codes.flush()
+            del codes
+        return categories
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def save_table(file_path, df):
+    """
+    Write a DataFrame as CSV, Parquet or an npy directory in one go; see
+    TableWriter for the formats.
+    """
+    with TableWriter(file_path) as writer:
+        writer.write(df)
+
+
+def iter_table(file_path, chunk_size):
+    """
+    Yield a table written by save_table/TableWriter as DataFrames of at
+    most `chunk_size` rows without loading the whole table.
+    """
+    try:
+        if not os.path.isdir(file_path):
+            if os.path.splitext(file_path)[1] == ".parquet":
+                import pyarrow.parquet as pq
+
+                for batch in pq.ParquetFile(file_path).iter_batches(chunk_size):
+                    yield batch.to_pandas()
+                return
+            yield from pd.read_csv(file_path, chunksize=chunk_size)
+            return
+
+        schema = load_json(os.path.join(file_path, TABLE_SCHEMA_FILE))
+        columns = [
+            (entry, np.load(os.path.join(file_path, entry["file"]), mmap_mode="r"))
+            for entry in schema["columns"]
+        ]
+        for start in range(0, schema["n_rows"], chunk_size):
+            yield pd.DataFrame(
+                {
+                    entry["name"]: _table_column(
+                        entry, values[start : start + chunk_size]
+                    )
+                    for entry, values in columns
+                },
+                index=pd.RangeIndex(start, min(start + chunk_size, schema["n_rows"])),
+            )
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def _table_column(entry, values):
+    if entry["kind"] == "categorical":
+        return pd.Categorical.from_codes(values, entry["categories"])
+    return values
+
+
+def load_table(file_path):
+    """
+    Read a table written by save_table. npy columns are memory-mapped and
+    categorical ones come back as pandas Categoricals over the stored codes.
+    """
+    try:
+        if not os.path.isdir(file_path):
+            if os.path.splitext(file_path)[1] == ".parquet":
+                return pd.read_parquet(file_path)
+            return pd.read_csv(file_path)
+
+        schema = load_json(os.path.join(file_path, TABLE_SCHEMA_FILE))
+        columns = {}
+        for entry in schema["columns"]:
+            values = np.load(os.path.join(file_path, entry["file"]), mmap_mode="r")
+            columns[entry["name"]] = _table_column(entry, values)
+        return pd.DataFrame(columns)
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def evaluate_models(
+    X_train,
+    y_train,
+    X_test,
+    y_test,
+    models,
+    param,
+    search_config=None,
+    stage_cache=None,
+    selection_config=None,
+):
+    """
+    Tune every model with the parallel ModelSearch and score the refitted
+    best estimator on the training and test sets.
+
+    Each entry of `models` is replaced by its fitted best estimator; with
+    `refit` off in the search config the winner is fitted here instead.
+    Models whose time budget ran out before any candidate was fully
+    cross-validated are dropped from both `models` and the report. The
+    report holds, per model, the search results plus train/test R2,
+    fit/predict timings and the serving cost measured on the test set
+    (single-row and batch latency, pickled size). A StageCache lets the
+    search reuse fold scores and refits from earlier runs.
+    """
+    # Training-only imports stay local so the serving path never loads them
+    from sklearn.metrics import r2_score
+
+    from src.components.model_search import ModelSearch
+    from src.components.model_selection import measure_inference_cost
+
+    try:
+        search = ModelSearch(search_config, stage_cache)
+        search_report = search.run(X_train, y_train, models, param)
+        report = {}
+
+        for model_name, model_search in search_report.items():
+            if model_search["best_params"] is None:
+                # Default parameters were never scored; don't ship them
+                logging.warning(
+                    f"Dropping {model_name}: no candidate finished cross-validation "
+                    f"within its time budget"
+                )
+                models.pop(model_name)
+                continue
+
+            # The search already refit the winner; reuse it instead of fitting again
+            model = model_search.pop("best_estimator", None)
+            if model is None:
+                model, model_search["refit_time"] = search.refit(
+                    models[model_name], model_search["best_params"], X_train, y_train
+                )
+                model_search["refit_cached"] = False
+            models[model_name] = model
+
+            start = time.perf_counter()
+            y_test_pred = model.predict(X_test)
+            predict_time = time.perf_counter() - start
+            y_train_pred = model.predict(X_train)
 
-            report[model_name] = test_model_score
+            report[model_name] = dict(
+                model_search,
+                train_score=r2_score(y_train, y_train_pred),
+                test_score=r2_score(y_test, y_test_pred),
+                predict_time=predict_time,
+                **measure_inference_cost(model, X_test, selection_config),
+            )
 
+        if not report:
+            raise ValueError(
+                "No model finished cross-validation within its time budget"
+            )
         return report
 
     except Exception as e:
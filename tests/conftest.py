@@ -0,0 +1,81 @@
+import os
+
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from src.components.data_transformation import DataTransformation
+from src.pipeline.model_registry import ModelRegistry, ModelRegistryConfig
+from src.utils import save_object
+
+ARTIFACTS_DIR = os.path.join(os.path.dirname(__file__), "..", "artifacts")
+
+
+@pytest.fixture(scope="session")
+def train_df():
+    return pd.read_csv(os.path.join(ARTIFACTS_DIR, "train.csv"))
+
+
+@pytest.fixture(scope="session")
+def test_df():
+    return pd.read_csv(os.path.join(ARTIFACTS_DIR, "test.csv"))
+
+
+@pytest.fixture(scope="session")
+def fitted_registry(tmp_path_factory, train_df):
+    """A registry serving a freshly fitted preprocessor and linear model."""
+    artifacts = tmp_path_factory.mktemp("artifacts")
+    preprocessor = DataTransformation().get_data_transformer_object()
+    X = preprocessor.fit_transform(train_df.drop(columns=["math_score"]))
+    model = LinearRegression().fit(X, train_df["math_score"])
+
+    save_object(str(artifacts / "model.pkl"), model)
+    save_object(str(artifacts / "preprocessor.pkl"), preprocessor)
+    config = ModelRegistryConfig(
+        model_path=str(artifacts / "model.pkl"),
+        preprocessor_path=str(artifacts / "preprocessor.pkl"),
+        compiled_model_path=str(artifacts / "model_compiled.npz"),
+        reload_interval=0,
+    )
+    return ModelRegistry(config)
+
+
+@pytest.fixture(scope="session")
+def model_variants(tmp_path_factory, fitted_registry, train_df, test_df):
+    """
+    Variants exported from two fitted models (and a third that misses the
+    top 2), sharing fitted_registry's preprocessor.
+    """
+    from sklearn.linear_model import Lasso, Ridge
+
+    from src.components.model_variants import (
+        ModelVariantExporter,
+        ModelVariantsConfig,
+    )
+
+    loaded = fitted_registry.get()
+    X = loaded.preprocessor.transform(train_df.drop(columns=["math_score"]))
+    y = train_df["math_score"]
+    X_test = loaded.preprocessor.transform(test_df.drop(columns=["math_score"]))
+    models = {
+        "Linear Regression": loaded.model,
+        "Ridge Regression": Ridge(alpha=50.0).fit(X, y),
+        "Lasso": Lasso(alpha=1.0).fit(X, y),
+    }
+    report = {
+        "Linear Regression": {"test_score": 0.88, "predict_time": 0.002},
+        "Ridge Regression": {"test_score": 0.875, "predict_time": 0.001},
+        "Lasso": {"test_score": 0.80, "predict_time": 0.001},
+    }
+    for result in report.values():
+        result.update(train_score=0.87, fit_time=0.01, best_params={})
+
+    config = ModelVariantsConfig(
+        preprocessor_obj_file_path=fitted_registry.config.preprocessor_path,
+        variants_dir=str(tmp_path_factory.mktemp("variants")),
+        top_k=2,
+    )
+    ModelVariantExporter(config).initiate_variant_export(
+        models, report, n_test_rows=200, data=(X, y, X_test, test_df["math_score"])
+    )
+    return config
@@ -0,0 +1,142 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+RECORD = {
+    "gender": "female",
+    "race_ethnicity": "group B",
+    "parental_level_of_education": "bachelor's degree",
+    "lunch": "standard",
+    "test_preparation_course": "none",
+    "reading_score": 72,
+    "writing_score": 74,
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    """The real app, started through its lifespan on the tracked artifacts."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        # main configures logging on import; keep it from writing log files
+        monkeypatch.setenv("LOG_FILE", "")
+        import main
+
+        with TestClient(main.app) as test_client:
+            yield test_client
+
+
+class TestPredictApi:
+    def test_predicts_and_echoes_the_input(self, client):
+        response = client.post("/api/predict", json=RECORD)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "success"
+        assert 0 <= body["predicted_math_score"] <= 100
+        assert body["confidence_level"] in ("High", "Medium", "Low")
+        assert body["input_data"]["gender"] == "female"
+
+    def test_unknown_category_is_a_validation_error(self, client):
+        response = client.post("/api/predict", json=dict(RECORD, lunch="brunch"))
+        assert response.status_code == 422
+        (error,) = response.json()["detail"]
+        assert error["loc"] == ["body", "lunch"]
+        assert error["msg"] == "lunch has unknown value"
+        assert error["input"] == "brunch"
+
+    def test_padded_categories_are_trimmed(self, client):
+        padded = dict(RECORD, gender=" female ", lunch="standard  ")
+        response = client.post("/api/predict", json=padded)
+        assert response.status_code == 200
+        assert response.json()["input_data"]["gender"] == "female"
+        expected = client.post("/api/predict", json=RECORD).json()
+        assert (
+            response.json()["predicted_math_score"] == expected["predicted_math_score"]
+        )
+
+    def test_echo_input_can_be_turned_off(self, client):
+        response = client.post("/api/predict?echo_input=false", json=RECORD)
+        assert response.status_code == 200
+        assert "input_data" not in response.json()
+        assert "predicted_math_score" in response.json()
+
+
+def _csv(records):
+    header = ",".join(records[0])
+    rows = [",".join(str(value) for value in record.values()) for record in records]
+    return "\n".join([header] + rows) + "\n"
+
+
+class TestBatchPredictApi:
+    records = [
+        RECORD,
+        dict(RECORD, race_ethnicity="group Z"),
+        dict(RECORD, gender="male"),
+    ]
+
+    def _assert_results(self, response):
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["total"], body["succeeded"], body["failed"]) == (3, 2, 1)
+        assert [result["index"] for result in body["results"]] == [0, 1, 2]
+        assert [result["status"] for result in body["results"]] == [
+            "success",
+            "error",
+            "success",
+        ]
+        bad = body["results"][1]
+        assert bad["error"] == "race_ethnicity has unknown value"
+        assert bad["predicted_math_score"] is None
+        return body
+
+    def test_json_list_and_records_object(self, client):
+        listed = self._assert_results(
+            client.post("/api/predict/batch", json=self.records)
+        )
+        wrapped = self._assert_results(
+            client.post("/api/predict/batch", json={"records": self.records})
+        )
+        assert listed["results"] == wrapped["results"]
+        single = client.post("/api/predict", json=RECORD).json()
+        assert (
+            listed["results"][0]["predicted_math_score"]
+            == single["predicted_math_score"]
+        )
+
+    def test_ndjson_and_csv_bodies(self, client):
+        ndjson = "\n".join(json.dumps(record) for record in self.records)
+        self._assert_results(
+            client.post(
+                "/api/predict/batch",
+                content=ndjson,
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+        )
+        self._assert_results(
+            client.post(
+                "/api/predict/batch",
+                content=_csv(self.records),
+                headers={"Content-Type": "text/csv"},
+            )
+        )
+
+    def test_multipart_upload(self, client):
+        files = {"file": ("students.csv", _csv(self.records), "text/csv")}
+        self._assert_results(client.post("/api/predict/batch", files=files))
+
+        response = client.post(
+            "/api/predict/batch", files={"other": ("x.csv", "a\n1\n", "text/csv")}
+        )
+        assert response.status_code == 400
+
+    def test_non_object_payload_is_rejected(self, client):
+        for payload in ([1, 2], "students"):
+            response = client.post("/api/predict/batch", json=payload)
+            assert response.status_code == 400
+            assert response.json()["detail"].startswith("Invalid batch payload")
+        response = client.post(
+            "/api/predict/batch",
+            content="not json",
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == 400
@@ -0,0 +1,170 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.components.artifact_bundle import (
+    MANIFEST_FILE,
+    ArtifactBundle,
+    ArtifactBundleConfig,
+    ArtifactBundler,
+    current_bundle_path,
+    library_mismatches,
+)
+from src.components.compiled_model import ModelCompiler
+from src.exception import CustomException
+from src.pipeline.model_registry import ModelRegistry, ModelRegistryConfig
+from src.utils import artifact_version, save_json
+
+
+def _bundle_artifacts(fitted_registry, tmp_path, compression="none"):
+    """Copy the fitted pickles, compile them and write a bundle."""
+    config = fitted_registry.config
+    shutil.copy(config.model_path, tmp_path / "model.pkl")
+    shutil.copy(config.preprocessor_path, tmp_path / "preprocessor.pkl")
+
+    compiler = ModelCompiler()
+    compiler.compiled_model_config.trained_model_file_path = str(tmp_path / "model.pkl")
+    compiler.compiled_model_config.preprocessor_obj_file_path = str(
+        tmp_path / "preprocessor.pkl"
+    )
+    compiler.compiled_model_config.compiled_model_file_path = str(
+        tmp_path / "model_compiled.npz"
+    )
+    compiler.initiate_model_compilation()
+
+    save_json(
+        str(tmp_path / "model_report.json"),
+        {
+            "best_model": "Linear Regression",
+            "best_model_score": 0.88,
+            "created_at": "2026-01-01T00:00:00+00:00",
+            "models": {
+                "Linear Regression": {
+                    "train_score": 0.87,
+                    "test_score": 0.88,
+                    "fit_time": 0.01,
+                    "best_params": {},
+                }
+            },
+        },
+    )
+    bundle_config = ArtifactBundleConfig(
+        trained_model_file_path=str(tmp_path / "model.pkl"),
+        preprocessor_obj_file_path=str(tmp_path / "preprocessor.pkl"),
+        compiled_model_file_path=str(tmp_path / "model_compiled.npz"),
+        model_report_file_path=str(tmp_path / "model_report.json"),
+        bundle_dir=str(tmp_path / "bundles"),
+        compression=compression,
+    )
+    return ArtifactBundler(bundle_config).initiate_bundle_creation()
+
+
+def _registry(tmp_path):
+    return ModelRegistry(
+        ModelRegistryConfig(
+            model_path=str(tmp_path / "model.pkl"),
+            preprocessor_path=str(tmp_path / "preprocessor.pkl"),
+            compiled_model_path=str(tmp_path / "model_compiled.npz"),
+            reload_interval=0,
+        )
+    )
+
+
+class TestArtifactBundle:
+    def test_manifest_records_versions_schema_metrics_and_hashes(
+        self, fitted_registry, tmp_path
+    ):
+        bundle_path = _bundle_artifacts(fitted_registry, tmp_path)
+        assert current_bundle_path(str(tmp_path / "bundles")) == bundle_path
+
+        manifest = ArtifactBundle.open(bundle_path).manifest
+        assert manifest["version"] == artifact_version(
+            str(tmp_path / "model.pkl"), str(tmp_path / "preprocessor.pkl")
+        )
+        assert manifest["model_class"] == "LinearRegression"
+        assert manifest["compiled"] == "linear"
+        assert {"python", "numpy", "pandas", "scikit-learn"} <= set(
+            manifest["libraries"]
+        )
+        assert manifest["schema"]["target_column"] == "math_score"
+        assert manifest["schema"]["numerical_columns"] == [
+            "writing_score",
+            "reading_score",
+        ]
+        assert "gender" in manifest["schema"]["categorical_columns"]
+        assert manifest["metrics"]["best_model"] == "Linear Regression"
+        assert manifest["metrics"]["test_r2"] == 0.88
+        assert set(manifest["files"]) == set(manifest["pickles"].values()) | set(
+            manifest["arrays"].values()
+        )
+        assert library_mismatches(manifest["libraries"]) == {}
+
+    def test_registry_serves_the_bundle_from_memory_maps(
+        self, fitted_registry, tmp_path, test_df
+    ):
+        _bundle_artifacts(fitted_registry, tmp_path)
+        # The loose pickles are not needed once the bundle exists
+        os.remove(tmp_path / "model.pkl")
+        os.remove(tmp_path / "preprocessor.pkl")
+
+        loaded = _registry(tmp_path).load()
+        reference = fitted_registry.get()
+        assert loaded.version == reference.version
+        assert loaded.bundle is not None
+        assert not loaded.model_artifact.loaded
+        # The scorer's weights are views of the mapped file, not copies
+        assert isinstance(loaded.scorer.category_weights.base, np.memmap)
+
+        features = test_df.drop(columns=["math_score"]).head(20)
+        np.testing.assert_allclose(
+            loaded.scorer.predict(features),
+            reference.model.predict(reference.preprocessor.transform(features)),
+            atol=1e-9,
+        )
+
+    def test_compressed_pickles_keep_the_version(
+        self, fitted_registry, tmp_path, test_df
+    ):
+        bundle_path = _bundle_artifacts(fitted_registry, tmp_path, "gzip")
+        bundle = ArtifactBundle.open(bundle_path)
+        assert bundle.manifest["pickles"]["model"] == "model.pkl.gz"
+
+        loaded = _registry(tmp_path).load()
+        assert loaded.version == fitted_registry.get().version
+        features = pd.DataFrame(test_df.drop(columns=["math_score"]).head(5))
+        np.testing.assert_allclose(
+            loaded.model.predict(loaded.preprocessor.transform(features)),
+            fitted_registry.get().model.predict(
+                fitted_registry.get().preprocessor.transform(features)
+            ),
+        )
+
+    def test_tampered_files_fail_verification(self, fitted_registry, tmp_path):
+        bundle_path = _bundle_artifacts(fitted_registry, tmp_path)
+        manifest = ArtifactBundle.open(bundle_path).manifest
+        array_path = os.path.join(bundle_path, *manifest["arrays"]["bias"].split("/"))
+        np.save(array_path, np.array(123.0))
+
+        with pytest.raises(CustomException, match="does not match its manifest"):
+            ArtifactBundle.open(bundle_path)
+        with pytest.raises(CustomException):
+            _registry(tmp_path).load()
+        # Verification can be turned off explicitly
+        assert ArtifactBundle.open(bundle_path, verify=False).version
+
+    def test_edited_manifest_fails_verification(self, fitted_registry, tmp_path):
+        bundle_path = _bundle_artifacts(fitted_registry, tmp_path)
+        manifest_path = os.path.join(bundle_path, MANIFEST_FILE)
+        with open(manifest_path) as file_obj:
+            manifest = json.load(file_obj)
+        name = manifest["pickles"]["model"]
+        manifest["files"][name]["sha256"] = "0" * 64
+        with open(manifest_path, "w") as file_obj:
+            json.dump(manifest, file_obj)
+
+        with pytest.raises(CustomException, match="content hash"):
+            ArtifactBundle.open(bundle_path)
@@ -0,0 +1,61 @@
+import pytest
+
+from benchmarks.suite import bench_serving, compare, summarize
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.pipeline.prediction_cache import PredictionCache, PredictionCacheConfig
+
+
+def _run(**benchmarks):
+    return {"environment": {}, "benchmarks": benchmarks}
+
+
+class TestBenchmarkSuite:
+    def test_summarize_reports_percentiles_and_throughput(self):
+        result = summarize([0.001] * 99 + [0.1], items=10, unit="rows/s")
+        assert result["samples"] == 100
+        assert result["p50_ms"] == pytest.approx(1.0)
+        assert result["p99_ms"] > result["p95_ms"]
+        assert result["throughput"] == pytest.approx(1000 / 0.199)
+        # Concurrent calls overlap, so throughput uses the wall time instead
+        assert summarize([0.01] * 4, wall=0.01)["throughput"] == pytest.approx(400)
+
+    def test_compare_flags_slower_latency_and_lower_throughput(self):
+        baseline = _run(
+            a={"p50_ms": 1.0, "p95_ms": 2.0, "throughput": 100.0},
+            b={"p50_ms": 1.0, "throughput": 100.0},
+            gone={"p50_ms": 1.0},
+        )
+        current = _run(
+            a={"p50_ms": 1.1, "p95_ms": 3.0, "throughput": 70.0},
+            b={"p50_ms": 0.5, "throughput": 150.0},
+        )
+        rows = compare(baseline, current, threshold=0.2)
+        regressed = {
+            (row["benchmark"], row["metric"]) for row in rows if row["regressed"]
+        }
+        assert regressed == {("a", "p95_ms"), ("a", "throughput")}
+        assert {row["benchmark"] for row in rows} == {"a", "b"}
+
+    def test_compare_ignores_tiny_absolute_changes(self):
+        baseline = _run(a={"p50_ms": 0.010})
+        current = _run(a={"p50_ms": 0.020})
+        assert not compare(baseline, current, min_delta_ms=0.05)[0]["regressed"]
+        assert compare(baseline, current, min_delta_ms=0)[0]["regressed"]
+
+    def test_serving_benchmarks_run_on_a_fitted_model(self, fitted_registry, test_df):
+        pipeline = PredictPipeline(
+            registry=fitted_registry,
+            cache=PredictionCache(PredictionCacheConfig(enabled=False)),
+        )
+        features = test_df.drop(columns=["math_score"]).head(10)
+        results = bench_serving(
+            pipeline, features, repeat=1, batch_sizes=(1, 25), max_batch_calls=5
+        )
+        assert set(results) == {
+            "serving/predict_single_row",
+            "serving/predict_batch_1",
+            "serving/predict_batch_25",
+            "serving/custom_data_frame",
+        }
+        assert results["serving/predict_single_row"]["samples"] == 10
+        assert all(result["throughput"] > 0 for result in results.values())
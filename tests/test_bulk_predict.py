@@ -0,0 +1,108 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.exception import CustomException
+from src.pipeline.bulk_predict_pipeline import (
+    PROGRESS_SUFFIX,
+    BulkPredictConfig,
+    BulkPredictPipeline,
+)
+
+
+@pytest.fixture
+def population(test_df, tmp_path):
+    df = test_df.drop(columns=["math_score"]).reset_index(drop=True)
+    df.loc[7, "lunch"] = "brunch"
+    path = tmp_path / "population.csv"
+    df.to_csv(path, index=False)
+    return str(path), df
+
+
+def _pipeline(fitted_registry, workers=1):
+    return BulkPredictPipeline(
+        BulkPredictConfig(
+            chunk_size=30,
+            workers=workers,
+            registry_config=fitted_registry.config,
+        )
+    )
+
+
+class TestBulkPredict:
+    def test_scores_every_row_in_order(self, fitted_registry, population, tmp_path):
+        input_path, df = population
+        output_path = str(tmp_path / "out" / "scores.csv")
+        summary = _pipeline(fitted_registry).initiate_bulk_prediction(
+            input_path, output_path
+        )
+        assert summary["rows"] == len(df)
+        assert summary["failed"] == 1
+        assert summary["chunks"] == -(-len(df) // 30)
+        assert summary["rows_per_second"] > 0
+        assert not os.path.exists(output_path + PROGRESS_SUFFIX)
+
+        scores = pd.read_csv(output_path)
+        pd.testing.assert_frame_equal(scores[df.columns], df)
+        assert "unknown value" in scores.loc[7, "error"]
+        assert np.isnan(scores.loc[7, "predicted_math_score"])
+
+        loaded = fitted_registry.get()
+        valid = scores.drop(index=7)
+        expected = loaded.model.predict(loaded.preprocessor.transform(df.drop(index=7)))
+        np.testing.assert_allclose(
+            valid["predicted_math_score"], np.round(expected, 2), atol=0.01
+        )
+        assert set(valid["confidence_level"]) <= {"High", "Medium", "Low"}
+
+    def test_process_pool_matches_in_process(
+        self, fitted_registry, population, tmp_path
+    ):
+        input_path, _ = population
+        _pipeline(fitted_registry).initiate_bulk_prediction(
+            input_path, str(tmp_path / "inline.csv")
+        )
+        summary = _pipeline(fitted_registry, workers=2).initiate_bulk_prediction(
+            input_path, str(tmp_path / "pooled.csv")
+        )
+        assert summary["workers"] == 2
+        pd.testing.assert_frame_equal(
+            pd.read_csv(tmp_path / "inline.csv"), pd.read_csv(tmp_path / "pooled.csv")
+        )
+
+    def test_resumes_after_the_last_completed_chunk(
+        self, fitted_registry, population, tmp_path, monkeypatch
+    ):
+        input_path, _ = population
+        output_path = str(tmp_path / "scores.csv")
+        scored_chunks = BulkPredictPipeline._scored_chunks
+
+        def interrupted(self, chunks, version):
+            for index, scored in enumerate(scored_chunks(self, chunks, version)):
+                if index == 3:
+                    raise RuntimeError("interrupted")
+                yield scored
+
+        monkeypatch.setattr(BulkPredictPipeline, "_scored_chunks", interrupted)
+        with pytest.raises(CustomException, match="interrupted"):
+            _pipeline(fitted_registry).initiate_bulk_prediction(input_path, output_path)
+        with open(output_path + PROGRESS_SUFFIX) as file_obj:
+            assert json.load(file_obj)["chunks"] == 3
+        # A half-written chunk after the checkpoint is discarded on resume
+        with open(output_path, "a") as file_obj:
+            file_obj.write("female,group B,partial")
+
+        monkeypatch.setattr(BulkPredictPipeline, "_scored_chunks", scored_chunks)
+        summary = _pipeline(fitted_registry).initiate_bulk_prediction(
+            input_path, output_path
+        )
+        assert summary["resumed_after_chunk"] == 3
+
+        _pipeline(fitted_registry).initiate_bulk_prediction(
+            input_path, str(tmp_path / "fresh.csv")
+        )
+        with open(output_path) as resumed, open(tmp_path / "fresh.csv") as fresh:
+            assert resumed.read() == fresh.read()
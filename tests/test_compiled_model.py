@@ -0,0 +1,97 @@
+import shutil
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import Lasso, Ridge
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.tree import DecisionTreeRegressor
+
+from src.components import compiled_model
+from src.components.compiled_model import (
+    ModelCompiler,
+    compile_model,
+    load_compiled_model,
+    save_compiled_model,
+)
+from src.components.data_transformation import DataTransformation
+
+
+@pytest.fixture(scope="module")
+def fitted(train_df, test_df):
+    preprocessor = DataTransformation().get_data_transformer_object()
+    X_train = preprocessor.fit_transform(train_df.drop(columns=["math_score"]))
+    features = test_df.drop(columns=["math_score"])
+    return preprocessor, X_train, train_df["math_score"], features
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        Lasso(alpha=0.1),
+        Ridge(),
+        DecisionTreeRegressor(random_state=0),
+        RandomForestRegressor(n_estimators=16, random_state=0),
+        GradientBoostingRegressor(n_estimators=32, subsample=0.8, random_state=0),
+    ],
+    ids=lambda model: type(model).__name__,
+)
+def test_compiled_matches_pickled_path(fitted, model):
+    preprocessor, X_train, y_train, features = fitted
+    model.fit(X_train, y_train)
+    compiled = compile_model(preprocessor, model)
+
+    expected = model.predict(preprocessor.transform(features))
+    np.testing.assert_allclose(compiled.predict(features), expected, atol=1e-9)
+    np.testing.assert_allclose(
+        compiled.predict(features.iloc[0].to_dict()), expected[:1], atol=1e-9
+    )
+
+
+def test_unsupported_model_is_rejected(fitted):
+    preprocessor, X_train, y_train, _ = fitted
+    with pytest.raises(ValueError):
+        compile_model(preprocessor, KNeighborsRegressor().fit(X_train, y_train))
+
+
+def test_round_trip_and_stale_version(fitted, tmp_path):
+    preprocessor, X_train, y_train, features = fitted
+    compiled = compile_model(preprocessor, Ridge().fit(X_train, y_train))
+    path = str(tmp_path / "model_compiled.npz")
+    save_compiled_model(path, compiled, source_version="abc")
+
+    restored = load_compiled_model(path, source_version="abc")
+    np.testing.assert_array_equal(
+        restored.predict(features), compiled.predict(features)
+    )
+    assert load_compiled_model(path, source_version="other") is None
+    assert load_compiled_model(str(tmp_path / "missing.npz")) is None
+
+
+def test_compilation_fails_when_it_deviates_from_the_pickles(
+    fitted_registry, test_df, tmp_path, monkeypatch
+):
+    config = fitted_registry.config
+    shutil.copy(config.model_path, tmp_path / "model.pkl")
+    shutil.copy(config.preprocessor_path, tmp_path / "preprocessor.pkl")
+    compiler = ModelCompiler()
+    compiler.compiled_model_config.trained_model_file_path = str(tmp_path / "model.pkl")
+    compiler.compiled_model_config.preprocessor_obj_file_path = str(
+        tmp_path / "preprocessor.pkl"
+    )
+    compiler.compiled_model_config.compiled_model_file_path = str(
+        tmp_path / "model_compiled.npz"
+    )
+    features = test_df.drop(columns=["math_score"])
+    assert compiler.initiate_model_compilation(validation_features=features)
+
+    def off_by_one(preprocessor, model):
+        compiled = compile_model(preprocessor, model)
+        compiled.bias += 1.0
+        return compiled
+
+    (tmp_path / "model_compiled.npz").unlink()
+    monkeypatch.setattr(compiled_model, "compile_model", off_by_one)
+    with pytest.raises(Exception, match="deviates"):
+        compiler.initiate_model_compilation(validation_features=features)
+    assert not (tmp_path / "model_compiled.npz").exists()
@@ -0,0 +1,103 @@
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.components.compiled_preprocessor import (
+    CompiledPreprocessor,
+    compile_preprocessor,
+)
+from src.components.data_transformation import DataTransformation
+from src.utils import load_object
+
+PREPROCESSOR_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "artifacts", "preprocessor.pkl"
+)
+
+
+@pytest.fixture(scope="module")
+def preprocessor():
+    return load_object(PREPROCESSOR_PATH)
+
+
+@pytest.fixture(scope="module")
+def compiled(preprocessor):
+    return compile_preprocessor(preprocessor)
+
+
+@pytest.fixture(scope="module")
+def features(test_df):
+    return test_df.drop(columns=["math_score"])
+
+
+@pytest.fixture(scope="module")
+def category_grid(preprocessor):
+    """Every category combination at a spread of score values."""
+    encoder = preprocessor.named_transformers_["categorical_pipeline"][
+        "one_hot_encoder"
+    ]
+    columns = preprocessor.transformers_[1][2]
+    rows = [
+        dict(zip(columns, combination))
+        for combination in itertools.product(*encoder.categories_)
+    ]
+    df = pd.DataFrame(rows)
+    df["reading_score"] = np.linspace(0, 100, len(df))
+    df["writing_score"] = np.linspace(100, 0, len(df))
+    return df
+
+
+class TestCompiledPreprocessorParity:
+    def test_dataframe_is_bit_identical(self, preprocessor, compiled, features):
+        assert np.array_equal(
+            compiled.transform(features), preprocessor.transform(features)
+        )
+
+    def test_category_grid_is_bit_identical(
+        self, preprocessor, compiled, category_grid
+    ):
+        assert np.array_equal(
+            compiled.transform(category_grid), preprocessor.transform(category_grid)
+        )
+
+    def test_records_dicts_and_structured_arrays(
+        self, preprocessor, compiled, features
+    ):
+        expected = preprocessor.transform(features)
+        records = features.to_dict("records")
+
+        assert np.array_equal(compiled.transform(records), expected)
+        assert np.array_equal(compiled.transform(records[7]), expected[7:8])
+        assert np.array_equal(
+            compiled.transform(features.to_records(index=False)), expected
+        )
+
+    def test_missing_numeric_uses_median(self, preprocessor, compiled, features):
+        df = features.head(5).copy()
+        df["reading_score"] = df["reading_score"].astype(float)
+        df.loc[2, "reading_score"] = np.nan
+        assert np.array_equal(compiled.transform(df), preprocessor.transform(df))
+
+    def test_freshly_fitted_preprocessor(self, train_df, features):
+        preprocessor = DataTransformation().get_data_transformer_object()
+        preprocessor.fit(train_df.drop(columns=["math_score"]))
+        compiled = compile_preprocessor(preprocessor)
+        assert np.array_equal(
+            compiled.transform(features), preprocessor.transform(features)
+        )
+
+    def test_save_and_load_round_trip(self, compiled, preprocessor, features, tmp_path):
+        path = str(tmp_path / "preprocessor_compiled.npz")
+        compiled.save(path)
+        restored = CompiledPreprocessor.load(path)
+        assert np.array_equal(
+            restored.transform(features), preprocessor.transform(features)
+        )
+
+    def test_unknown_category_raises(self, compiled, features):
+        record = features.iloc[0].to_dict()
+        record["gender"] = "unknown"
+        with pytest.raises(ValueError):
+            compiled.transform(record)
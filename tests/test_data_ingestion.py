@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from src.components.data_ingestion import (
+    DataIngestion,
+    DataIngestionConfig,
+    hash_split,
+)
+from src.utils import load_table
+
+
+def _ingestion(tmp_path, source, artifact_format, chunk_size):
+    ingestion = DataIngestion()
+    ingestion.ingestion_config = DataIngestionConfig(
+        train_data_path=str(tmp_path / "train.csv"),
+        test_data_path=str(tmp_path / "test.csv"),
+        raw_data_path=str(tmp_path / "raw.csv"),
+        source_data_path=str(source),
+        artifact_format=artifact_format,
+        chunk_size=chunk_size,
+    )
+    return ingestion
+
+
+class TestHashSplit:
+    def test_deterministic_and_proportional(self):
+        keys = np.arange(20_000)
+        is_test = hash_split(keys, 0.2, 42)
+        assert abs(is_test.mean() - 0.2) < 0.01
+        assert np.array_equal(is_test[5000:], hash_split(keys[5000:], 0.2, 42))
+        assert not np.array_equal(is_test, hash_split(keys, 0.2, 7))
+
+
+class TestStreamingIngestion:
+    def test_split_does_not_depend_on_chunk_size(self, tmp_path, train_df):
+        source = tmp_path / "stud.csv"
+        train_df.to_csv(source, index=False)
+
+        splits = []
+        for chunk_size, artifact_format in ((37, "csv"), (500, "npy")):
+            out = tmp_path / f"{artifact_format}_{chunk_size}"
+            train_path, test_path = _ingestion(
+                out, source, artifact_format, chunk_size
+            ).initiate_data_ingestion()
+            splits.append((load_table(train_path), load_table(test_path)))
+
+        (train_a, test_a), (train_b, test_b) = splits
+        assert len(train_a) + len(test_a) == len(train_df)
+        np.testing.assert_array_equal(train_a["math_score"], train_b["math_score"])
+        np.testing.assert_array_equal(test_a["math_score"], test_b["math_score"])
+        assert test_b["lunch"].astype(object).tolist() == test_a["lunch"].tolist()
+        raw = load_table(str(tmp_path / "npy_500" / "raw"))
+        pd.testing.assert_series_equal(raw["gender"].astype(object), train_df["gender"])
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from src.components.data_transformation import (
+    DataTransformation,
+    DataTransformationConfig,
+)
+from src.components.streaming_preprocessor import StreamingPreprocessorFit
+from src.utils import TableWriter, iter_table, load_table, save_table, table_path
+
+
+def _transformation(tmp_path, chunk_size=100_000):
+    transformation = DataTransformation()
+    transformation.data_transformation_config = DataTransformationConfig(
+        preprocessor_obj_file_path=str(tmp_path / "preprocessor.pkl"),
+        compiled_preprocessor_file_path=str(tmp_path / "preprocessor_compiled.npz"),
+        train_array_file_path=str(tmp_path / "train_array.npy"),
+        test_array_file_path=str(tmp_path / "test_array.npy"),
+        chunk_size=chunk_size,
+    )
+    return transformation
+
+
+class TestTables:
+    def test_npy_table_round_trip(self, tmp_path, train_df):
+        path = table_path(str(tmp_path / "train.csv"), "npy")
+        save_table(path, train_df)
+        loaded = load_table(path)
+
+        assert list(loaded.columns) == list(train_df.columns)
+        assert isinstance(loaded["gender"].dtype, pd.CategoricalDtype)
+        categorical = train_df.select_dtypes(exclude="number").columns
+        pd.testing.assert_frame_equal(
+            loaded.astype({column: object for column in categorical}),
+            train_df,
+            check_dtype=False,
+        )
+
+    def test_missing_categories_survive(self, tmp_path):
+        df = pd.DataFrame(
+            {"lunch": ["standard", None, "free/reduced"], "x": [1.0, 2, 3]}
+        )
+        save_table(str(tmp_path / "table"), df)
+        loaded = load_table(str(tmp_path / "table"))
+        assert loaded["lunch"].isna().tolist() == [False, True, False]
+
+    def test_chunked_npy_matches_single_write(self, tmp_path, train_df):
+        with TableWriter(str(tmp_path / "chunked")) as writer:
+            for start in range(0, len(train_df), 97):
+                writer.write(train_df.iloc[start : start + 97])
+        save_table(str(tmp_path / "whole"), train_df)
+
+        chunked = load_table(str(tmp_path / "chunked"))
+        pd.testing.assert_frame_equal(chunked, load_table(str(tmp_path / "whole")))
+        rebuilt = pd.concat(iter_table(str(tmp_path / "chunked"), 300))
+        pd.testing.assert_frame_equal(rebuilt, chunked)
+
+
+class TestStreamingPreprocessorFit:
+    def test_matches_in_memory_fit(self, train_df):
+        df = train_df.drop(columns=["math_score"])
+        df.loc[::7, "reading_score"] = np.nan
+        df.loc[::11, "lunch"] = np.nan
+
+        expected = DataTransformation().get_data_transformer_object().fit(df)
+        streamed = StreamingPreprocessorFit(
+            DataTransformation().get_data_transformer_object()
+        ).fit(df.iloc[start : start + 64] for start in range(0, len(df), 64))
+
+        for name in ("numerical_pipeline", "categorical_pipeline"):
+            imputer = streamed.named_transformers_[name].steps[0][1]
+            np.testing.assert_array_equal(
+                imputer.statistics_,
+                expected.named_transformers_[name].steps[0][1].statistics_,
+            )
+        np.testing.assert_allclose(
+            streamed.transform(df), expected.transform(df), rtol=0, atol=1e-12
+        )
+
+
+class TestDataTransformation:
+    def test_npy_splits_match_csv(self, tmp_path, train_df, test_df):
+        expected = None
+        for table_format in ("csv", "npy"):
+            train_path = table_path(str(tmp_path / "train.csv"), table_format)
+            test_path = table_path(str(tmp_path / "test.csv"), table_format)
+            save_table(train_path, train_df)
+            save_table(test_path, test_df)
+
+            train_arr, test_arr, _ = _transformation(
+                tmp_path, chunk_size=128
+            ).initiate_data_transformation(train_path, test_path)
+
+            assert isinstance(train_arr, np.memmap)
+            if expected is None:
+                preprocessor = DataTransformation().get_data_transformer_object()
+                features = preprocessor.fit_transform(
+                    train_df.drop(columns=["math_score"])
+                )
+                np.testing.assert_array_equal(train_arr[:, :-1], features)
+                np.testing.assert_array_equal(train_arr[:, -1], train_df["math_score"])
+                expected = (np.array(train_arr), np.array(test_arr))
+            else:
+                np.testing.assert_array_equal(train_arr, expected[0])
+                np.testing.assert_array_equal(test_arr, expected[1])
@@ -0,0 +1,63 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from src.pipeline.health import ModelHealth, canary_record
+from src.pipeline.model_registry import ModelRegistry, PickledArtifact
+
+
+class _BrokenModel:
+    def predict(self, X):
+        return np.full(len(X), np.nan)
+
+
+class TestModelHealth:
+    def test_not_ready_before_load(self, fitted_registry):
+        health = ModelHealth(ModelRegistry(fitted_registry.config))
+        report = health.readiness()
+        assert report["ready"] is False
+        assert report["checks"] == {"model_loaded": False, "canary_passed": False}
+        assert report["model_version"] is None
+        assert not health.needs_canary()
+
+    def test_canary_runs_once_per_version(self, fitted_registry):
+        registry = ModelRegistry(fitted_registry.config)
+        registry.load()
+        health = ModelHealth(registry)
+        assert health.needs_canary()
+
+        first = health.run_canary()
+        assert first["ok"] and np.isfinite(first["score"])
+        assert health.run_canary() is first
+        assert not health.needs_canary()
+
+        report = health.readiness()
+        assert report["ready"] is True
+        assert report["model_version"] == registry.get().version
+        assert report["load_duration_ms"] > 0
+        assert report["canary"]["score"] == first["score"]
+        assert report["last_inference_at"] is None
+
+    def test_failed_canary_is_not_ready(self, fitted_registry):
+        registry = ModelRegistry(fitted_registry.config)
+        loaded = registry.load()
+        registry._current = replace(
+            loaded,
+            model_artifact=PickledArtifact.of(_BrokenModel()),
+            scorer=None,
+            version="broken",
+        )
+        health = ModelHealth(registry)
+
+        assert health.run_canary()["ok"] is False
+        report = health.readiness()
+        assert report["ready"] is False
+        assert "not finite" in report["canary"]["error"]
+
+    def test_canary_record_uses_fitted_vocabulary(self, fitted_registry):
+        loaded = fitted_registry.get()
+        record = canary_record(loaded)
+        for column, vocabulary in loaded.categories.items():
+            assert record[column] == vocabulary[0]
+        assert record["reading_score"] == pytest.approx(70.0)
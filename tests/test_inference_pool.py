@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.pipeline.inference_pool import (
+    InferencePool,
+    InferencePoolConfig,
+    InferenceTimeoutError,
+)
+from src.pipeline.micro_batcher import QueueFullError
+from src.pipeline.predict_pipeline import PredictPipeline, feature_key
+from src.pipeline.prediction_cache import PredictionCache, PredictionCacheConfig
+
+
+class _SlowPipeline:
+    def __init__(self, delay):
+        self.delay = delay
+        self.threads = set()
+
+    def predict_record(self, record):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return record["x"]
+
+
+def _config(**overrides):
+    values = dict(mode="thread", size=2, max_queue=2, timeout=5, batch_timeout=5)
+    values.update(overrides)
+    return InferencePoolConfig(**values)
+
+
+def _record(test_df):
+    return test_df.drop(columns=["math_score"]).iloc[0].to_dict()
+
+
+class TestInferencePool:
+    def test_runs_off_the_event_loop(self):
+        pipeline = _SlowPipeline(0.05)
+        pool = InferencePool(pipeline, _config())
+
+        async def run():
+            loop_thread = threading.get_ident()
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.005)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            results = await asyncio.gather(
+                *[pool.run("predict_record", {"x": i}) for i in range(4)]
+            )
+            task.cancel()
+            return loop_thread, ticks, results
+
+        loop_thread, ticks, results = asyncio.run(run())
+        pool.stop()
+        assert results == [0, 1, 2, 3]
+        # The loop kept running while the predictions slept
+        assert ticks >= 5
+        assert loop_thread not in pipeline.threads
+        assert len(pipeline.threads) == 2
+        assert pool.stats()["completed"] == 4
+
+    def test_rejects_beyond_pool_and_queue(self):
+        pool = InferencePool(_SlowPipeline(0.2), _config(size=1, max_queue=1))
+
+        async def run():
+            return await asyncio.gather(
+                *[pool.run("predict_record", {"x": i}) for i in range(4)],
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+        pool.stop()
+        assert results[:2] == [0, 1]
+        assert all(isinstance(result, QueueFullError) for result in results[2:])
+        assert pool.stats()["rejected"] == 2
+
+    def test_timeout_keeps_slot_until_work_finishes(self):
+        pool = InferencePool(_SlowPipeline(0.3), _config(size=1, max_queue=0))
+
+        async def run():
+            with pytest.raises(InferenceTimeoutError):
+                await pool.run("predict_record", {"x": 1}, timeout=0.05)
+            # The timed-out call is still running, so the pool is full
+            with pytest.raises(QueueFullError):
+                await pool.run("predict_record", {"x": 2})
+            await asyncio.sleep(0.4)
+            return await pool.run("predict_record", {"x": 3})
+
+        assert asyncio.run(run()) == 3
+        pool.stop()
+        assert pool.stats()["timeouts"] == 1
+
+    def test_process_pool_preloads_model_and_fills_parent_cache(
+        self, fitted_registry, test_df
+    ):
+        cache = PredictionCache(PredictionCacheConfig(enabled=True, shared_path=""))
+        pipeline = PredictPipeline(registry=fitted_registry, cache=cache)
+        pool = InferencePool(pipeline, _config(mode="process", size=1, timeout=30))
+        record = _record(test_df)
+        try:
+            pool.start()
+            score = asyncio.run(pool.run("predict_record", record))
+            results = asyncio.run(
+                pool.run("predict_batch", [record, {"gender": "x"}], 10)
+            )
+        finally:
+            pool.stop()
+
+        version = fitted_registry.get().version
+        assert cache.get(version, feature_key(record)) == pytest.approx(score)
+        assert score == pytest.approx(pipeline.predict_record(record))
+        assert results[0]["predicted_math_score"] == round(score, 2)
+        assert results[1]["status"] == "error"
@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from benchmarks.load import (
+    build_report,
+    fixed_rate_schedule,
+    recorded_schedule,
+    run_closed_loop,
+    run_open_loop,
+)
+from benchmarks.traffic import (
+    CATEGORICAL_COLUMNS,
+    TrafficModel,
+    read_traffic,
+    write_traffic,
+)
+from src.pipeline.request_recorder import (
+    RequestRecorder,
+    RequestRecorderConfig,
+    RequestRecordingMiddleware,
+)
+
+
+def _echo_app(recorder=None):
+    app = FastAPI()
+    if recorder is not None:
+        app.add_middleware(RequestRecordingMiddleware, recorder=recorder)
+
+    @app.post("/api/predict")
+    async def predict(body: dict):
+        return {"predicted_math_score": body["reading_score"]}
+
+    return app
+
+
+async def _replay(app, runner, entries, *args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await runner(client, entries, *args)
+
+
+class TestTraffic:
+    def test_synthetic_requests_follow_the_raw_data(self, train_df):
+        model = TrafficModel(train_df)
+        entries = model.requests(500, seed=1)
+        assert entries == model.requests(500, seed=1)
+        bodies = [entry["body"] for entry in entries]
+        for column in CATEGORICAL_COLUMNS:
+            assert {body[column] for body in bodies} <= set(train_df[column])
+        pairs = set(map(tuple, train_df[["reading_score", "writing_score"]].values))
+        assert all((b["reading_score"], b["writing_score"]) in pairs for b in bodies)
+
+    def test_distinct_limits_the_unique_bodies(self, train_df, tmp_path):
+        entries = TrafficModel(train_df).requests(300, seed=1, distinct=20)
+        assert len({json.dumps(entry["body"]) for entry in entries}) <= 20
+
+        write_traffic(str(tmp_path / "traffic.jsonl"), entries)
+        assert read_traffic(str(tmp_path / "traffic.jsonl")) == entries
+
+    def test_schedules(self):
+        np.testing.assert_allclose(fixed_rate_schedule(4, 2.0), [0, 0.5, 1.0, 1.5])
+        poisson = fixed_rate_schedule(2000, 100.0, "poisson", seed=0)
+        assert poisson[0] == 0 and np.all(np.diff(poisson) >= 0)
+        assert abs(poisson[-1] - 20) < 2
+        entries = [{"ts": 100.0}, {"ts": 100.5}, {"ts": 102.0}]
+        np.testing.assert_allclose(recorded_schedule(entries, speed=2), [0, 0.25, 1])
+
+
+class TestLoadRunner:
+    def test_open_and_closed_loop_reports(self, train_df):
+        entries = TrafficModel(train_df).requests(20, seed=2)
+        app = _echo_app()
+
+        open_loop = asyncio.run(
+            _replay(app, run_open_loop, entries, fixed_rate_schedule(20, 200.0))
+        )
+        report = build_report(*open_loop)
+        assert report["requests"] == report["succeeded"] == 20
+        # Twenty requests 5 ms apart can't finish sooner than the schedule
+        assert report["duration_seconds"] >= 0.095
+
+        closed_loop = asyncio.run(_replay(app, run_closed_loop, entries, 4))
+        report = build_report(*closed_loop)
+        assert report["statuses"] == {"200": 20}
+        assert report["p50_ms"] <= report["p99_ms"] <= report["max_ms"]
+
+
+class TestRequestRecorder:
+    def test_records_replayable_requests(self, tmp_path):
+        path = tmp_path / "requests.jsonl"
+        recorder = RequestRecorder(RequestRecorderConfig(path=str(path)))
+        client = TestClient(_echo_app(recorder))
+
+        body = {"reading_score": 70, "writing_score": 72}
+        client.post("/api/predict", json=body, headers={"X-Model-Variant": "ridge"})
+        client.post("/api/predict", content=b"not json")
+        recorder.close()
+
+        (entry,) = read_traffic(str(path))
+        assert entry["path"] == "/api/predict"
+        assert entry["body"] == body
+        assert entry["variant"] == "ridge"
+        assert entry["status"] == 200
+        assert recorder.stats()["skipped"] == 1
+
+    def test_disabled_or_unsampled_requests_pass_through(self, tmp_path):
+        assert not RequestRecorder(RequestRecorderConfig(path="")).wants("/api/predict")
+        recorder = RequestRecorder(
+            RequestRecorderConfig(path=str(tmp_path / "r.jsonl"), sample_rate=0)
+        )
+        assert not recorder.wants("/api/predict")
+        assert not RequestRecorder(
+            RequestRecorderConfig(path=str(tmp_path / "r.jsonl"))
+        ).wants("/health")
@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+import queue
+
+import pytest
+
+from src.logger import (
+    LoggingConfig,
+    _DroppingQueueHandler,
+    setup_logging,
+    shutdown_logging,
+)
+
+
+@pytest.fixture
+def log_config(tmp_path):
+    config = LoggingConfig(
+        level="INFO",
+        module_levels={},
+        file_path=str(tmp_path / "app.log"),
+        max_bytes=10 * 1024 * 1024,
+        rotate_when="",
+        backup_count=2,
+        json=False,
+        console=False,
+        queue_size=1000,
+    )
+    yield config
+    shutdown_logging()
+    for name in ("tests.quiet", "tests.loud"):
+        logging.getLogger(name).setLevel(logging.NOTSET)
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+def _read(path):
+    with open(path) as file_obj:
+        return file_obj.read().splitlines()
+
+
+class TestLogging:
+    def test_writes_through_background_listener(self, log_config):
+        setup_logging(log_config)
+        logging.info("hello %s", "world")
+        logging.debug("hidden")
+        shutdown_logging()
+
+        lines = _read(log_config.file_path)
+        assert len(lines) == 1
+        assert lines[0].endswith("root - INFO - hello world")
+
+    def test_json_lines_with_extra_fields_and_module_levels(self, log_config):
+        log_config.json = True
+        log_config.module_levels = {"tests.quiet": "ERROR", "tests.loud": "DEBUG"}
+        setup_logging(log_config)
+        logging.getLogger("tests.quiet").warning("dropped by level")
+        logging.getLogger("tests.loud").debug("kept", extra={"request_id": "r1"})
+        shutdown_logging()
+
+        entries = [json.loads(line) for line in _read(log_config.file_path)]
+        assert len(entries) == 1
+        assert entries[0]["logger"] == "tests.loud"
+        assert entries[0]["level"] == "DEBUG"
+        assert entries[0]["message"] == "kept"
+        assert entries[0]["request_id"] == "r1"
+
+    def test_size_based_rotation(self, log_config):
+        log_config.max_bytes = 500
+        setup_logging(log_config)
+        for index in range(50):
+            logging.info("line %d %s", index, "x" * 40)
+        shutdown_logging()
+
+        directory = os.path.dirname(log_config.file_path)
+        assert sorted(os.listdir(directory)) == ["app.log", "app.log.1", "app.log.2"]
+        assert os.path.getsize(log_config.file_path) <= 500
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = _DroppingQueueHandler(queue.Queue(maxsize=1))
+        logger = logging.getLogger("tests.dropping")
+        logger.propagate = False
+        logger.addHandler(handler)
+        try:
+            logger.warning("first")
+            logger.warning("second")
+        finally:
+            logger.removeHandler(handler)
+            logger.propagate = True
+        assert handler.queue.qsize() == 1
+        assert handler.dropped == 1
+
+    def test_default_file_is_per_process(self, monkeypatch):
+        monkeypatch.delenv("LOG_FILE", raising=False)
+        assert "{pid}" in LoggingConfig().file_path
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+    def test_forked_child_gets_its_own_listener(self, log_config):
+        log_config.file_path = log_config.file_path.replace("app.log", "app-{pid}.log")
+        setup_logging(log_config)
+        pid = os.fork()
+        if pid == 0:
+            logging.info("from child")
+            shutdown_logging()
+            os._exit(0)
+        os.waitpid(pid, 0)
+        logging.info("from parent")
+        shutdown_logging()
+
+        child_log = log_config.file_path.replace("{pid}", str(pid))
+        parent_log = log_config.file_path.replace("{pid}", str(os.getpid()))
+        assert _read(child_log)[0].endswith("from child")
+        assert _read(parent_log)[0].endswith("from parent")
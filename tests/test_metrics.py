@@ -0,0 +1,106 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+
+from src.metrics import (
+    REQUEST_ERRORS,
+    REQUESTS,
+    STAGE_LATENCY,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsMiddleware,
+    MetricsRegistry,
+)
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.pipeline.prediction_cache import PredictionCache, PredictionCacheConfig
+
+
+class TestMetrics:
+    def test_text_exposition(self):
+        registry = MetricsRegistry()
+        counter = Counter("jobs_total", "Jobs.", ("kind",), registry=registry)
+        gauge = Gauge("depth", "Depth.", registry=registry)
+        histogram = Histogram(
+            "latency_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry
+        )
+        counter.inc(kind="a")
+        counter.inc(2, kind='quote"d')
+        gauge.set_function(lambda: 3)
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        lines = registry.render().splitlines()
+        assert "# TYPE jobs_total counter" in lines
+        assert 'jobs_total{kind="a"} 1' in lines
+        assert 'jobs_total{kind="quote\\"d"} 2' in lines
+        assert "depth 3" in lines
+        assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{le="1"} 2' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+        assert "latency_seconds_count 3" in lines
+        assert "latency_seconds_sum 5.55" in lines
+
+    def test_rejects_wrong_labels_and_duplicates(self):
+        registry = MetricsRegistry()
+        counter = Counter("jobs_total", "Jobs.", ("kind",), registry=registry)
+        with pytest.raises(ValueError):
+            counter.inc(other="x")
+        with pytest.raises(ValueError):
+            Counter("jobs_total", "Jobs.", registry=registry)
+
+    def test_middleware_labels_by_route_template(self):
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: int):
+            if item_id < 0:
+                raise HTTPException(status_code=500, detail="boom")
+            return {"id": item_id}
+
+        client = TestClient(app)
+        before = REQUESTS.value(method="GET", route="/items/{item_id}", status=200)
+        errors = REQUEST_ERRORS.value(method="GET", route="/items/{item_id}")
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/items/-1")
+        client.get("/missing/path")
+
+        assert (
+            REQUESTS.value(method="GET", route="/items/{item_id}", status=200)
+            == before + 2
+        )
+        assert REQUEST_ERRORS.value(method="GET", route="/items/{item_id}") == (
+            errors + 1
+        )
+        assert REQUESTS.value(method="GET", route="<unmatched>", status=404) >= 1
+
+    def test_middleware_answers_are_unmatched(self):
+        app = FastAPI()
+        app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"])
+        app.add_middleware(MetricsMiddleware)
+
+        client = TestClient(app)
+        before = REQUESTS.value(method="OPTIONS", route="<unmatched>", status=200)
+        headers = {"Origin": "http://a.test", "Access-Control-Request-Method": "POST"}
+        for path in ("/anything/1", "/anything/2"):
+            assert client.options(path, headers=headers).status_code == 200
+
+        assert (
+            REQUESTS.value(method="OPTIONS", route="<unmatched>", status=200)
+            == before + 2
+        )
+        assert REQUESTS.value(method="OPTIONS", route="/anything/1", status=200) == 0
+
+    def test_pipeline_records_stage_latency(self, fitted_registry, test_df):
+        pipeline = PredictPipeline(
+            registry=fitted_registry,
+            cache=PredictionCache(PredictionCacheConfig(enabled=False)),
+        )
+        stages = ("dataframe", "validation", "predict", "serialization")
+        before = {stage: STAGE_LATENCY.count(stage=stage) for stage in stages}
+        pipeline.predict_batch(test_df.drop(columns=["math_score"]).head(5))
+        for stage in stages:
+            assert STAGE_LATENCY.count(stage=stage) > before[stage]
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from src.pipeline.micro_batcher import (
+    BatcherStoppedError,
+    MicroBatcher,
+    MicroBatcherConfig,
+    PredictionError,
+    QueueFullError,
+)
+
+
+def _echo_batch(calls):
+    def predict_batch(records):
+        calls.append(len(records))
+        return [
+            (
+                {"status": "success", "predicted_math_score": record["x"]}
+                if record["x"] >= 0
+                else {"status": "error", "error": "negative"}
+            )
+            for record in records
+        ]
+
+    return predict_batch
+
+
+def _config(**overrides):
+    values = dict(enabled=True, max_wait_ms=20, max_batch_size=8, max_queue_depth=100)
+    values.update(overrides)
+    return MicroBatcherConfig(**values)
+
+
+class TestMicroBatcher:
+    def test_coalesces_concurrent_requests(self):
+        calls = []
+
+        async def run():
+            batcher = MicroBatcher(_echo_batch(calls), _config())
+            await batcher.start()
+            results = await asyncio.gather(
+                *[batcher.submit({"x": i}) for i in range(20)]
+            )
+            await batcher.stop()
+            return results
+
+        results = asyncio.run(run())
+        assert [r["predicted_math_score"] for r in results] == list(range(20))
+        assert calls == [8, 8, 4]
+
+    def test_row_errors_resolve_only_their_caller(self):
+        async def run():
+            batcher = MicroBatcher(_echo_batch([]), _config())
+            await batcher.start()
+            results = await asyncio.gather(
+                batcher.submit({"x": 1}),
+                batcher.submit({"x": -1}),
+                return_exceptions=True,
+            )
+            await batcher.stop()
+            return results
+
+        ok, failed = asyncio.run(run())
+        assert ok["predicted_math_score"] == 1
+        assert isinstance(failed, PredictionError)
+
+    def test_rejects_past_queue_limit(self):
+        async def run():
+            batcher = MicroBatcher(_echo_batch([]), _config(max_queue_depth=2))
+            await batcher.start()
+            results = await asyncio.gather(
+                *[batcher.submit({"x": i}) for i in range(3)], return_exceptions=True
+            )
+            await batcher.stop()
+            return batcher, results
+
+        batcher, results = asyncio.run(run())
+        assert isinstance(results[-1], QueueFullError)
+        assert batcher.stats()["rejected"] == 1
+        assert batcher.queue_depth == 0
+
+    def test_awaits_async_predictor_and_passes_overload_through(self):
+        calls = []
+        echo = _echo_batch(calls)
+
+        async def predict_batch(records):
+            if len(calls) == 1:
+                raise QueueFullError("pool is full")
+            return echo(records)
+
+        async def run():
+            batcher = MicroBatcher(predict_batch, _config(max_wait_ms=5))
+            await batcher.start()
+            first = await batcher.submit({"x": 1})
+            second = await asyncio.gather(
+                batcher.submit({"x": 2}), return_exceptions=True
+            )
+            await batcher.stop()
+            return first, second[0]
+
+        first, second = asyncio.run(run())
+        assert first["predicted_math_score"] == 1
+        assert isinstance(second, QueueFullError)
+
+    def test_stop_fails_requests_that_were_not_scored(self):
+        calls = []
+        echo = _echo_batch(calls)
+
+        async def predict_batch(records):
+            await asyncio.sleep(0.05)
+            return echo(records)
+
+        async def run():
+            # A long window keeps the fifth request in an unfinished batch
+            batcher = MicroBatcher(
+                predict_batch, _config(max_wait_ms=10_000, max_batch_size=2)
+            )
+            await batcher.start()
+            early = [asyncio.create_task(batcher.submit({"x": i})) for i in range(5)]
+            await asyncio.sleep(0.01)
+            # Queued but never picked up by the collector
+            late = [asyncio.create_task(batcher.submit({"x": i})) for i in range(3)]
+            await asyncio.sleep(0)
+            await batcher.stop()
+            results = await asyncio.wait_for(
+                asyncio.gather(*early, *late, return_exceptions=True), 1
+            )
+            with pytest.raises(BatcherStoppedError):
+                await batcher.submit({"x": 9})
+            return results
+
+        results = asyncio.run(run())
+        assert [r["predicted_math_score"] for r in results[:4]] == [0, 1, 2, 3]
+        assert all(isinstance(r, BatcherStoppedError) for r in results[4:])
+        assert all(isinstance(r, QueueFullError) for r in results[4:])
+        assert calls == [2, 2]
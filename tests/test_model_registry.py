@@ -0,0 +1,59 @@
+import os
+import pickle
+
+from src.pipeline.model_registry import ModelRegistry, ModelRegistryConfig
+
+
+def _write(path, obj):
+    with open(path, "wb") as file_obj:
+        pickle.dump(obj, file_obj)
+
+
+def _registry(tmp_path):
+    model_path = tmp_path / "model.pkl"
+    preprocessor_path = tmp_path / "preprocessor.pkl"
+    _write(model_path, {"name": "model-v1"})
+    _write(preprocessor_path, {"name": "preprocessor-v1"})
+    config = ModelRegistryConfig(
+        model_path=str(model_path),
+        preprocessor_path=str(preprocessor_path),
+        compiled_model_path=str(tmp_path / "model_compiled.npz"),
+        reload_interval=0,
+    )
+    return ModelRegistry(config), model_path
+
+
+class TestModelRegistry:
+    def test_get_loads_once(self, tmp_path):
+        registry, _ = _registry(tmp_path)
+        first = registry.get()
+        assert registry.get() is first
+        assert first.model == {"name": "model-v1"}
+        assert registry.info()["version"] == first.version
+
+    def test_refresh_swaps_after_change_is_stable(self, tmp_path):
+        registry, model_path = _registry(tmp_path)
+        old = registry.get()
+
+        _write(model_path, {"name": "model-v2"})
+        os.utime(model_path, ns=(0, old.fingerprint[0][0] + 1_000_000))
+
+        # First sighting only marks the change as pending
+        assert registry.refresh() is False
+        assert registry.get() is old
+
+        assert registry.refresh() is True
+        new = registry.get()
+        assert new.model == {"name": "model-v2"}
+        assert new.version != old.version
+        # In-flight holders of the old snapshot are unaffected
+        assert old.model == {"name": "model-v1"}
+
+    def test_refresh_keeps_version_when_content_unchanged(self, tmp_path):
+        registry, model_path = _registry(tmp_path)
+        old = registry.get()
+
+        os.utime(model_path, ns=(0, old.fingerprint[0][0] + 1_000_000))
+        registry.refresh()
+        assert registry.refresh() is False
+        assert registry.get().version == old.version
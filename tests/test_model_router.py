@@ -0,0 +1,185 @@
+import asyncio
+import shutil
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from src.metrics import SHADOW_DELTA, SHADOW_REQUESTS
+from src.pipeline.inference_pool import InferencePool, InferencePoolConfig
+from src.pipeline.model_router import (
+    ModelRouter,
+    ModelRouterConfig,
+    UnknownVariantError,
+)
+from src.pipeline.predict_pipeline import PRIMARY_VARIANT, PredictPipeline
+from src.pipeline.prediction_cache import PredictionCache, PredictionCacheConfig
+
+
+def _router(fitted_registry, model_variants, **overrides):
+    pipeline = PredictPipeline(
+        registry=fitted_registry,
+        cache=PredictionCache(PredictionCacheConfig(enabled=False)),
+    )
+    values = dict(variants_dir=model_variants.variants_dir, weights={}, shadow=[])
+    values.update(overrides)
+    return ModelRouter(pipeline, ModelRouterConfig(**values))
+
+
+def _records(test_df, n=20):
+    return test_df.drop(columns=["math_score"]).head(n).to_dict("records")
+
+
+class TestModelRouter:
+    def test_routes_by_header_and_weights(self, fitted_registry, model_variants):
+        router = _router(fitted_registry, model_variants)
+        assert router.choose() == PRIMARY_VARIANT
+        assert router.choose(" ridge_regression ") == "ridge_regression"
+        with pytest.raises(UnknownVariantError):
+            router.choose("lasso")
+
+        router = _router(
+            fitted_registry,
+            model_variants,
+            weights={PRIMARY_VARIANT: 3, "ridge_regression": 1},
+        )
+        router._random.seed(0)
+        picks = Counter(router.choose() for _ in range(2000))
+        assert set(picks) == {PRIMARY_VARIANT, "ridge_regression"}
+        assert 0.2 < picks["ridge_regression"] / 2000 < 0.3
+
+    def test_variants_serve_their_own_model(
+        self, fitted_registry, model_variants, test_df
+    ):
+        router = _router(fitted_registry, model_variants)
+        record = _records(test_df, 1)[0]
+        ridge = router.pipeline("ridge_regression")
+        assert ridge.registry.get().version != fitted_registry.get().version
+        # The best model's variant is the primary model
+        assert router.pipeline("linear_regression").predict_record(
+            record
+        ) == pytest.approx(router.primary.predict_record(record))
+
+        pool = InferencePool(router.primary, InferencePoolConfig(mode="thread"))
+        pooled = asyncio.run(pool.run_on(ridge, "predict_record", record))
+        pool.stop()
+        assert pooled == pytest.approx(ridge.predict_record(record))
+        assert pooled != pytest.approx(router.primary.predict_record(record))
+
+    def test_variants_do_not_evict_the_primary_cache(
+        self, fitted_registry, model_variants, test_df
+    ):
+        primary = PredictPipeline(
+            registry=fitted_registry,
+            cache=PredictionCache(PredictionCacheConfig(enabled=True)),
+        )
+        router = ModelRouter(
+            primary,
+            ModelRouterConfig(
+                variants_dir=model_variants.variants_dir, weights={}, shadow=[]
+            ),
+        )
+        record = _records(test_df, 1)[0]
+        ridge = router.pipeline("ridge_regression")
+        assert ridge.cache is not primary.cache
+
+        primary.predict_record(record)
+        ridge.predict_record(record)
+        assert ridge.cached_prediction(record) is not None
+        assert primary.cached_prediction(record) is not None
+        stats = primary.cache.stats()
+        assert (stats["hits"], stats["invalidations"]) == (1, 0)
+
+    def test_watch_reloads_variants_created_after_startup(
+        self, fitted_registry, model_variants, tmp_path
+    ):
+        variants_dir = tmp_path / "variants"
+        shutil.copytree(model_variants.variants_dir, variants_dir)
+        # Serve ridge from its pickles so overwriting model.pkl retrains it
+        shutil.rmtree(variants_dir / "ridge_regression" / "bundles")
+        router = _router(
+            fitted_registry, model_variants, variants_dir=str(variants_dir)
+        )
+
+        async def retrain_while_watching():
+            watcher = asyncio.create_task(router.watch(interval=0.01))
+            await asyncio.sleep(0.02)
+            ridge = router.pipeline("ridge_regression")
+            before = ridge.registry.get().version
+            shutil.copy(
+                variants_dir / "linear_regression" / "model.pkl",
+                variants_dir / "ridge_regression" / "model.pkl",
+            )
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if ridge.registry.get().version != before:
+                    break
+            watcher.cancel()
+            return before, ridge.registry.get().version
+
+        before, after = asyncio.run(retrain_while_watching())
+        assert after != before
+
+    def test_shadow_scores_in_the_background(
+        self, fitted_registry, model_variants, test_df
+    ):
+        router = _router(fitted_registry, model_variants, shadow=["ridge_regression"])
+        records = _records(test_df)
+        served = [
+            result["predicted_math_score"]
+            for result in router.primary.predict_batch(records)
+        ]
+        before = SHADOW_DELTA.count(variant="ridge_regression")
+        router.shadow(records, served)
+        # The served variant is never shadowed by itself
+        router.shadow(records, served, served="ridge_regression")
+        router.stop(wait=True)
+
+        assert SHADOW_DELTA.count(variant="ridge_regression") == before + len(records)
+        report = {row["variant"]: row for row in router.report()["variants"]}
+        assert report["ridge_regression"]["mean_abs_delta"] > 0
+        assert report["ridge_regression"]["records_scored"] >= len(records)
+
+    def test_shadow_backlog_is_bounded(self, fitted_registry, model_variants, test_df):
+        router = _router(
+            fitted_registry,
+            model_variants,
+            shadow=["ridge_regression"],
+            shadow_max_pending=0,
+        )
+        before = SHADOW_REQUESTS.value(variant="ridge_regression", result="dropped")
+        router.shadow(_records(test_df, 1), [70.0])
+        assert (
+            SHADOW_REQUESTS.value(variant="ridge_regression", result="dropped")
+            == before + 1
+        )
+
+    def test_recommends_cheapest_within_tolerance(
+        self, fitted_registry, model_variants
+    ):
+        router = _router(fitted_registry, model_variants, r2_tolerance=0.01)
+        rows = [
+            {
+                "variant": name,
+                "model": name,
+                "test_r2": r2,
+                "seconds_per_record": live,
+                "offline_seconds_per_record": offline,
+            }
+            for name, r2, live, offline in (
+                ("best", 0.88, 2e-5, 3e-5),
+                ("close", 0.875, 1e-5, 4e-5),
+                ("cheap_but_worse", 0.80, 1e-6, 1e-6),
+            )
+        ]
+        recommendation = router.recommend(rows)
+        assert recommendation["variant"] == "close"
+        assert recommendation["basis"] == "live"
+
+        rows[1]["seconds_per_record"] = None
+        recommendation = router.recommend(rows)
+        assert recommendation["variant"] == "best"
+        assert recommendation["basis"] == "offline"
+
+        assert router.recommend([]) is None
+        assert np.isclose(router.report()["r2_tolerance"], 0.01)
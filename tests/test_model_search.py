@@ -0,0 +1,186 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Lasso, Ridge
+from sklearn.tree import DecisionTreeRegressor
+
+from src.components.model_search import ModelSearch, ModelSearchConfig
+
+PARAMS = {
+    "Ridge Regression": {"alpha": [0.1, 1.0, 10.0, 100.0]},
+    "Lasso Regression": {"alpha": [0.01, 0.1, 1.0]},
+    "Decision Tree": {"max_depth": [2, 4, 6], "min_samples_leaf": [1, 5, 10]},
+}
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.RandomState(0)
+    X = rng.normal(size=(240, 5))
+    y = X @ np.array([3.0, -2.0, 0.5, 0.0, 1.0]) + rng.normal(scale=0.5, size=240)
+    return X, y
+
+
+def _models():
+    return {
+        "Ridge Regression": Ridge(),
+        "Lasso Regression": Lasso(),
+        "Decision Tree": DecisionTreeRegressor(),
+    }
+
+
+def _run(data, **config):
+    config.setdefault("n_jobs", 1)
+    return ModelSearch(ModelSearchConfig(**config)).run(*data, _models(), PARAMS)
+
+
+class TestModelSearch:
+    def test_grid_search_covers_every_candidate(self, data):
+        report = _run(data)
+        assert report["Decision Tree"]["n_completed"] == 9
+        assert report["Ridge Regression"]["n_fits"] == 12
+        assert report["Lasso Regression"]["best_params"] == {"alpha": 0.01}
+        assert all(result["fit_time"] > 0 for result in report.values())
+
+    def test_trial_budget_and_random_strategy(self, data):
+        grid = _run(data, max_trials=2)
+        assert grid["Decision Tree"]["n_trials"] == 2
+        assert grid["Ridge Regression"]["n_trials"] == 2
+
+        randomized = _run(data, strategy="random", n_iter=4)
+        assert randomized["Decision Tree"]["n_trials"] == 4
+        assert randomized["Lasso Regression"]["n_trials"] == 3
+
+    def test_per_model_budget_override(self, data):
+        report = _run(data, budgets={"Decision Tree": {"max_trials": 3}})
+        assert report["Decision Tree"]["n_trials"] == 3
+        assert report["Ridge Regression"]["n_trials"] == 4
+
+    def test_halving_narrows_candidates(self, data):
+        report = _run(data, strategy="halving")
+        tree = report["Decision Tree"]
+        assert tree["n_trials"] == 9
+        assert tree["n_fits"] == (9 + 3) * 3
+        assert tree["n_completed"] == 3
+
+    def test_selection_is_deterministic(self, data):
+        first = _run(data, strategy="random", n_iter=3, random_state=7)
+        second = _run(data, strategy="random", n_iter=3, random_state=7, n_jobs=2)
+        for name in PARAMS:
+            assert first[name]["best_params"] == second[name]["best_params"]
+            assert first[name]["cv_score"] == second[name]["cv_score"]
+
+    def test_rejects_unknown_strategy(self):
+        with pytest.raises(ValueError):
+            ModelSearch(ModelSearchConfig(strategy="bayesian"))
+
+    def test_leaves_the_callers_estimators_as_configured(self, data):
+        forest = RandomForestRegressor(n_estimators=5, n_jobs=-1)
+        report = ModelSearch(ModelSearchConfig(n_jobs=2, random_state=7)).run(
+            *data, {"Random Forest": forest}, {}
+        )
+        assert forest.get_params()["n_jobs"] == -1
+        assert forest.get_params()["random_state"] is None
+        shipped = report["Random Forest"]["best_estimator"].get_params()
+        # Seeded like the CV fits, without the search's one-thread cap
+        assert (shipped["n_jobs"], shipped["random_state"]) == (-1, 7)
+
+
+class TestEvaluateModels:
+    def test_reuses_refit_best_estimator(self, data):
+        from sklearn.utils.validation import check_is_fitted
+
+        from src.utils import evaluate_models
+
+        X, y = data
+        models = _models()
+        report = evaluate_models(
+            X[:180],
+            y[:180],
+            X[180:],
+            y[180:],
+            models,
+            PARAMS,
+            ModelSearchConfig(n_jobs=1),
+        )
+        for name, result in report.items():
+            check_is_fitted(models[name])
+            assert "best_estimator" not in result
+            assert {
+                "train_score",
+                "test_score",
+                "refit_time",
+                "predict_time",
+                "single_row_p95_ms",
+                "batch_us_per_row",
+            } <= set(result)
+        assert (
+            models["Ridge Regression"].alpha
+            == report["Ridge Regression"]["best_params"]["alpha"]
+        )
+
+    def test_refits_locally_without_search_refit(self, data):
+        from src.utils import evaluate_models
+
+        X, y = data
+        models = _models()
+        config = ModelSearchConfig(n_jobs=1, refit=False)
+        report = evaluate_models(
+            X[:180], y[:180], X[180:], y[180:], models, PARAMS, config
+        )
+        searched = ModelSearch(ModelSearchConfig(n_jobs=1)).run(
+            X[:180], y[:180], _models(), PARAMS
+        )
+        for name, result in report.items():
+            assert result["refit_cached"] is False
+            np.testing.assert_allclose(
+                models[name].predict(X[180:]),
+                searched[name]["best_estimator"].predict(X[180:]),
+            )
+
+    def test_drops_models_without_a_finished_trial(self, data, monkeypatch):
+        from src.components import model_search
+        from src.utils import evaluate_models
+
+        fit_and_score = model_search._fit_and_score
+
+        def tree_times_out(estimator, *args):
+            if isinstance(estimator, DecisionTreeRegressor):
+                return None
+            return fit_and_score(estimator, *args)
+
+        monkeypatch.setattr(model_search, "_fit_and_score", tree_times_out)
+        X, y = data
+        models = _models()
+        report = evaluate_models(
+            X[:180],
+            y[:180],
+            X[180:],
+            y[180:],
+            models,
+            PARAMS,
+            ModelSearchConfig(n_jobs=1),
+        )
+        assert set(report) == set(models) == {"Ridge Regression", "Lasso Regression"}
+
+        with pytest.raises(Exception, match="No model finished"):
+            evaluate_models(
+                X[:180],
+                y[:180],
+                X[180:],
+                y[180:],
+                {"Decision Tree": DecisionTreeRegressor()},
+                PARAMS,
+                ModelSearchConfig(n_jobs=1),
+            )
+
+    def test_single_candidate_skips_cross_validation(self, data):
+        from sklearn.linear_model import LinearRegression
+
+        report = ModelSearch(ModelSearchConfig(n_jobs=1)).run(
+            *data, {"Linear Regression": LinearRegression()}, {}
+        )
+        result = report["Linear Regression"]
+        assert result["cv_score"] is None
+        assert result["n_fits"] == 0
+        assert hasattr(result["best_estimator"], "coef_")
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from src.components.model_selection import (
+    ModelSelectionConfig,
+    measure_inference_cost,
+    select_model,
+)
+from src.pipeline.model_router import ModelRouterConfig
+
+REPORT = {
+    "CatBoosting Regressor": {
+        "test_score": 0.8800,
+        "single_row_p50_ms": 2.5,
+        "single_row_p95_ms": 4.0,
+        "batch_us_per_row": 3.0,
+    },
+    "Linear Regression": {
+        "test_score": 0.8795,
+        "single_row_p50_ms": 0.1,
+        "single_row_p95_ms": 0.2,
+        "batch_us_per_row": 0.05,
+    },
+    "Decision Tree": {
+        "test_score": 0.7600,
+        "single_row_p50_ms": 0.05,
+        "single_row_p95_ms": 0.1,
+        "batch_us_per_row": 0.02,
+    },
+}
+
+
+class TestModelSelection:
+    def test_measures_latency_and_size(self):
+        X = np.random.default_rng(0).normal(size=(50, 3))
+        model = LinearRegression().fit(X, X @ [1.0, 2.0, 3.0])
+        cost = measure_inference_cost(
+            model, X, ModelSelectionConfig(single_row_repeats=20)
+        )
+        assert 0 < cost["single_row_p50_ms"] <= cost["single_row_p95_ms"]
+        assert cost["batch_us_per_row"] > 0
+        assert cost["model_bytes"] > 0
+
+    def test_best_r2_ignores_cost(self):
+        selection = select_model(REPORT, ModelSelectionConfig(policy="best_r2"))
+        assert selection["model"] == "CatBoosting Regressor"
+        assert selection["candidates"] == ["CatBoosting Regressor"]
+
+    def test_fastest_within_tolerance(self):
+        selection = select_model(
+            REPORT, ModelSelectionConfig(policy="fastest", r2_tolerance=0.001)
+        )
+        # The decision tree is faster still but far below the best R2
+        assert selection["model"] == "Linear Regression"
+        assert selection["best_r2_model"] == "CatBoosting Regressor"
+        assert selection["candidates"] == [
+            "CatBoosting Regressor",
+            "Linear Regression",
+        ]
+
+    def test_fastest_needs_a_real_speedup(self):
+        report = {
+            "Ridge Regression": {"test_score": 0.8801, "single_row_p50_ms": 0.050},
+            "Linear Regression": {"test_score": 0.8800, "single_row_p50_ms": 0.046},
+            "Lasso Regression": {"test_score": 0.8790, "single_row_p50_ms": 0.030},
+        }
+        config = ModelSelectionConfig(policy="fastest", r2_tolerance=0.01)
+        # 8% faster is timer noise; 40% faster than Ridge is worth 0.001 R2
+        assert select_model(report, config)["model"] == "Lasso Regression"
+        report["Lasso Regression"]["single_row_p50_ms"] = 0.045
+        assert select_model(report, config)["model"] == "Ridge Regression"
+
+    def test_r2_tolerance_is_shared_with_the_router(self, monkeypatch):
+        monkeypatch.setenv("MODEL_R2_TOLERANCE", "0.005")
+        assert ModelSelectionConfig().r2_tolerance == 0.005
+        assert ModelRouterConfig().r2_tolerance == 0.005
+
+    def test_latency_slo_excludes_slow_models(self):
+        config = ModelSelectionConfig(policy="best_r2", latency_slo_ms=1.0)
+        selection = select_model(REPORT, config)
+        assert selection["model"] == "Linear Regression"
+        assert selection["excluded_by_slo"] == ["CatBoosting Regressor"]
+
+        config.latency_slo_ms = 0.01
+        with pytest.raises(ValueError, match="latency SLO"):
+            select_model(REPORT, config)
+
+    def test_rejects_unknown_policy(self):
+        with pytest.raises(ValueError, match="selection policy"):
+            select_model(REPORT, ModelSelectionConfig(policy="cheapest"))
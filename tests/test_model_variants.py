@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from src.components.artifact_bundle import ArtifactBundle, current_bundle_path
+from src.components.model_variants import VARIANTS_INDEX_FILE, variant_name
+from src.pipeline.model_router import ModelRouter, ModelRouterConfig
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.utils import load_json
+
+
+class TestModelVariants:
+    def test_variant_names(self):
+        assert variant_name("K-Nearest Neighbors") == "k_nearest_neighbors"
+        assert variant_name("XGBoost") == "xgboost"
+
+    def test_exports_the_top_k_with_an_index(self, model_variants):
+        index = load_json(
+            os.path.join(model_variants.variants_dir, VARIANTS_INDEX_FILE)
+        )
+        assert index["best"] == "linear_regression"
+        assert [variant["name"] for variant in index["variants"]] == [
+            "linear_regression",
+            "ridge_regression",
+        ]
+        ridge = index["variants"][1]
+        assert ridge["rank"] == 2
+        assert ridge["test_r2"] == 0.875
+        assert ridge["predict_seconds_per_record"] == pytest.approx(0.001 / 200)
+        assert not os.path.exists(os.path.join(model_variants.variants_dir, "lasso"))
+
+    def test_each_variant_is_a_verified_bundle(self, model_variants):
+        bundle_dir = os.path.join(model_variants.variants_dir, "ridge_regression")
+        bundle = ArtifactBundle.open(
+            current_bundle_path(os.path.join(bundle_dir, "bundles"))
+        )
+        assert bundle.manifest["model_class"] == "Ridge"
+        assert bundle.manifest["compiled"] == "linear"
+        assert bundle.manifest["metrics"]["best_model"] == "Ridge Regression"
+
+    def test_each_variant_serves_its_own_intervals(
+        self, model_variants, fitted_registry, test_df
+    ):
+        router = ModelRouter(
+            PredictPipeline(registry=fitted_registry),
+            ModelRouterConfig(
+                variants_dir=model_variants.variants_dir, weights={}, shadow=[]
+            ),
+        )
+        record = test_df.drop(columns=["math_score"]).iloc[0].to_dict()
+        for name in ("linear_regression", "ridge_regression"):
+            variant = router.pipeline(name)
+            score = variant.predict_record(record)
+            interval = variant.prediction_interval(score)
+            assert interval["coverage"] == 0.9
+            assert interval["lower"] < score < interval["upper"]
+            assert variant.registry.info()["bundle"] is not None
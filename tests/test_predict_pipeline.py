@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from src.pipeline.predict_pipeline import (
+    PredictPipeline,
+    confidence_level,
+    confidence_levels,
+    validate_features,
+    validate_record,
+)
+
+
+class TestValidateFeatures:
+    def test_flags_each_bad_row(self, test_df):
+        df = test_df.drop(columns=["math_score"]).head(3).copy()
+        df.loc[1, "reading_score"] = 140
+        df.loc[2, "lunch"] = None
+        _, errors = validate_features(df, {"gender": ["female", "male"]})
+        assert errors[0] is None
+        assert "reading_score" in errors[1]
+        assert "lunch is required" in errors[2]
+
+    def test_unknown_category(self, test_df):
+        df = test_df.drop(columns=["math_score"]).head(1).copy()
+        df.loc[0, "gender"] = "unknown"
+        _, errors = validate_features(df, {"gender": ["female", "male"]})
+        assert errors[0] == "gender has unknown value"
+
+    def test_single_record(self, test_df):
+        record = test_df.drop(columns=["math_score"]).iloc[0].to_dict()
+        record["gender"] = " female "
+        categories = {"gender": ["female", "male"], "lunch": ["standard"]}
+        record["lunch"] = "brunch"
+        assert validate_record(record, categories) == {
+            "lunch": "lunch has unknown value"
+        }
+        assert record["gender"] == "female"
+
+
+class TestPredictBatch:
+    def test_matches_single_predictions(self, fitted_registry, test_df):
+        features = test_df.drop(columns=["math_score"]).head(50)
+        pipeline = PredictPipeline(registry=fitted_registry)
+
+        results = pipeline.predict_batch(features.to_dict("records"), chunk_size=16)
+        expected = pipeline.predict(features)
+
+        assert [r["index"] for r in results] == list(range(50))
+        for result, score in zip(results, expected):
+            assert result["predicted_math_score"] == round(float(score), 2)
+
+    def test_bad_rows_do_not_fail_batch(self, fitted_registry, test_df):
+        records = test_df.drop(columns=["math_score"]).head(3).to_dict("records")
+        records[1]["race_ethnicity"] = "group Z"
+        results = PredictPipeline(registry=fitted_registry).predict_batch(records)
+        assert [r["status"] for r in results] == ["success", "error", "success"]
+
+    def test_confidence_levels(self):
+        levels = confidence_levels(pd.Series([85.0, 60.0, 59.9]))
+        assert list(levels) == ["High", "Medium", "Low"]
+
+    def test_single_confidence_level_matches_vectorized(self):
+        scores = [0.0, 59.99, 60.0, 79.99, 80.0, 100.0]
+        assert [confidence_level(s) for s in scores] == list(confidence_levels(scores))
+
+
+class TestPredictRecord:
+    def test_matches_batch_path(self, fitted_registry, test_df):
+        features = test_df.drop(columns=["math_score"]).head(20)
+        pipeline = PredictPipeline(registry=fitted_registry)
+        scores = [pipeline.predict_record(r) for r in features.to_dict("records")]
+        np.testing.assert_allclose(scores, pipeline.predict(features))
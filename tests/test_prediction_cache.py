@@ -0,0 +1,98 @@
+import time
+
+from src.pipeline.predict_pipeline import PredictPipeline, feature_key
+from src.pipeline.prediction_cache import PredictionCache, PredictionCacheConfig
+
+
+def _cache(**config):
+    config.setdefault("enabled", True)
+    config.setdefault("max_size", 100)
+    config.setdefault("ttl", 60)
+    config.setdefault("shared_path", "")
+    return PredictionCache(PredictionCacheConfig(**config))
+
+
+class TestPredictionCache:
+    def test_lru_eviction(self):
+        cache = _cache(max_size=2)
+        cache.put("v1", ("a",), 1.0)
+        cache.put("v1", ("b",), 2.0)
+        assert cache.get("v1", ("a",)) == 1.0
+        cache.put("v1", ("c",), 3.0)
+
+        assert cache.get("v1", ("b",)) is None
+        assert cache.get("v1", ("a",)) == 1.0
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+
+    def test_ttl_expiry(self):
+        cache = _cache(ttl=0.01)
+        cache.put("v1", ("a",), 1.0)
+        time.sleep(0.02)
+        assert cache.get("v1", ("a",)) is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_new_version_invalidates(self):
+        cache = _cache()
+        cache.put("v1", ("a",), 1.0)
+        assert cache.get("v2", ("a",)) is None
+        assert cache.stats()["invalidations"] == 1
+
+        # A request still holding the old model must not repopulate the cache
+        cache.put("v1", ("a",), 1.0)
+        assert cache.get("v1", ("a",)) is None
+        assert cache.stats()["size"] == 0
+
+    def test_shared_backend_serves_other_workers(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        _cache(shared_path=path).put("v1", ("a", 1.0), 4.5)
+
+        other = _cache(shared_path=path)
+        assert other.get("v1", ("a", 1.0)) == 4.5
+        assert other.get("v1", ("a", 1.0)) == 4.5
+        stats = other.stats()
+        assert (stats["shared_hits"], stats["hits"]) == (1, 1)
+
+
+class TestCachedPredictions:
+    def test_feature_key_is_canonical(self, test_df):
+        record = test_df.drop(columns=["math_score"]).iloc[0].to_dict()
+        variant = dict(record, gender=f" {record['gender']} ")
+        variant["reading_score"] = str(int(record["reading_score"]))
+        assert feature_key(record) == feature_key(variant)
+
+    def test_single_and_batch_share_entries(self, fitted_registry, test_df):
+        cache = _cache()
+        pipeline = PredictPipeline(registry=fitted_registry, cache=cache)
+        records = test_df.drop(columns=["math_score"]).head(20).to_dict("records")
+
+        assert pipeline.cached_prediction(records[0]) is None
+        score = pipeline.predict_record(records[0])
+        assert pipeline.cached_prediction(records[0]) == score
+
+        uncached = pipeline.predict_batch(records)
+        cached = pipeline.predict_batch(records, use_cache=True)
+        again = pipeline.predict_batch(records, use_cache=True)
+        assert uncached == cached == again
+        assert cache.stats()["size"] == len({feature_key(r) for r in records})
+        assert cache.stats()["hits"] >= len(records)
+
+    def test_shared_backend_connects_per_process_on_first_use(self, tmp_path):
+        path = tmp_path / "cache.sqlite"
+        cache = _cache(shared_path=str(path))
+        # Nothing is opened at import time, before gunicorn forks
+        assert not path.exists()
+
+        cache.put("v1", ("a",), 4.5, shared=False)
+        assert cache.get("v1", ("b",), shared=False) is None
+        assert not path.exists()
+        cache.put_shared("v1", ("b",), 2.5)
+        assert cache.get_shared("v1", ("b",)) == 2.5
+
+        # A connection inherited across fork() is replaced, not reused
+        inherited = cache.shared._connect()
+        cache.shared._local.pid = -1
+        assert cache.shared._connect() is not inherited
+        assert cache.get_shared("v1", ("b",)) == 2.5
+        stats = cache.stats()
+        assert (stats["hits"], stats["shared_hits"], stats["misses"]) == (0, 2, 0)
@@ -0,0 +1,145 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from src.components.artifact_bundle import (
+    ArtifactBundle,
+    ArtifactBundleConfig,
+    ArtifactBundler,
+    current_bundle_path,
+)
+from src.components.prediction_intervals import (
+    PredictionIntervalCalibrator,
+    PredictionIntervalConfig,
+    PredictionIntervals,
+    conformal_quantile,
+)
+from src.pipeline.model_registry import ModelRegistry, ModelRegistryConfig
+from src.pipeline.predict_pipeline import PredictPipeline
+
+
+@pytest.fixture(scope="module")
+def calibrated(fitted_registry, train_df, test_df, tmp_path_factory):
+    """Copies of fitted_registry's pickles with intervals calibrated for them."""
+    artifacts = tmp_path_factory.mktemp("calibrated")
+    config = fitted_registry.config
+    shutil.copy(config.model_path, artifacts / "model.pkl")
+    shutil.copy(config.preprocessor_path, artifacts / "preprocessor.pkl")
+
+    loaded = fitted_registry.get()
+    X_train = loaded.preprocessor.transform(train_df.drop(columns=["math_score"]))
+    X_test = loaded.preprocessor.transform(test_df.drop(columns=["math_score"]))
+    summary = PredictionIntervalCalibrator(
+        PredictionIntervalConfig(
+            trained_model_file_path=str(artifacts / "model.pkl"),
+            preprocessor_obj_file_path=str(artifacts / "preprocessor.pkl"),
+            intervals_file_path=str(artifacts / "prediction_intervals.json"),
+            coverage=0.9,
+            bins=4,
+        )
+    ).initiate_interval_calibration(
+        loaded.model,
+        X_train,
+        train_df["math_score"],
+        X_test,
+        test_df["math_score"],
+    )
+    return artifacts, summary
+
+
+class TestPredictionIntervals:
+    def test_conformal_quantile(self):
+        values = np.arange(1, 10)
+        # ceil(10 * 0.9) = 9th smallest
+        assert conformal_quantile(values, 0.9) == 9
+        assert conformal_quantile(values, 0.5) == 5
+
+    def test_bins_follow_the_noise(self):
+        rng = np.random.default_rng(0)
+        predictions = rng.uniform(0, 100, 4000)
+        targets = predictions + rng.normal(0, 1 + predictions / 10, 4000)
+        # Unbounded: the synthetic targets leave the 0-100 score range
+        intervals = PredictionIntervals.calibrate(
+            predictions, targets, 0.9, bins=4, min_bin_size=100, bounds=(-50, 150)
+        )
+        widths = np.subtract(intervals.upper, intervals.lower)
+        assert len(widths) == 4
+        assert np.all(np.diff(widths) > 0)
+
+        rng = np.random.default_rng(1)
+        fresh = rng.uniform(0, 100, 4000)
+        observed = fresh + rng.normal(0, 1 + fresh / 10, 4000)
+        assert intervals.evaluate(fresh, observed)["coverage"] >= 0.88
+
+    def test_single_score_matches_vectorized(self):
+        intervals = PredictionIntervals(
+            [40.0, 70.0], [-5, -4, -3], [6, 5, 4], 0.9, 0, 100
+        )
+        scores = [2.0, 39.9, 40.0, 69.0, 98.0]
+        lower, upper = intervals.intervals(scores)
+        assert [intervals.interval(score) for score in scores] == list(
+            zip(lower.tolist(), upper.tolist())
+        )
+        # Clipped to the score range
+        assert intervals.interval(2.0) == (0.0, 8.0)
+        assert intervals.interval(98.0) == (95.0, 100.0)
+
+
+class TestIntervalCalibration:
+    def test_saved_for_the_model_version(self, calibrated):
+        artifacts, summary = calibrated
+        assert summary["calibration_rows"] > 0
+        assert summary["test_coverage"] >= 0.8
+        path = str(artifacts / "prediction_intervals.json")
+        assert PredictionIntervals.load(path, summary["source_version"]) is not None
+        assert PredictionIntervals.load(path, "other") is None
+
+    def test_served_in_single_and_batch_predictions(
+        self, calibrated, fitted_registry, test_df
+    ):
+        artifacts, summary = calibrated
+        registry = ModelRegistry(
+            ModelRegistryConfig(
+                model_path=str(artifacts / "model.pkl"),
+                preprocessor_path=str(artifacts / "preprocessor.pkl"),
+                compiled_model_path=str(artifacts / "model_compiled.npz"),
+                prediction_intervals_path=str(artifacts / "prediction_intervals.json"),
+                reload_interval=0,
+            )
+        )
+        pipeline = PredictPipeline(registry=registry)
+        records = test_df.drop(columns=["math_score"]).head(20).to_dict("records")
+
+        for result, record in zip(pipeline.predict_batch(records), records):
+            interval = result["prediction_interval"]
+            assert interval["coverage"] == 0.9
+            assert interval["lower"] < result["predicted_math_score"]
+            assert interval["upper"] > result["predicted_math_score"]
+            score = pipeline.predict_record(record)
+            assert pipeline.prediction_interval(score) == interval
+        assert registry.info()["prediction_interval_coverage"] == 0.9
+
+        # Without calibrated intervals the field is empty
+        plain = PredictPipeline(registry=fitted_registry)
+        assert plain.predict_batch(records[:1])[0]["prediction_interval"] is None
+        assert plain.prediction_interval(70.0) is None
+
+    def test_bundled_with_the_model(self, calibrated, tmp_path):
+        artifacts, _ = calibrated
+        ArtifactBundler(
+            ArtifactBundleConfig(
+                trained_model_file_path=str(artifacts / "model.pkl"),
+                preprocessor_obj_file_path=str(artifacts / "preprocessor.pkl"),
+                compiled_model_file_path=str(tmp_path / "model_compiled.npz"),
+                model_report_file_path=str(tmp_path / "model_report.json"),
+                prediction_intervals_file_path=str(
+                    artifacts / "prediction_intervals.json"
+                ),
+                bundle_dir=str(tmp_path / "bundles"),
+            )
+        ).initiate_bundle_creation()
+        bundle = ArtifactBundle.open(current_bundle_path(str(tmp_path / "bundles")))
+        bundled = bundle.prediction_intervals()
+        saved = PredictionIntervals.load(str(artifacts / "prediction_intervals.json"))
+        assert bundled.to_dict() == saved.to_dict()
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dataclasses import replace
+
+from src.components.prediction_table import (
+    PredictionTable,
+    PredictionTableBuilder,
+    PredictionTableConfig,
+)
+from src.pipeline.model_registry import ModelRegistry
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.pipeline.prediction_cache import PredictionCache, PredictionCacheConfig
+
+
+@pytest.fixture(scope="module")
+def table_registry(fitted_registry, tmp_path_factory):
+    """The fitted registry's artifacts plus a table for scores 60-70."""
+    table_path = str(tmp_path_factory.mktemp("table") / "prediction_table.npy")
+    builder = PredictionTableBuilder(
+        PredictionTableConfig(
+            trained_model_file_path=fitted_registry.config.model_path,
+            preprocessor_obj_file_path=fitted_registry.config.preprocessor_path,
+            table_file_path=table_path,
+            score_min=60,
+            score_max=70,
+        )
+    )
+    builder.initiate_table_build()
+    config = replace(
+        fitted_registry.config,
+        prediction_table_path=table_path,
+        prediction_table_enabled=True,
+    )
+    return ModelRegistry(config), builder
+
+
+def _records(test_df, n=20):
+    records = test_df.drop(columns=["math_score"]).head(n).to_dict("records")
+    for index, record in enumerate(records):
+        record["reading_score"] = 60 + index % 11
+        record["writing_score"] = 70 - index % 11
+    return records
+
+
+class TestPredictionTable:
+    def test_table_matches_live_model(self, table_registry, test_df):
+        registry, builder = table_registry
+        loaded = registry.get()
+        assert loaded.table is not None
+        assert loaded.table.shape[-2:] == (11, 11)
+
+        report = builder.validate_table(full=True)
+        assert report["cells_checked"] == int(np.prod(loaded.table.shape))
+        assert report["max_abs_error"] < 1e-4
+
+        records = _records(test_df)
+        expected = PredictPipeline._predict_model(loaded, pd.DataFrame(records))
+        for record, score in zip(records, expected):
+            assert loaded.table.lookup_row(record) == pytest.approx(score, abs=1e-4)
+
+    def test_off_grid_rows_fall_back_to_model(self, table_registry, test_df):
+        registry, _ = table_registry
+        loaded = registry.get()
+        records = _records(test_df, n=4)
+        records[1]["reading_score"] = 65.5
+        records[2]["writing_score"] = 90
+        records[3]["gender"] = "unknown"
+
+        assert loaded.table.lookup_row(records[1]) is None
+        assert loaded.table.lookup_row(records[2]) is None
+        assert loaded.table.lookup_row(records[3]) is None
+        _, found = loaded.table.predict(records)
+        assert found.tolist() == [True, False, False, False]
+
+        cache = PredictionCache(PredictionCacheConfig(enabled=False))
+        pipeline = PredictPipeline(registry=registry, cache=cache)
+        results = pipeline.predict_batch(records[:3])
+        live = PredictPipeline._predict_model(loaded, pd.DataFrame(records[:3]))
+        for result, score in zip(results, live):
+            assert result["predicted_math_score"] == pytest.approx(score, abs=0.01)
+        assert pipeline.predict_record(records[1]) == pytest.approx(live[1])
+
+    def test_stale_table_is_ignored(self, table_registry, tmp_path):
+        _, builder = table_registry
+        path = builder.prediction_table_config.table_file_path
+        assert PredictionTable.load(path, source_version="other") is None
+        assert PredictionTable.load(str(tmp_path / "missing.npy")) is None
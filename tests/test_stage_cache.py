@@ -0,0 +1,90 @@
+import numpy as np
+from sklearn.linear_model import Ridge
+from sklearn.tree import DecisionTreeRegressor
+
+from src.components.model_search import ModelSearch, ModelSearchConfig
+from src.stage_cache import StageCache, StageCacheConfig, fingerprint
+
+
+def _cache(tmp_path):
+    return StageCache(StageCacheConfig(cache_dir=str(tmp_path / "cache"), enabled=True))
+
+
+def _data():
+    rng = np.random.RandomState(0)
+    X = rng.normal(size=(120, 4))
+    y = X @ np.array([2.0, -1.0, 0.5, 0.0]) + rng.normal(scale=0.3, size=120)
+    return X, y
+
+
+class TestFingerprint:
+    def test_stable_and_sensitive(self):
+        X = np.arange(6.0).reshape(3, 2)
+        assert fingerprint(X, {"b": 1, "a": [1, 2]}) == fingerprint(
+            X.copy(), {"a": [1, 2], "b": 1}
+        )
+        assert fingerprint(X) != fingerprint(X.T)
+        assert fingerprint({"alpha": 1}) != fingerprint({"alpha": 1.5})
+
+
+class TestStageCache:
+    def test_restore_after_store(self, tmp_path):
+        cache = _cache(tmp_path)
+        output = tmp_path / "train.csv"
+        output.write_text("a,b\n1,2\n")
+
+        assert cache.restore("ingestion", "k1", {"train.csv": str(output)}) is None
+        cache.store("ingestion", "k1", {"train.csv": str(output)}, {"rows": 1})
+
+        output.unlink()
+        assert cache.restore("ingestion", "k1", {"train.csv": str(output)}) == {
+            "rows": 1
+        }
+        assert output.read_text() == "a,b\n1,2\n"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_disabled_cache_never_hits(self, tmp_path):
+        cache = StageCache(
+            StageCacheConfig(cache_dir=str(tmp_path / "cache"), enabled=False)
+        )
+        cache.put_result("ab12", 1.0)
+        assert cache.get_result("ab12") is None
+
+
+class TestCachedModelSearch:
+    def test_only_new_models_and_candidates_are_fitted(self, tmp_path):
+        cache = _cache(tmp_path)
+        X, y = _data()
+        config = ModelSearchConfig(n_jobs=1)
+        params = {"Ridge Regression": {"alpha": [0.1, 1.0]}}
+
+        first = ModelSearch(config, cache).run(
+            X, y, {"Ridge Regression": Ridge()}, params
+        )
+        assert first["Ridge Regression"]["n_fits"] == 6
+
+        params["Ridge Regression"]["alpha"].append(10.0)
+        params["Decision Tree"] = {"max_depth": [2, 4]}
+        second = ModelSearch(config, cache).run(
+            X,
+            y,
+            {"Ridge Regression": Ridge(), "Decision Tree": DecisionTreeRegressor()},
+            params,
+        )
+        ridge = second["Ridge Regression"]
+        assert (ridge["n_fits"], ridge["n_cached"]) == (3, 6)
+        assert ridge["cv_score"] == first["Ridge Regression"]["cv_score"]
+        assert ridge["refit_cached"] is True
+        assert second["Decision Tree"]["n_fits"] == 6
+
+    def test_changed_data_misses(self, tmp_path):
+        cache = _cache(tmp_path)
+        X, y = _data()
+        config = ModelSearchConfig(n_jobs=1)
+        params = {"Ridge Regression": {"alpha": [0.1, 1.0]}}
+
+        ModelSearch(config, cache).run(X, y, {"Ridge Regression": Ridge()}, params)
+        report = ModelSearch(config, cache).run(
+            X, y + 1.0, {"Ridge Regression": Ridge()}, params
+        )
+        assert report["Ridge Regression"]["n_cached"] == 0
@@ -0,0 +1,72 @@
+import shutil
+
+import pytest
+
+from benchmarks.startup import HEAVY_MODULES, measure_startup
+from src.components.compiled_model import CompiledModelConfig, ModelCompiler
+from src.pipeline.model_registry import (
+    ModelRegistry,
+    ModelRegistryConfig,
+    PickledArtifact,
+)
+
+
+@pytest.fixture(scope="module")
+def compiled_artifacts(fitted_registry, tmp_path_factory):
+    """A copy of the fitted artifacts plus their compiled model."""
+    artifacts = tmp_path_factory.mktemp("compiled_artifacts")
+    shutil.copy(fitted_registry.config.model_path, artifacts / "model.pkl")
+    shutil.copy(
+        fitted_registry.config.preprocessor_path, artifacts / "preprocessor.pkl"
+    )
+    compiler = ModelCompiler()
+    compiler.compiled_model_config = CompiledModelConfig(
+        trained_model_file_path=str(artifacts / "model.pkl"),
+        preprocessor_obj_file_path=str(artifacts / "preprocessor.pkl"),
+        compiled_model_file_path=str(artifacts / "model_compiled.npz"),
+    )
+    compiler.initiate_model_compilation()
+    return ModelRegistryConfig(
+        model_path=str(artifacts / "model.pkl"),
+        preprocessor_path=str(artifacts / "preprocessor.pkl"),
+        compiled_model_path=str(artifacts / "model_compiled.npz"),
+        reload_interval=0,
+    )
+
+
+class TestStartup:
+    def test_compiled_model_keeps_pickles_unread(self, compiled_artifacts, test_df):
+        registry = ModelRegistry(compiled_artifacts)
+        loaded = registry.get()
+        info = registry.info()
+        assert info["compiled"] == "linear"
+        assert info["model_class"] == "LinearRegression"
+        assert info["pickles_loaded"] is False
+        assert info["required_packages"] == ["numpy", "sklearn"]
+        assert loaded.categories["gender"] == ["female", "male"]
+
+        features = test_df.drop(columns=["math_score"]).head(5)
+        expected = loaded.scorer.predict(features)
+        # Asking for the estimator unpickles it on demand
+        assert loaded.model.predict(loaded.transformer.transform(features)) == (
+            pytest.approx(expected)
+        )
+        assert registry.info()["pickles_loaded"] is True
+
+    def test_pickled_artifact_reads_class_without_importing(self):
+        artifact = PickledArtifact.of({"a": 1})
+        assert artifact.loaded and artifact.class_name == "dict"
+        assert artifact.packages == []
+
+    def test_serving_cold_start_skips_training_libraries(self, compiled_artifacts):
+        result = measure_startup(
+            {
+                "MODEL_PATH": compiled_artifacts.model_path,
+                "PREPROCESSOR_PATH": compiled_artifacts.preprocessor_path,
+                "COMPILED_MODEL_PATH": compiled_artifacts.compiled_model_path,
+                "MODEL_RELOAD_INTERVAL": "0",
+            }
+        )
+        assert result["canary_ok"] and result["compiled"] == "linear"
+        assert result["heavy_modules"] == []
+        assert set(HEAVY_MODULES) >= {"sklearn", "catboost", "xgboost"}